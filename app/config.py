@@ -38,6 +38,59 @@ class Settings(BaseSettings):
     TESSERACT_CMD: str = ""
     SECRET_KEY: str = ""  # For JWT authentication - REQUIRED in production
 
+    # Ingest asinkron: upload dipersist, diproses worker lokal, respons 202 + job id
+    ASYNC_INGEST: bool = False  # default mode bila form `async_mode` tidak diisi
+    INGEST_WORKERS: int = 2
+    INGEST_JOB_LEASE_SECONDS: int = 300  # job 'running' tanpa heartbeat selama ini dianggap yatim & diantrekan ulang
+
+    # Executor untuk tahap CPU-bound (ekstraksi/OCR/parse) agar event loop tidak terblokir
+    INGEST_EXECUTOR: str = "thread"  # 'thread' | 'process' | 'sandbox'
+    INGEST_MAX_CONCURRENCY: int = 0  # 0 = jumlah CPU
+
+    # Mode 'sandbox': tiap dokumen di worker subprocess dengan batas waktu & memori
+    SANDBOX_TIMEOUT: int = 120  # detik per dokumen (jalur cepat); 0 = tanpa batas
+    SANDBOX_OCR_TIMEOUT: int = 900  # detik per dokumen di jalur OCR
+    SANDBOX_MAX_RSS_MB: int = 1536  # RSS worker + proses anaknya; 0 = tanpa batas
+    SANDBOX_MAX_TASKS: int = 50  # worker didaur ulang setelah N dokumen; 0 = tidak pernah
+
+    # Cache hasil /upload/analyze agar /upload/ berikutnya tidak ekstraksi/OCR ulang
+    ANALYSIS_CACHE_TTL: int = 900  # detik; 0 = nonaktif
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 256
+    ANALYSIS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Model classifier ML (app.services.model_registry): dimuat saat pertama dipakai
+    ML_MODEL_PATH: str = "data/classifier_model.pkl"  # .pkl, atau direktori format mmap (scripts/export_mmap_model.py)
+    ML_MODEL_WARMUP: bool = False  # muat + satu prediksi saat startup (bukan di request pertama)
+    ML_MODEL_WATCH_INTERVAL: int = 30  # detik antar cek perubahan file model; 0 = hanya reload manual
+
+    # Aturan kata kunci / pola klasifikasi jenis surat (app.services.rules)
+    CLASSIFICATION_RULES_PATH: str = "data/classification_rules.json"
+
+    # Backend teks native PDF: 'pymupdf' (cepat, default) | 'pdfminer' (pure Python, fallback)
+    PDF_TEXT_BACKEND: str = "pymupdf"
+
+    # OCR paralel per halaman (process pool untuk PyMuPDF, thread untuk pdf2image/tesseract)
+    OCR_WORKERS: int = 0  # 0 = jumlah CPU
+    OCR_BACKEND: str = "auto"  # 'auto' | 'tesserocr' | 'pytesseract' (auto: tesserocr bila terpasang)
+    OCR_PROBE_INTERVAL: int = 300  # detik antar refresh probe kemampuan OCR; 0 = hanya saat startup
+    # Preprocessing gambar sebelum OCR: 'downscale,crop,deskew,binarize' (subset, berurutan); kosong = nonaktif
+    OCR_PREPROCESS: str = ""
+    OCR_PREPROCESS_MAX_WIDTH: int = 2600  # px; halaman lebih lebar diperkecil oleh langkah 'downscale'
+
+    # Jalur lambat (dokumen yang perlu OCR) terpisah dari DOCX/PDF native; batas global halaman OCR
+    OCR_LANE_CONCURRENCY: int = 0  # dokumen OCR bersamaan; 0 = separuh jumlah CPU (min 1)
+    OCR_MAX_PAGES_IN_FLIGHT: int = 0  # 0 = otomatis: min(CPU - 1, memori tersedia / OCR_PAGE_MEMORY_MB)
+    OCR_PAGE_MEMORY_MB: int = 200  # perkiraan memori per halaman yang sedang di-render + OCR
+
+    # Cache persisten hasil OCR per halaman (sha256, halaman, dpi, bahasa, versi engine)
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_PATH: str = ""  # kosong = ocr_cache.db di folder yang sama dengan SQLITE_DB_PATH
+    OCR_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Header-first: PDF scan hanya di-OCR halaman pertama sebelum respons upload;
+    # OCR seluruh dokumen (text.txt lengkap) diselesaikan di background
+    OCR_HEADER_FIRST: bool = False
+
     # Tell pydantic-settings to read .env automatically
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -54,6 +107,20 @@ class Settings(BaseSettings):
     def TEMP_UPLOAD_PATH(self):
         return as_abs_path(self.TEMP_UPLOAD_DIR)
 
+    @property
+    def ML_MODEL_FILE(self):
+        return as_abs_path(self.ML_MODEL_PATH)
+
+    @property
+    def CLASSIFICATION_RULES_FILE(self):
+        return as_abs_path(self.CLASSIFICATION_RULES_PATH)
+
+    @property
+    def OCR_CACHE_FILE(self):
+        if self.OCR_CACHE_PATH:
+            return as_abs_path(self.OCR_CACHE_PATH)
+        return self.DB_FILE.parent / "ocr_cache.db"
+
     def ensure_dirs(self) -> None:
         """Create important folders if missing."""
         self.DB_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -14,15 +14,30 @@ ALLOWED_MIME: Dict[str, str] = {
 PDF2IMAGE_DPI = 200
 DEFAULT_OCR_DPI = 300
 TESSERACT_LANG = "ind"  # default language to try for pytesseract
+HEADER_OCR_PAGES = 1  # mode header-first: halaman yang di-OCR sebelum respons (kop, Nomor/Hal, tanggal)
 
 # PDF parser threshold: below this number of characters, consider PDF as scanned image
 SCANNED_TEXT_THRESHOLD = 20
+# Per halaman: halaman dengan teks native di bawah ambang ini dianggap gambar -> OCR
+SCANNED_PAGE_TEXT_THRESHOLD = 20
 
 # Upload limits
 MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50 MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # ukuran chunk saat upload di-stream ke disk
+
+# Batch upload (banyak file / satu ZIP)
+MAX_BATCH_FILES = 1000
+MAX_BATCH_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024  # 2 GB per file ZIP
+BATCH_COMMIT_SIZE = 50  # commit baris Document per N dokumen
+ZIP_MIME_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+# /predict-jenis/batch: teks per request (satu matriks TF-IDF per request)
+MAX_PREDICT_BATCH = 1000
 
 # Filenames & folder names
 BACKUP_DIR_NAME = "backup"
 METADATA_FILENAME = "metadata.json"
 TEXT_FILENAME = "text.txt"
 TMP_UPLOAD_NAME = "tmp_upload"
+SPOOL_DIR_NAME = "spool"  # subfolder TEMP_UPLOAD_DIR untuk upload yang sedang di-stream
+JOBS_DIR_NAME = "jobs"  # subfolder TEMP_UPLOAD_DIR untuk file job ingest yang menunggu diproses
@@ -24,3 +24,27 @@ def init_db():
     # LAZY IMPORT -> hindari circular import
     from app.models import Base
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns("ingest_jobs", {"owner": "VARCHAR(64)", "heartbeat_at": "DATETIME"})
+
+
+def _add_missing_columns(table: str, columns: dict):
+    # create_all tidak mengubah tabel yang sudah ada: kolom baru ditambahkan manual (SQLite)
+    from sqlalchemy import inspect, text
+    existing = {c["name"] for c in inspect(engine).get_columns(table)}
+    with engine.begin() as conn:
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def savepoint(db):
+    """`db.begin_nested()` yang juga benar di SQLite.
+
+    pysqlite baru mengirim BEGIN sebelum INSERT/UPDATE; SAVEPOINT yang dibuka lebih dulu
+    menjadi transaksi terluar, dan RELEASE-nya langsung meng-commit. Di sini BEGIN
+    dikirim dulu bila koneksi belum dalam transaksi.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+    return db.begin_nested()
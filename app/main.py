@@ -18,6 +18,7 @@ app/
   ├─ schemas.py
   ├─ routers/
   │    ├─ upload.py
+  │    ├─ jobs.py
   │    ├─ search.py
   │    └─ export.py
   ├─ services/
@@ -49,11 +50,19 @@ from fastapi.responses import JSONResponse
 
 # 2) Import config & database (settings sekarang ada di config.py)
 from app.config import settings, ensure_dirs
+from app.constants import MAX_BATCH_UPLOAD_SIZE, MAX_UPLOAD_SIZE
 from app.database import init_db
 
 # 3) Import routers (pastikan nama modul sesuai)
 #    Jika nama file berbeda, sesuaikan import di bawah ini.
-from app.routers import upload, search, export, health, auth
+from app.routers import upload, search, export, health, auth, jobs, admin
+from app.services.jobs import job_queue
+from app.services.scheduler import extraction_scheduler
+from app.services.ocr import shutdown_ocr_pool
+from app.services.ocr_capabilities import ocr_capabilities
+from app.services.model_registry import model_registry
+from app.services import rules
+from app.utils.request_limit import BodySizeLimitMiddleware, MULTIPART_OVERHEAD
 
 # ----- Logging (gunakan logger uvicorn agar nyatu di console) -----
 log = logging.getLogger("uvicorn")
@@ -94,6 +103,18 @@ async def lifespan(app: FastAPI):
             create_initial_admin(db)
         finally:
             db.close()
+
+        # Lanjutkan job ingest asinkron yang tertinggal saat server mati
+        job_queue.resume_pending()
+
+        # Probe kemampuan OCR sekali (bahasa, versi, Poppler), lalu refresh berkala
+        ocr_capabilities.start()
+
+        # Aturan klasifikasi: muat sekarang agar file/setting yang salah gagal di startup
+        rules.get_rule_engine()
+
+        # Model classifier: warm-up opsional (ML_MODEL_WARMUP) + pantau file untuk reload
+        model_registry.start()
             
         log.info(
             "[startup] DB: %s | STORAGE: %s | UPLOADS: %s",
@@ -110,6 +131,11 @@ async def lifespan(app: FastAPI):
     yield
 
     # SHUTDOWN: tempat menutup resource jika perlu
+    job_queue.shutdown(wait=False)
+    extraction_scheduler.shutdown(wait=False)
+    shutdown_ocr_pool()
+    ocr_capabilities.stop()
+    model_registry.stop()
     log.info("[shutdown] Document Automation Classifier stopped.")
 
 
@@ -146,6 +172,16 @@ if os.getenv("APP_ENV", "").lower() == "development":
     log.warning("⚠️  CORS: Allowing ALL origins (development mode)")
     cors_origins = ["*"]
 
+# ----- Batas ukuran body upload (ditolak sebelum multipart di-parse) -----
+# Didaftarkan sebelum CORS agar respons 413 tetap membawa header CORS
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits=[
+        ("/upload/batch", MAX_BATCH_UPLOAD_SIZE + MULTIPART_OVERHEAD),
+        ("/upload/", MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD),
+    ],
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -216,12 +252,14 @@ def healthz(request: Request):
 # Jika di masing-masing router sudah ada prefix (misal @router.post("/upload")), cukup include saja.
 # Jika kamu ingin prefix global seperti "/api", pakai: app.include_router(upload.router, prefix="/api")
 app.include_router(upload.router, tags=["Upload"])
+app.include_router(jobs.router)
 app.include_router(search.router, tags=["Search"])
 app.include_router(export.router, tags=["Export"])
 # Health endpoints (OCR check, etc.)
 # Health endpoints (OCR check, etc.)
 app.include_router(health.router)
 app.include_router(auth.router)
+app.include_router(admin.router)
 
 # Document endpoints (metadata, file, text)
 try:
@@ -65,3 +65,23 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     role = Column(String(20), default="staf") # admin | staf
+
+
+class IngestJob(Base):
+    """Job ingest asinkron: file sudah dipersist, diproses worker lokal di belakang layar."""
+    __tablename__ = "ingest_jobs"
+    id = Column(String(32), primary_key=True, index=True)  # uuid4 hex
+    status = Column(String(20), index=True, default="queued")  # queued | running | done | failed
+    filename = Column(String(255), nullable=True)
+    mime_type = Column(String(100), nullable=False)
+    file_hash = Column(String(100), index=True, nullable=True)
+    spool_path = Column(Text, nullable=False)
+    options = Column(Text, nullable=True)  # JSON: override field dari form upload
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"), nullable=True, index=True)
+    result = Column(Text, nullable=True)  # JSON: payload respons upload bila sukses
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String(64), nullable=True)  # worker yang mengklaim job (host:pid:antrean)
+    heartbeat_at = Column(DateTime, nullable=True)  # diperbarui berkala selama 'running' (lease)
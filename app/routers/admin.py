@@ -0,0 +1,32 @@
+"""
+Endpoint admin (butuh token bearer dengan role 'admin').
+
+POST /admin/model/reload -> muat ulang model classifier ML dari file tanpa restart
+  { reloaded, changed, previous_version, active: { version, loaded_at, load_seconds, ... }, error }
+  (reloaded=false + error: file baru gagal dimuat, versi lama tetap aktif)
+
+Reload hanya berlaku di proses yang menerima request; dengan banyak worker, tiap worker
+juga mengambil file baru lewat pemantauan file (`ML_MODEL_WATCH_INTERVAL`).
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.routers.auth import require_admin
+from app.services.model_registry import model_registry
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/model/reload", summary="Reload ML classifier model")
+async def reload_model():
+    previous = model_registry.current
+    loaded = await run_in_threadpool(model_registry.reload)
+    if loaded is None:
+        raise HTTPException(status_code=503, detail=f"Model tidak dapat dimuat: {model_registry.error}")
+    return {
+        "reloaded": loaded is not previous,
+        "changed": previous is None or previous.version != loaded.version,
+        "previous_version": previous.version if previous else None,
+        "active": loaded.as_dict(),
+        "error": model_registry.error,
+    }
@@ -2,58 +2,49 @@
 """
 Health endpoints (OCR health check).
 
-GET /healthz/ocr -> { ocr: bool, details: { pytesseract, pymupdf, tesseract_cmd, tesseract_cmd_exists, tesseract_version }}
+GET /healthz/ocr -> { ocr: bool, details: { pytesseract, pymupdf, tesseract_cmd, tesseract_cmd_exists, tesseract_version, languages, ... }, cache: {...} }
+GET /healthz/ingest -> { lanes: { fast: {...}, slow: {...} }, ocr_pages: { cap, in_use, waiting, ... } }
+GET /healthz/model -> { loaded, active: { version, loaded_at, load_seconds, ... }, loads, failures, error, ... }
+
+Detail diambil dari probe kemampuan OCR yang di-cache (`ocr_capabilities`, dijalankan
+saat startup & di-refresh berkala), bukan import modul / `tesseract --version` per request.
 """
 from fastapi import APIRouter
-import os
-from app.config import settings
+from app.services.model_registry import model_registry
+from app.services.ocr_cache import ocr_page_cache
+from app.services.ocr_capabilities import ocr_capabilities
+from app.services.scheduler import extraction_scheduler
 
 router = APIRouter()
 
 
 @router.get("/healthz/ocr", summary="OCR health check", tags=["Root"])
 def ocr_health():
-    details = {}
+    caps = ocr_capabilities.current
 
-    # Modules availability
-    try:
-        import pytesseract
-        details["pytesseract"] = True
-    except Exception:
-        pytesseract = None
-        details["pytesseract"] = False
+    details = caps.as_dict()
+    # Kunci lama tetap ada untuk kompatibilitas klien
+    details["Pillow"] = details.pop("pillow")
+    if caps.error:
+        details["tesseract_error"] = caps.error
 
+    # Statistik cache OCR per halaman (hit/miss/eviction, ukuran)
     try:
-        import fitz
-        details["pymupdf"] = True
-    except Exception:
-        fitz = None
-        details["pymupdf"] = False
+        cache = ocr_page_cache.stats()
+    except Exception as e:
+        cache = {"error": str(e)}
 
-    try:
-        from PIL import Image
-        details["Pillow"] = True
-    except Exception:
-        details["Pillow"] = False
-
-    # Config path
-    tcmd = settings.TESSERACT_CMD
-    details["tesseract_cmd"] = tcmd
-    details["tesseract_cmd_exists"] = bool(tcmd and os.path.exists(str(tcmd)))
-
-    # Try to get version if pytesseract available and tesseract present
-    tver = None
-    if details["pytesseract"]:
-        try:
-            if tcmd:
-                pytesseract.pytesseract.tesseract_cmd = str(tcmd)
-            tver = str(pytesseract.get_tesseract_version())
-        except Exception as e:
-            tver = None
-            details["tesseract_error"] = str(e)
-    details["tesseract_version"] = tver
-
-    # Determine overall OCR availability
-    ocr_ok = details.get("pytesseract") and details.get("pymupdf") and details.get("tesseract_cmd_exists")
-
-    return {"ocr": bool(ocr_ok), "details": details}
\ No newline at end of file
+    return {"ocr": caps.ocr, "details": details, "cache": cache}
+
+
+@router.get("/healthz/ingest", summary="Ingest lanes & OCR page budget", tags=["Root"])
+def ingest_health():
+    """Kedalaman antrean, pekerjaan berjalan & waktu tunggu per jalur (fast/slow), plus
+    pemakaian slot halaman OCR global."""
+    return extraction_scheduler.metrics()
+
+
+@router.get("/healthz/model", summary="Active ML classifier model", tags=["Root"])
+def model_health():
+    """Versi model classifier yang aktif di proses ini, waktu & durasi muat, error terakhir."""
+    return model_registry.stats()
@@ -0,0 +1,35 @@
+"""
+Status job ingest asinkron (dibuat oleh POST /upload/ dengan async_mode).
+
+GET /jobs/{job_id} -> { id, status: queued|running|done|failed, document_id, error, result, ... }
+"""
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.dependencies import get_db
+from app.models import IngestJob
+from app.schemas import IngestJobRead
+
+router = APIRouter(prefix="/jobs", tags=["Upload"])
+
+
+@router.get("/{job_id}", response_model=IngestJobRead, summary="Status job ingest asinkron")
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return IngestJobRead(
+        id=job.id,
+        status=job.status,
+        filename=job.filename,
+        mime_type=job.mime_type,
+        document_id=job.document_id,
+        error=job.error,
+        result=json.loads(job.result) if job.result else None,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
@@ -1,61 +1,74 @@
 
 # app/routers/upload.py
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
-from pathlib import Path
-import hashlib
-import json
-import re
+from typing import List
+import zipfile
 from pydantic import BaseModel
 
 from app.dependencies import get_db
 from app.config import settings
-from app.models import Document
-from app.services.text_extraction import extract_text_and_save
-from app.services.metadata import parse_metadata
-from app.utils.slugs import slugify_nomor
-from app.constants import METADATA_FILENAME, TEXT_FILENAME
+from app.services.batch import (
+    BatchItem,
+    BatchTooLargeError,
+    discard_spooled,
+    expand_zip,
+    mime_for_filename,
+    process_batch,
+)
+from app.services.analysis_cache import AnalysisResult, analysis_cache
+from app.services.ingest import (
+    analysis_fn,
+    cached_analysis,
+    failed_analysis,
+    find_duplicate,
+    schedule_text_completion,
+    store_document,
+    text_is_complete,
+)
+from app.services.sandbox import SandboxError
+from app.services.scheduler import extraction_scheduler
+from app.services.jobs import job_queue
+from app.utils.fileops import SpooledUpload, spool_upload
+from app.utils.hash import FileTooLargeError
 
 router = APIRouter()
 
-from app.constants import ALLOWED_MIME
+from app.constants import (
+    ALLOWED_MIME,
+    MAX_BATCH_FILES,
+    MAX_BATCH_UPLOAD_SIZE,
+    MAX_PREDICT_BATCH,
+    MAX_UPLOAD_SIZE,
+    ZIP_MIME_TYPES,
+)
 
 
 class PredictRequest(BaseModel):
     text: str
     jenis_hint: str | None = None
 
-# Use `slugify_nomor` from `app.utils.slugs` for nomor normalization
 
-# Helper function to extract month name from tanggal_surat
-def extract_bulan(tanggal_surat: str | None) -> str | None:
-    """Extract Indonesian month name from tanggal_surat string."""
-    if not tanggal_surat:
-        return None
-    
-    MONTHS = [
-        "Januari", "Februari", "Maret", "April", "Mei", "Juni",
-        "Juli", "Agustus", "September", "Oktober", "November", "Desember"
-    ]
-    MONTHS_EN = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December"
-    ]
-    
-    tanggal_lower = tanggal_surat.lower()
-    
-    # Check Indonesian months
-    for month in MONTHS:
-        if month.lower() in tanggal_lower:
-            return month
-    
-    # Check English months and convert to Indonesian
-    for i, month_en in enumerate(MONTHS_EN):
-        if month_en.lower() in tanggal_lower:
-            return MONTHS[i]
-    
-    return None
+class PredictBatchRequest(BaseModel):
+    texts: List[str]
+
+
+async def _spool_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_SIZE) -> SpooledUpload:
+    """
+    Salin file upload ke spool sambil menghitung SHA-256 (per chunk, tanpa memuat seluruh isi ke memori).
+
+    Catatan: Starlette sudah menerima seluruh part ke `SpooledTemporaryFile` sebelum handler jalan;
+    `max_bytes` di sini hanya batas per file. Body yang terlalu besar ditolak lebih awal oleh
+    `BodySizeLimitMiddleware` (app.utils.request_limit) sebelum multipart di-parse.
+    """
+    try:
+        return await run_in_threadpool(spool_upload, file.file, max_bytes=max_bytes)
+    except FileTooLargeError:
+        raise HTTPException(status_code=413, detail=f"File terlalu besar (max {max_bytes / (1024*1024):.0f} MB)")
+
 
 @router.post("/upload/", summary="Unggah DOCX/PDF (auto kategori tahun & jenis)", tags=["Upload"])
 async def upload_document(
@@ -68,6 +81,7 @@ async def upload_document(
     tanggal_surat: str | None = Form(None),    # opsional: auto
     pengirim: str | None = Form(None),
     penerima: str | None = Form(None),
+    async_mode: bool | None = Form(None),      # opsional: default dari settings.ASYNC_INGEST
     db: Session = Depends(get_db),
 ):
     # --- Validasi MIME ---
@@ -75,159 +89,139 @@ async def upload_document(
     if not ext:
         raise HTTPException(status_code=415, detail="Only DOCX/PDF allowed")
 
-    # --- Baca file & hash ---
-    content = await file.read()
-    size_bytes = len(content)
-    
-    # --- Validasi ukuran file ---
-    from app.constants import MAX_UPLOAD_SIZE
-    if size_bytes > MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=413, detail=f"File terlalu besar (max {MAX_UPLOAD_SIZE / (1024*1024):.0f} MB)")
-    
-    sha256 = hashlib.sha256(content).hexdigest()
+    # --- Salin file ke spool sambil hash (batas per file; body request dibatasi middleware) ---
+    spooled = await _spool_upload(file)
+    sha256 = spooled.sha256
 
-    # --- Cek duplikasi by hash ---
-    existing = db.query(Document).filter(Document.file_hash == sha256).first()
-    if existing:
+    # --- Cek duplikasi by hash (query DB, di threadpool) ---
+    if await run_in_threadpool(find_duplicate, db, sha256):
+        spooled.path.unlink(missing_ok=True)
         raise HTTPException(status_code=409, detail="File yang sama sudah pernah diunggah (hash duplikat)")
 
+    overrides = {
+        "tahun": tahun,
+        "jenis": jenis,
+        "nomor": nomor,
+        "perihal": perihal,
+        "tanggal_surat": tanggal_surat,
+        "pengirim": pengirim,
+        "penerima": penerima,
+    }
+
+    # --- Mode asinkron: persist + job, diproses worker (pindah file + commit, di threadpool) ---
+    if async_mode if async_mode is not None else settings.ASYNC_INGEST:
+        job = await run_in_threadpool(
+            job_queue.enqueue,
+            db,
+            spooled,
+            mime_type=file.content_type,
+            filename=file.filename,
+            overrides=overrides,
+        )
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/jobs/{job.id}",
+                "hash": f"sha256:{sha256}",
+            },
+        )
+
+    # --- Mode sinkron: ekstraksi & parse di executor (tidak memblokir event loop) ---
     now_utc = datetime.utcnow()
+    extraction_error = None
+    try:
+        # Pakai hasil /upload/analyze sebelumnya bila file yang sama masih di cache
+        analysis = await run_in_threadpool(cached_analysis, sha256, file.filename, now_utc)
+        if analysis is None:
+            # Jalur cepat (DOCX/PDF native) atau lambat (perlu OCR), lihat app.services.scheduler
+            try:
+                analysis = await extraction_scheduler.run_analysis(
+                    analysis_fn(), spooled.path, file.content_type, file.filename, now_utc
+                )
+            except SandboxError as e:
+                # Timeout / batas memori di worker sandbox: simpan tanpa teks, catat alasannya
+                extraction_error = str(e)
+                analysis = failed_analysis(e, file.filename, now_utc)
+        text_content, ocr_used, parsed, pages = analysis
+        # Mode header-first: baru halaman pertama yang di-OCR, sisanya dilengkapi di background
+        text_complete = text_is_complete(ocr_used, pages) and not extraction_error
 
-    # --- Ekstrak teks di folder temp ---
-    temp_dir: Path = settings.TEMP_UPLOAD_PATH
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    text_path, text_content, ocr_used = extract_text_and_save(
-        content=content,
-        mime_type=file.content_type,
-        base_dir=temp_dir,
-    )
+        # --- Foldering, pindahkan file & simpan ke SQLite (I/O, di threadpool) ---
+        result = await run_in_threadpool(
+            store_document,
+            db,
+            source_path=spooled.path,
+            mime_type=file.content_type,
+            filename=file.filename,
+            sha256=sha256,
+            size_bytes=spooled.size_bytes,
+            text_content=text_content,
+            ocr_used=ocr_used,
+            parsed=parsed,
+            overrides=overrides,
+            uploaded_at=now_utc,
+            text_complete=text_complete,
+            pages=pages,
+            extraction_error=extraction_error,
+        )
+        analysis_cache.discard(sha256)
+        if not text_complete and not extraction_error:
+            schedule_text_completion(result["stored_path"], result["metadata_path"], file.content_type)
+        return result
+    finally:
+        # Spool sudah dipindah ke arsip bila sukses; sisa file hanya ada bila gagal
+        spooled.path.unlink(missing_ok=True)
 
-    # --- Parse metadata dari teks + nama file ---
-    parsed = parse_metadata(text_content or "", file.filename, uploaded_at=now_utc)
 
-    # --- Tentukan nilai final (input menang jika diisi) ---
-    nomor_final = (nomor or parsed.get("nomor")) or "TANPA-NOMOR"
-    perihal_final = (perihal or parsed.get("perihal")) or "Tidak ada perihal"
-    tanggal_final = tanggal_surat or parsed.get("tanggal_surat")
-    
-    # Extract bulan (month) from tanggal_surat for categorization
-    bulan_final = extract_bulan(tanggal_final)
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ZIP_MIME_TYPES or (file.filename or "").lower().endswith(".zip")
 
-    # Tahun: prefer nilai input yang valid (positive int). Jika input kosong/0, fallback ke parsed.
-    # Jika tidak terdeteksi, biarkan None untuk disimpan di luar folder tahun.
-    try:
-        if tahun and int(tahun) > 0:
-            tahun_final = int(tahun)
-        else:
-            tahun_final = parsed.get("tahun")
-
-        # Pastikan tahun_final valid (positive integer). Jika tidak ada, set None.
-        if tahun_final is None or int(tahun_final) <= 0:
-            tahun_final = None  # Document will be stored directly in jenis folder
-        else:
-            tahun_final = int(tahun_final)
-    except (ValueError, TypeError):
-        # Jika parsing gagal, set None
-        tahun_final = None
-
-    # Jenis: input -> parsed -> fallback kecil -> default 'keluar'
-    jenis_final = jenis or parsed.get("jenis")
-    if jenis_final is None:
-        if re.search(r"(?i)(?:^|/|[-_])SM(?:/|[-_]|$)", nomor_final):
-            jenis_final = "masuk"
-        elif re.search(r"(?i)(?:^|/|[-_])SK(?:/|[-_]|$)", nomor_final):
-            jenis_final = "keluar"
-    if jenis_final not in {"masuk", "keluar"}:
-        jenis_final = "keluar"
-
-    # --- Foldering: different structure for invalid docs ---
-    slug = slugify_nomor(nomor_final)
-    if tahun_final and bulan_final:
-        # Valid document: store in tahun/jenis/slug structure
-        base_dir: Path = settings.STORAGE_ROOT_DIR / str(tahun_final) / jenis_final / slug
-    else:
-        # Invalid document (no tahun or bulan): store directly in jenis/slug
-        base_dir: Path = settings.STORAGE_ROOT_DIR / jenis_final / slug
-    base_dir.mkdir(parents=True, exist_ok=True)
-
-    # --- Simpan file asli ---
-    original_name = f"original.{ext}"
-    original_path = base_dir / original_name
-    original_path.write_bytes(content)
-
-    # --- Simpan text.txt (kalau ada) ---
-    final_text_path = None
-    if text_content:
-        final_text_path = base_dir / TEXT_FILENAME
-        final_text_path.write_text(text_content, encoding="utf-8")
-
-    # --- Siapkan metadata.json ---
-    metadata_path = base_dir / METADATA_FILENAME
-    metadata = {
-        "uploaded_at": now_utc.isoformat() + "Z",
-        "file_original": original_name,
-        "mime_type": file.content_type,
-        "size_bytes": size_bytes,
-        "hash_sha256": sha256,
-        "ocr_enabled": bool(settings.TESSERACT_CMD) or ocr_used,
-        "text_path": final_text_path.as_posix() if final_text_path else None,
-        "source_filename": file.filename,
-    }
-    metadata.update({
-        "tahun": tahun_final,
-        "jenis": jenis_final,
-        "nomor": nomor_final,
-        "perihal": perihal_final,
-        "tanggal_surat": tanggal_final,
-        "pengirim": pengirim or parsed.get("pengirim"),
-        "penerima": penerima or parsed.get("penerima"),
-        "parsed": parsed,
-    })
-    metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # --- Simpan ke SQLite ---
-    doc = Document(
-        tahun=tahun_final,
-        jenis=jenis_final,
-        nomor_surat=nomor_final,
-        perihal=perihal_final,
-        tanggal_surat=tanggal_final,
-        bulan=bulan_final,
-        pengirim=metadata["pengirim"],
-        penerima=metadata["penerima"],
-        stored_path=original_path.as_posix(),
-        metadata_path=metadata_path.as_posix().replace("\\", "/"),
-        uploaded_at=now_utc,
-        mime_type=file.content_type,
-        file_hash=sha256,
-        ocr_enabled=metadata["ocr_enabled"],
-    )
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
 
-    # --- Bersihkan file text temp (best-effort) ---
+@router.post("/upload/batch", summary="Unggah banyak DOCX/PDF atau satu ZIP sekaligus", tags=["Upload"])
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+):
+    items: List[BatchItem] = []
     try:
-        if text_path: text_path.unlink(missing_ok=True)
-    except Exception:
-        pass
+        for f in files:
+            if _is_zip(f):
+                # ZIP di-spool dulu, lalu member PDF/DOCX di-stream satu per satu
+                spooled_zip = await _spool_upload(f, max_bytes=MAX_BATCH_UPLOAD_SIZE)
+                try:
+                    items.extend(await run_in_threadpool(expand_zip, spooled_zip.path, MAX_BATCH_FILES - len(items)))
+                except zipfile.BadZipFile:
+                    items.append(BatchItem(filename=f.filename, error="Invalid ZIP file"))
+                finally:
+                    spooled_zip.path.unlink(missing_ok=True)
+                continue
 
-    # --- Respons ---
-    return {
-        "id": doc.id,
-        "message": "uploaded",
-        "tahun": tahun_final,
-        "jenis": jenis_final,
-        "nomor": nomor_final,               # legacy key (backward compatibility)
-        "nomor_surat": nomor_final,        # canonical key
-        "perihal": perihal_final,
-        "stored_path": doc.stored_path,
-        "metadata_path": doc.metadata_path,
-        "mime_type": file.content_type,
-        "size": size_bytes,
-        "hash": f"sha256:{sha256}",
-        "parsed": parsed,
-    }
+            if len(items) >= MAX_BATCH_FILES:
+                raise BatchTooLargeError(f"Batch melebihi {MAX_BATCH_FILES} file")
+
+            mime = f.content_type if f.content_type in ALLOWED_MIME else mime_for_filename(f.filename or "")
+            if not mime:
+                items.append(BatchItem(filename=f.filename, error="Only DOCX/PDF allowed"))
+                continue
+            try:
+                upload = await run_in_threadpool(spool_upload, f.file, max_bytes=MAX_UPLOAD_SIZE)
+            except FileTooLargeError:
+                items.append(BatchItem(filename=f.filename, mime_type=mime, error="File terlalu besar"))
+                continue
+            items.append(BatchItem(filename=f.filename, mime_type=mime, upload=upload))
+    except BatchTooLargeError as e:
+        discard_spooled(items)
+        raise HTTPException(status_code=413, detail=str(e))
+    except BaseException:
+        # ZIP rusak/terenkripsi, error I/O, client putus: spool yang belum diserahkan ke
+        # process_batch tidak boleh tertinggal
+        discard_spooled(items)
+        raise
+
+    # --- Ekstraksi paralel di executor, commit per batch (di threadpool) ---
+    return await run_in_threadpool(process_batch, db, items)
 
 
 @router.post("/upload/analyze", summary="Analyze file metadata without saving", tags=["Upload"])
@@ -239,29 +233,24 @@ async def analyze_document(
     if not ext:
         raise HTTPException(status_code=415, detail="Only DOCX/PDF allowed")
 
-    # --- Baca content ---
-    content = await file.read()
-    
-    # --- Estrak Teks (Temp) ---
-    temp_dir: Path = settings.TEMP_UPLOAD_PATH
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    # --- Stream ke spool ---
+    spooled = await _spool_upload(file)
     
-    # Gunakan extract_text_and_save tapi kita hapus hasilnya nanti
-    text_path, text_content, ocr_used = extract_text_and_save(
-        content=content,
-        mime_type=file.content_type,
-        base_dir=temp_dir,
-    )
-    
-    # --- Parse Metadata ---
-    parsed = parse_metadata(text_content or "", file.filename, uploaded_at=datetime.utcnow())
-    
-    # Clean up temp text file immediately
+    # --- Ekstrak teks & parse metadata di executor, lalu buang file spool ---
     try:
-        if text_path and text_path.exists():
-            text_path.unlink()
-    except Exception:
-        pass
+        text_content, ocr_used, parsed, pages = await extraction_scheduler.run_analysis(
+            analysis_fn(), spooled.path, file.content_type, file.filename, datetime.utcnow()
+        )
+    except SandboxError as e:
+        raise HTTPException(status_code=422, detail=f"Ekstraksi teks gagal: {e}")
+    finally:
+        spooled.path.unlink(missing_ok=True)
+
+    # --- Simpan ke cache agar /upload/ dengan file yang sama tidak ekstraksi ulang ---
+    analysis_cache.put(
+        spooled.sha256,
+        AnalysisResult(text_content=text_content, ocr_used=ocr_used, parsed=parsed, filename=file.filename, pages=pages),
+    )
         
     return {
         "filename": file.filename,
@@ -271,6 +260,14 @@ async def analyze_document(
     }
 
 
+def _prediction(jenis: str, confidence: float) -> dict:
+    return {
+        "predicted_jenis": jenis,
+        "confidence": confidence,
+        "method": "ml" if confidence > 0.7 else "rule-based"
+    }
+
+
 @router.post("/predict-jenis")
 async def predict_jenis(request: PredictRequest):
     """Predict document type (masuk/keluar) using ML classifier or rules."""
@@ -278,10 +275,26 @@ async def predict_jenis(request: PredictRequest):
     
     try:
         jenis, confidence = classify(request.text)
-        return {
-            "predicted_jenis": jenis,
-            "confidence": confidence,
-            "method": "ml" if confidence > 0.7 else "rule-based"
-        }
+        return _prediction(jenis, confidence)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Classification error: {str(e)}")
+
+
+@router.post("/predict-jenis/batch")
+async def predict_jenis_batch(request: PredictBatchRequest):
+    """
+    Predict jenis untuk banyak teks sekaligus: semua teks divektorisasi dalam satu
+    matriks sparse dan diklasifikasi dengan satu panggilan model (urutan hasil = urutan `texts`).
+    """
+    from app.services.classifier_ml import classify_batch
+
+    if len(request.texts) > MAX_PREDICT_BATCH:
+        raise HTTPException(status_code=413, detail=f"Terlalu banyak teks (max {MAX_PREDICT_BATCH} per request)")
+    try:
+        results = await run_in_threadpool(classify_batch, request.texts)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Classification error: {str(e)}")
+    return {
+        "count": len(results),
+        "results": [_prediction(jenis, confidence) for jenis, confidence in results],
+    }
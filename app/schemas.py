@@ -40,3 +40,16 @@ class SearchQuery(BaseModel):
     jenis: Optional[str] = None
     nomor_surat: Optional[str] = None
     perihal: Optional[str] = None
+
+class IngestJobRead(BaseModel):
+    """Status job ingest asinkron (GET /jobs/{id})."""
+    id: str
+    status: str
+    filename: Optional[str] = None
+    mime_type: str
+    document_id: Optional[int] = None
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
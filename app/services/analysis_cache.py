@@ -0,0 +1,111 @@
+"""
+Cache hasil analisis (teks hasil ekstraksi/OCR + metadata parse) per SHA-256 isi file.
+
+Alur frontend: `/upload/analyze` (preview metadata) lalu `/upload/` dengan file yang sama.
+`analyze_document` mengisi cache, `upload_document` (dan worker job) memakainya
+sehingga ekstraksi/OCR tidak dijalankan dua kali.
+
+Cache bersifat in-memory per proses, dengan TTL dan batas jumlah entri & total ukuran
+teks (eviction LRU).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+
+@dataclass
+class AnalysisResult:
+    text_content: str
+    ocr_used: bool
+    parsed: Dict
+    filename: Optional[str] = None
+    pages: Optional[List[Dict]] = None  # keputusan native/OCR per halaman PDF
+    created_at: float = 0.0  # diisi saat put()
+
+    @property
+    def size(self) -> int:
+        return len((self.text_content or "").encode("utf-8"))
+
+
+class AnalysisCache:
+    """LRU thread-safe dengan TTL dan batas ukuran."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.ANALYSIS_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else settings.ANALYSIS_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ANALYSIS_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _expired(self, entry: AnalysisResult) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def get(self, sha256: str) -> Optional[AnalysisResult]:
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    self._remove(sha256)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha256)
+            self.hits += 1
+            return entry
+
+    def put(self, sha256: str, result: AnalysisResult) -> None:
+        if not self.enabled or result.size > self.max_bytes:
+            return
+        result.created_at = time.monotonic()
+        with self._lock:
+            self._remove(sha256)
+            self._entries[sha256] = result
+            self._bytes += result.size
+            # Buang entri kedaluwarsa lalu LRU sampai di bawah batas
+            for key in [k for k, e in self._entries.items() if self._expired(e)]:
+                self._remove(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, sha256: str) -> None:
+        with self._lock:
+            self._remove(sha256)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Cache default yang dipakai router upload & worker job
+analysis_cache = AnalysisCache()
@@ -0,0 +1,238 @@
+"""
+Batch ingest: banyak file atau satu ZIP dalam satu request.
+
+Alur per batch:
+1. Setiap file (atau member ZIP) di-stream ke spool sambil di-hash.
+2. Duplikat (di DB maupun di dalam batch) disaring dengan satu query hash.
+3. Tahap CPU-bound memakai entry point yang sama dengan `/upload/`: hasil `/upload/analyze`
+   di cache (`cached_analysis`) dipakai ulang, sisanya `analysis_fn()` (header-first bila
+   OCR_HEADER_FIRST) disebar ke `extraction_scheduler` sehingga throughput mengikuti jumlah
+   core (pakai INGEST_EXECUTOR=process untuk PDF native/OCR); file scan masuk jalur OCR dan
+   tidak menahan DOCX/PDF native di batch lain. Teks yang belum lengkap (header-first)
+   dilengkapi di background setelah commit.
+4. Hasil disimpan lewat `store_document` di dalam SAVEPOINT per item (item yang gagal
+   di-rollback sendiri tanpa membatalkan item lain) dan di-commit per `BATCH_COMMIT_SIZE`
+   baris. Bila commit gagal, file arsip item-item tersebut dihapus lagi. Nomor yang sama
+   di dalam batch (atau yang sudah ada di arsip) mendapat folder bersufiks sha256.
+
+Hasilnya laporan per file: uploaded / duplicate / failed. Ekstraksi yang gagal di worker
+sandbox (timeout/memori) tetap tersimpan sebagai uploaded dengan `extraction_error`.
+"""
+
+import logging
+import zipfile
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.constants import ALLOWED_MIME, BATCH_COMMIT_SIZE, MAX_BATCH_FILES, MAX_UPLOAD_SIZE
+from app.database import savepoint
+from app.models import Document
+from app.services.scheduler import extraction_scheduler
+from app.services.analysis_cache import analysis_cache
+from app.services.ingest import (
+    analysis_fn,
+    cached_analysis,
+    failed_analysis,
+    remove_stored_files,
+    schedule_text_completion,
+    store_document,
+    text_is_complete,
+)
+from app.services.sandbox import SandboxError
+from app.utils.fileops import SpooledUpload, spool_upload
+from app.utils.hash import FileTooLargeError
+
+log = logging.getLogger(__name__)
+
+MIME_BY_EXT = {f".{ext}": mime for mime, ext in ALLOWED_MIME.items()}
+
+
+class BatchTooLargeError(ValueError):
+    """Jumlah file dalam batch melebihi `MAX_BATCH_FILES`."""
+
+
+@dataclass
+class BatchItem:
+    filename: str
+    mime_type: Optional[str] = None
+    upload: Optional[SpooledUpload] = None
+    error: Optional[str] = None
+
+
+def mime_for_filename(filename: str) -> Optional[str]:
+    return MIME_BY_EXT.get(Path(filename).suffix.lower())
+
+
+def discard_spooled(items: List[BatchItem]) -> None:
+    """Hapus file spool item yang belum diserahkan ke `process_batch`."""
+    for item in items:
+        if item.upload:
+            item.upload.path.unlink(missing_ok=True)
+
+
+def expand_zip(zip_path: Path, max_files: int = MAX_BATCH_FILES) -> List[BatchItem]:
+    """Stream setiap member DOCX/PDF dari ZIP ke spool (tanpa extractall ke memori)."""
+    items: List[BatchItem] = []
+    with zipfile.ZipFile(zip_path) as zf:
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and not Path(info.filename).name.startswith(".")
+            and "__MACOSX" not in Path(info.filename).parts
+        ]
+        if len(members) > max_files:
+            raise BatchTooLargeError(f"ZIP berisi {len(members)} file (max {max_files})")
+
+        try:
+            for info in members:
+                name = Path(info.filename).name
+                mime = mime_for_filename(name)
+                if not mime:
+                    items.append(BatchItem(filename=name, error="Only DOCX/PDF allowed"))
+                    continue
+                if info.file_size > MAX_UPLOAD_SIZE:
+                    items.append(BatchItem(filename=name, mime_type=mime, error="File terlalu besar"))
+                    continue
+                try:
+                    with zf.open(info) as src:
+                        upload = spool_upload(src, max_bytes=MAX_UPLOAD_SIZE)
+                    items.append(BatchItem(filename=name, mime_type=mime, upload=upload))
+                except FileTooLargeError:
+                    items.append(BatchItem(filename=name, mime_type=mime, error="File terlalu besar"))
+                except Exception as e:
+                    items.append(BatchItem(filename=name, mime_type=mime, error=f"ZIP member unreadable: {e}"))
+        except BaseException:
+            discard_spooled(items)
+            raise
+    return items
+
+
+def _existing_hashes(db: Session, hashes: List[str], chunk: int = 500) -> set:
+    found = set()
+    for i in range(0, len(hashes), chunk):
+        rows = db.query(Document.file_hash).filter(Document.file_hash.in_(hashes[i:i + chunk])).all()
+        found.update(h for (h,) in rows)
+    return found
+
+
+def process_batch(
+    db: Session,
+    items: List[BatchItem],
+    uploaded_at: Optional[datetime] = None,
+    commit_every: int = BATCH_COMMIT_SIZE,
+) -> Dict:
+    """Proses semua item batch secara paralel dan kembalikan laporan per file."""
+    now_utc = uploaded_at or datetime.utcnow()
+    results: List[Dict] = [{"filename": item.filename} for item in items]
+
+    # --- Saring item gagal & duplikat (DB + di dalam batch) ---
+    hashes = [item.upload.sha256 for item in items if item.upload]
+    existing = _existing_hashes(db, hashes)
+    seen = set()
+    todo = []
+    for idx, item in enumerate(items):
+        if item.error or not item.upload:
+            results[idx].update(status="failed", error=item.error or "Upload gagal")
+        elif item.upload.sha256 in existing or item.upload.sha256 in seen:
+            results[idx].update(status="duplicate", hash=f"sha256:{item.upload.sha256}")
+        else:
+            seen.add(item.upload.sha256)
+            todo.append(idx)
+
+    try:
+        # --- Fan-out tahap CPU-bound ke executor (hasil /upload/analyze di cache dipakai ulang) ---
+        fn = analysis_fn()
+        futures: Dict[Future, int] = {}
+        for idx in todo:
+            item = items[idx]
+            cached = cached_analysis(item.upload.sha256, item.filename, now_utc)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            else:
+                future = extraction_scheduler.submit_analysis(fn, item.upload.path, item.mime_type, item.filename, now_utc)
+            futures[future] = idx
+
+        pending: Dict[int, Dict] = {}  # idx -> hasil store_document yang belum di-commit
+
+        def _commit():
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                log.error(f"Batch commit failed: {e}", exc_info=True)
+                for i, stored in pending.items():
+                    remove_stored_files(stored)
+                    results[i] = {"filename": items[i].filename, "status": "failed", "error": f"DB commit failed: {e}"}
+            else:
+                for i, stored in pending.items():
+                    # Sama seperti /upload/: hash tersimpan -> entri cache tidak berguna lagi
+                    analysis_cache.discard(items[i].upload.sha256)
+                    if not stored["text_complete"] and not stored.get("extraction_error"):
+                        schedule_text_completion(stored["stored_path"], stored["metadata_path"], items[i].mime_type)
+            pending.clear()
+
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            item = items[idx]
+            extraction_error = None
+            try:
+                try:
+                    text_content, ocr_used, parsed, pages = fut.result()
+                except SandboxError as e:
+                    extraction_error = str(e)
+                    text_content, ocr_used, parsed, pages = failed_analysis(e, item.filename, now_utc)
+                text_complete = text_is_complete(ocr_used, pages) and not extraction_error
+                with savepoint(db):
+                    stored = store_document(
+                        db,
+                        source_path=item.upload.path,
+                        mime_type=item.mime_type,
+                        filename=item.filename,
+                        sha256=item.upload.sha256,
+                        size_bytes=item.upload.size_bytes,
+                        text_content=text_content,
+                        ocr_used=ocr_used,
+                        parsed=parsed,
+                        uploaded_at=now_utc,
+                        commit=False,
+                        text_complete=text_complete,
+                        pages=pages,
+                        extraction_error=extraction_error,
+                        unique_folder=True,
+                    )
+            except Exception as e:
+                log.warning(f"Batch item {item.filename} failed: {e}")
+                results[idx].update(status="failed", error=str(e) or e.__class__.__name__)
+                continue
+
+            results[idx].update(
+                status="uploaded",
+                id=stored["id"],
+                nomor_surat=stored["nomor_surat"],
+                perihal=stored["perihal"],
+                tahun=stored["tahun"],
+                jenis=stored["jenis"],
+                hash=stored["hash"],
+            )
+            if extraction_error:
+                results[idx]["extraction_error"] = extraction_error
+            pending[idx] = stored
+            if len(pending) >= commit_every:
+                _commit()
+
+        if pending:
+            _commit()
+    finally:
+        # Spool yang tidak dipindah ke arsip (duplikat/gagal) dibersihkan
+        for item in items:
+            if item.upload:
+                item.upload.path.unlink(missing_ok=True)
+
+    summary = {status: sum(1 for r in results if r.get("status") == status) for status in ("uploaded", "duplicate", "failed")}
+    return {"total": len(items), **summary, "results": results}
@@ -5,54 +5,39 @@ Support ML model (jika tersedia) atau fallback ke rule-based.
 """
 
 import logging
-import re
-from typing import Tuple
-from pathlib import Path
+from typing import Any, List, Sequence, Tuple
+
+from app.services import rules
+from app.services.model_registry import model_registry
 
 log = logging.getLogger(__name__)
 
-# Try to load ML model if available
-ML_MODEL = None
-try:
-    import joblib
-    model_path = Path(__file__).parent.parent.parent / "data" / "classifier_model.pkl"
-    if model_path.exists():
-        ML_MODEL = joblib.load(model_path)
-        log.info(f"✅ ML classifier loaded from {model_path}")
-except Exception as e:
-    log.warning(f"⚠️  ML model not available, using rule-based: {e}")
-
-# Rule-based fallback keywords
-KEYWORDS_KELUAR = [
-    "kepada yth", "kepada yang terhormat", "yang terhormat", "di tempat",
-    "surat keputusan", "surat tugas", "surat perintah"
-]
-KEYWORDS_MASUK = [
-    "dari", "pengirim", "diterima", "stempel masuk", "permohonan", "undangan"
-]
-
-# Pola internal instansi (indikasi surat keluar)
-INTERNAL_PATTERNS = [
-    r"\bKelurahan\s+Pela\s+Mampang\b", 
-    r"\bKecamatan\s+Mampang\s+Prapatan\b",
-    r"\bLurah\s+Pela\s+Mampang\b"
-]
+# Model ML dimuat saat pertama dipakai lewat `model_registry` (bukan saat import) dan bisa
+# diganti tanpa restart; tiap panggilan memakai satu snapshot model dari awal sampai akhir.
+
+# Aturan fallback (kata kunci, pola internal instansi) ada di data/classification_rules.json,
+# lihat app.services.rules. Set pemecah skor seri: ada salam 'kepada yth' -> keluar
+TIE_BREAK_SET = "salam_keluar"
+
+
+def _predict(model: Any, texts: List[str]) -> List[Tuple[str, float]]:
+    """Label & confidence dari satu panggilan `predict_proba` (argmax == `predict`)."""
+    proba = model.predict_proba(texts)
+    classes = model.classes_
+    best = proba.argmax(axis=1)
+    return [
+        ("keluar" if classes[i] == "keluar" else "masuk", float(row[i]))
+        for i, row in zip(best, proba)
+    ]
 
 
 def classify_ml(text: str) -> Tuple[str, float]:
     """
-    Classify using ML model.
+    Classify using ML model (satu pass TF-IDF: label diambil dari `predict_proba`).
     Returns: (jenis, confidence)
     """
     try:
-        prediction = ML_MODEL.predict([text])[0]
-        proba = ML_MODEL.predict_proba([text])[0]
-        confidence = max(proba)
-        
-        # Convert to our format
-        jenis = "keluar" if prediction == "keluar" else "masuk"
-        
-        return jenis, float(confidence)
+        return _predict(model_registry.model, [text])[0]
     except Exception as e:
         log.error(f"ML classification error: {e}")
         return classify_rules(text)
@@ -63,25 +48,15 @@ def classify_rules(text: str) -> Tuple[str, float]:
     Rule-based classification fallback.
     Returns: (jenis, confidence)
     """
-    t = text.lower()
-    score_keluar = 0
-    score_masuk = 0
-
-    for kw in KEYWORDS_KELUAR:
-        if kw in t:
-            score_keluar += 1
-    for kw in KEYWORDS_MASUK:
-        if kw in t:
-            score_masuk += 1
-
-    # Pola internal → indikasi surat keluar
-    for pat in INTERNAL_PATTERNS:
-        if re.search(pat, text, re.IGNORECASE):
-            score_keluar += 2
+    engine = rules.get_rule_engine()
+    hits = engine.scan(text, engine.scoring_sets() + (TIE_BREAK_SET,))
+    scores = hits.scores()
+    score_keluar = scores.get("keluar", 0)
+    score_masuk = scores.get("masuk", 0)
 
     if score_keluar == score_masuk:
         # fallback berdasarkan struktur: jika ada 'kepada yth' → keluar
-        if "kepada yth" in t or "kepada yang terhormat" in t:
+        if hits.matched(TIE_BREAK_SET):
             score_keluar += 0.5
         else:
             score_masuk += 0.5
@@ -94,6 +69,27 @@ def classify_rules(text: str) -> Tuple[str, float]:
     return jenis, confidence
 
 
+def classify_batch(texts: Sequence[str]) -> List[Tuple[str, float]]:
+    """
+    Seperti `classify` untuk banyak teks sekaligus: satu panggilan `predict_proba`
+    (TF-IDF semua teks dalam satu matriks sparse).
+
+    Returns:
+        [(jenis, confidence), ...] sesuai urutan `texts`
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    model = model_registry.model
+    if model is None:
+        return [classify_rules(t) for t in texts]
+    try:
+        return _predict(model, texts)
+    except Exception as e:
+        log.error(f"ML batch classification error: {e}")
+        return [classify_rules(t) for t in texts]
+
+
 def classify(text: str) -> Tuple[str, float]:
     """
     Main classification function.
@@ -102,7 +98,7 @@ def classify(text: str) -> Tuple[str, float]:
     Returns:
         (jenis, confidence) where jenis is 'masuk' or 'keluar'
     """
-    if ML_MODEL is not None:
+    if model_registry.model is not None:
         return classify_ml(text)
     else:
         return classify_rules(text)
@@ -0,0 +1,108 @@
+"""
+Executor untuk tahap ingest yang CPU-bound (pdfminer, python-docx, OCR, parse_metadata).
+
+Handler `async def` tidak boleh memanggil fungsi-fungsi tersebut langsung karena akan
+memblokir event loop uvicorn (search & health ikut macet). Semua pekerjaan berat
+dijalankan lewat `ingest_executor`:
+
+- `await ingest_executor.run(fn, ...)` dari handler async
+- `ingest_executor.call(fn, ...)` dari thread worker (mis. antrean job)
+
+Analisis dokumen tidak memanggil executor ini langsung, melainkan lewat jalur cepat/lambat
+`app.services.scheduler.extraction_scheduler` (jalur cepat memakai `ingest_executor`).
+
+Jenis pool (thread/process/sandbox) dan batas konkurensi diatur lewat settings
+`INGEST_EXECUTOR` dan `INGEST_MAX_CONCURRENCY`. Pekerjaan di atas batas menunggu di
+antrean pool tanpa memblokir event loop. Untuk mode 'process' & 'sandbox', fungsi &
+argumen harus bisa di-pickle (fungsi level modul); worker 'process' dibuat dengan start
+method 'spawn'. Mode 'sandbox'
+(`app.services.sandbox`) menambah batas waktu & RSS per dokumen serta daur ulang worker;
+kegagalannya dilaporkan sebagai `SandboxError`.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.services.sandbox import SandboxPool
+
+log = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = {"thread", "process", "sandbox"}
+
+
+class IngestExecutor:
+    """Pool terbatas (lazy) untuk pekerjaan ingest CPU-bound."""
+
+    def __init__(
+        self,
+        kind: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        name: str = "ingest-cpu",
+        timeout: Optional[float] = None,
+    ) -> None:
+        kind = (kind or settings.INGEST_EXECUTOR or "thread").lower()
+        if kind not in EXECUTOR_KINDS:
+            log.warning(f"Unknown INGEST_EXECUTOR={kind!r}, falling back to 'thread'")
+            kind = "thread"
+        self.kind = kind
+        self.max_workers = max(1, max_workers or settings.INGEST_MAX_CONCURRENCY or os.cpu_count() or 1)
+        self.name = name
+        # Batas waktu per tugas, hanya berlaku untuk mode 'sandbox'
+        self.timeout = timeout or settings.SANDBOX_TIMEOUT
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    # 'spawn', bukan fork: fork dari server multithread bisa mewarisi lock
+                    # yang sedang dipegang thread lain (sama seperti pool OCR & sandbox)
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                elif self.kind == "sandbox":
+                    self._pool = SandboxPool(
+                        max_workers=self.max_workers,
+                        timeout=self.timeout,
+                        max_rss_mb=settings.SANDBOX_MAX_RSS_MB,
+                        max_tasks=settings.SANDBOX_MAX_TASKS,
+                        name=self.name,
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+                log.info(f"Ingest executor {self.name} started: kind={self.kind} max_workers={self.max_workers}")
+            return self._pool
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        return self._ensure_pool().submit(partial(fn, *args, **kwargs))
+
+    def call(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Jalankan di pool dan tunggu hasilnya (untuk pemanggil sinkron)."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Jalankan di pool tanpa memblokir event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def sandbox_stats(self) -> Optional[dict]:
+        """Statistik worker sandbox (None bila bukan mode 'sandbox' atau pool belum jalan)."""
+        pool = self._pool
+        return pool.stats() if isinstance(pool, SandboxPool) else None
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=not wait)
+                self._pool = None
+
+
+# Executor default yang dipakai router, antrean job & lifespan
+ingest_executor = IngestExecutor()
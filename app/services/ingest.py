@@ -0,0 +1,468 @@
+"""
+Pipeline ingest satu dokumen: ekstraksi teks -> parse metadata -> foldering -> simpan ke SQLite.
+
+Dipakai bersama oleh endpoint `/upload/` (mode sinkron) dan worker antrean job
+(`app.services.jobs`) supaya kedua jalur menghasilkan folder, metadata.json dan
+baris `Document` yang identik.
+
+Mode header-first (`settings.OCR_HEADER_FIRST`): PDF scan hanya di-OCR halaman pertama
+(`HEADER_OCR_PAGES`) untuk parse metadata & klasifikasi, dokumen langsung disimpan dengan
+`text_complete: false`, lalu OCR seluruh dokumen dijalankan di background
+(`complete_document_text`) untuk melengkapi text.txt.
+
+Bila ekstraksi gagal di worker sandbox (`SandboxError`: timeout, batas memori, worker
+mati), dokumen tetap disimpan dengan metadata dari nama file saja dan alasannya dicatat
+sebagai `extraction_error` di metadata.json & respons.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.constants import ALLOWED_MIME, HEADER_OCR_PAGES, METADATA_FILENAME, TEXT_FILENAME
+from app.models import Document
+from app.services import rules
+from app.services.analysis_cache import analysis_cache
+from app.services.scheduler import SLOW_LANE, extraction_scheduler
+from app.services.metadata import parse_metadata
+from app.services.sandbox import SandboxError
+from app.services.text_extraction import extract_document
+from app.utils.fileops import move_into
+from app.utils.slugs import slugify_nomor
+
+log = logging.getLogger(__name__)
+
+
+class DuplicateDocumentError(Exception):
+    """Dokumen dengan hash SHA-256 yang sama sudah tersimpan."""
+
+
+def extract_bulan(tanggal_surat: str | None) -> str | None:
+    """Extract Indonesian month name from tanggal_surat string."""
+    if not tanggal_surat:
+        return None
+
+    MONTHS = [
+        "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+        "Juli", "Agustus", "September", "Oktober", "November", "Desember"
+    ]
+    MONTHS_EN = [
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December"
+    ]
+
+    tanggal_lower = tanggal_surat.lower()
+
+    # Check Indonesian months
+    for month in MONTHS:
+        if month.lower() in tanggal_lower:
+            return month
+
+    # Check English months and convert to Indonesian
+    for i, month_en in enumerate(MONTHS_EN):
+        if month_en.lower() in tanggal_lower:
+            return MONTHS[i]
+
+    return None
+
+
+def find_duplicate(db: Session, sha256: str) -> Optional[Document]:
+    return db.query(Document).filter(Document.file_hash == sha256).first()
+
+
+# Hasil analisis: (text_content, ocr_used, parsed, pages)
+# `pages` = keputusan native/OCR per halaman PDF (lihat `ExtractedText`), None untuk DOCX
+Analysis = Tuple[str, bool, Dict, Optional[List[Dict]]]
+
+
+def analyze_file(
+    path: Path,
+    mime_type: str,
+    filename: Optional[str],
+    uploaded_at: datetime,
+    max_pages: Optional[int] = None,
+) -> Analysis:
+    """Tahap CPU-bound: ekstraksi teks (+OCR) dan parse metadata dari file di disk.
+
+    Fungsi level modul tanpa akses DB agar bisa dijalankan di thread/process pool
+    (`app.services.executor`). Returns: (text_content, ocr_used, parsed, pages)
+    """
+    # --- Ekstrak teks langsung dari file spool (tanpa salinan temp) ---
+    extracted = extract_document(path, mime_type, max_pages=max_pages)
+
+    # --- Parse metadata dari teks + nama file ---
+    parsed = parse_metadata(extracted.text_content or "", filename, uploaded_at=uploaded_at)
+
+    return extracted.text_content, extracted.ocr_used, parsed, extracted.pages
+
+
+def analyze_header(
+    path: Path,
+    mime_type: str,
+    filename: Optional[str],
+    uploaded_at: datetime,
+) -> Analysis:
+    """Seperti `analyze_file`, tetapi PDF scan hanya di-OCR `HEADER_OCR_PAGES` halaman pertama.
+
+    Kop surat, blok Nomor/Hal dan tanggal ada di halaman pertama, jadi metadata sudah bisa
+    di-parse. Halaman gambar setelahnya belum di-OCR (lihat `text_is_complete`).
+    """
+    return analyze_file(path, mime_type, filename, uploaded_at, max_pages=HEADER_OCR_PAGES)
+
+
+def analysis_fn() -> Callable[..., Analysis]:
+    """Fungsi analisis sesuai mode: `analyze_header` bila OCR_HEADER_FIRST aktif."""
+    return analyze_header if settings.OCR_HEADER_FIRST else analyze_file
+
+
+def failed_analysis(error: Exception, filename: Optional[str], uploaded_at: datetime) -> Analysis:
+    """Analisis pengganti saat ekstraksi gagal: tanpa teks, metadata hanya dari nama file."""
+    log.warning(f"Extraction failed for {filename}: {error}")
+    return "", False, parse_metadata("", filename, uploaded_at=uploaded_at), None
+
+
+def text_is_complete(ocr_used: bool, pages: Optional[List[Dict]] = None) -> bool:
+    """Di mode header-first, OCR hanya mencakup halaman pertama: teks belum lengkap bila
+    OCR dipakai atau masih ada halaman gambar yang belum di-OCR."""
+    if not settings.OCR_HEADER_FIRST:
+        return True
+    return not (ocr_used or any(p.get("mode") == "scanned" for p in pages or []))
+
+
+def complete_document_text(stored_path: str, metadata_path: str, mime_type: str) -> int:
+    """Ekstraksi/OCR penuh file arsip, tulis text.txt lengkap & tandai metadata.json.
+
+    Fungsi level modul (argumen string) agar bisa dijalankan di process pool.
+    Halaman yang sudah di-OCR saat header-first diambil dari cache OCR.
+    Returns: jumlah karakter teks lengkap.
+    """
+    extracted = extract_document(Path(stored_path), mime_type)
+    text_content = extracted.text_content
+    meta_path = Path(metadata_path)
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+
+    if extracted.pages is not None:
+        metadata["pages"] = extracted.pages
+    if text_content:
+        text_path = meta_path.parent / TEXT_FILENAME
+        text_path.write_text(text_content, encoding="utf-8")
+        metadata["text_path"] = text_path.as_posix()
+    metadata["text_complete"] = True
+    meta_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+    return len(text_content or "")
+
+
+def schedule_text_completion(stored_path: str, metadata_path: str, mime_type: str) -> None:
+    """Jalankan `complete_document_text` di jalur OCR (lambat) tanpa menunggu hasilnya."""
+
+    def _done(future) -> None:
+        try:
+            log.info(f"Background OCR completed for {metadata_path}: {future.result()} chars")
+        except Exception as e:
+            log.error(f"Background OCR failed for {metadata_path}: {e}", exc_info=not isinstance(e, SandboxError))
+            record_extraction_error(metadata_path, e)
+
+    extraction_scheduler.submit(SLOW_LANE, complete_document_text, stored_path, metadata_path, mime_type).add_done_callback(_done)
+
+
+def record_extraction_error(metadata_path: str, error: Exception) -> None:
+    """Catat kegagalan ekstraksi (mis. OCR background) sebagai `extraction_error` di metadata.json."""
+    meta_path = Path(metadata_path)
+    try:
+        metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+        metadata["extraction_error"] = str(error) or error.__class__.__name__
+        meta_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+    except (OSError, ValueError) as e:
+        log.error(f"Cannot record extraction error in {metadata_path}: {e}")
+
+
+def cached_analysis(
+    sha256: str,
+    filename: Optional[str],
+    uploaded_at: datetime,
+) -> Optional[Analysis]:
+    """Ambil hasil `/upload/analyze` sebelumnya untuk isi file yang sama (bila masih di cache).
+
+    Teks hasil ekstraksi/OCR dipakai ulang; metadata hanya di-parse ulang (murah) bila
+    nama file berbeda dari saat analyze, karena parser memakai nama file sebagai fallback.
+    """
+    entry = analysis_cache.get(sha256)
+    if entry is None:
+        return None
+    parsed = entry.parsed
+    if entry.filename != filename:
+        parsed = parse_metadata(entry.text_content or "", filename, uploaded_at=uploaded_at)
+    return entry.text_content, entry.ocr_used, parsed, entry.pages
+
+
+def store_document(
+    db: Session,
+    source_path: Path,
+    mime_type: str,
+    filename: Optional[str],
+    sha256: str,
+    size_bytes: int,
+    text_content: str,
+    ocr_used: bool,
+    parsed: Dict,
+    overrides: Optional[Dict] = None,
+    uploaded_at: Optional[datetime] = None,
+    commit: bool = True,
+    text_complete: bool = True,
+    pages: Optional[List[Dict]] = None,
+    extraction_error: Optional[str] = None,
+    unique_folder: bool = False,
+) -> Dict:
+    """Tahap I/O: tentukan nilai final, foldering, pindahkan file & tulis metadata.json, insert `Document`.
+
+    `source_path` (file spool) dipindahkan ke folder arsip, bukan disalin.
+    Dengan `commit=False` baris hanya di-flush agar pemanggil bisa commit per batch.
+    `text_complete=False` menandai text.txt yang masih parsial (mode header-first).
+    `pages` (keputusan native/OCR per halaman PDF) dicatat di metadata.json.
+    `extraction_error` (alasan ekstraksi gagal) dicatat di metadata.json & respons;
+    text.txt tidak ada dan `text_complete` selalu false.
+    `unique_folder=True` (batch): folder nomor yang sudah berisi dokumen lain diberi sufiks
+    8 digit sha256 agar `original.{ext}` & metadata.json-nya tidak tertimpa.
+    Bila gagal setelah file dipindah, file dikembalikan ke `source_path` dan file yang sudah
+    ditulis dihapus.
+    Returns payload respons upload.
+    """
+    overrides = overrides or {}
+    if extraction_error:
+        text_complete = False
+    ext = ALLOWED_MIME[mime_type]
+    now_utc = uploaded_at or datetime.utcnow()
+
+    # --- Tentukan nilai final (input menang jika diisi) ---
+    nomor_final = (overrides.get("nomor") or parsed.get("nomor")) or "TANPA-NOMOR"
+    perihal_final = (overrides.get("perihal") or parsed.get("perihal")) or "Tidak ada perihal"
+    tanggal_final = overrides.get("tanggal_surat") or parsed.get("tanggal_surat")
+
+    # Extract bulan (month) from tanggal_surat for categorization
+    bulan_final = extract_bulan(tanggal_final)
+
+    # Tahun: prefer nilai input yang valid (positive int). Jika input kosong/0, fallback ke parsed.
+    # Jika tidak terdeteksi, biarkan None untuk disimpan di luar folder tahun.
+    tahun = overrides.get("tahun")
+    try:
+        if tahun and int(tahun) > 0:
+            tahun_final = int(tahun)
+        else:
+            tahun_final = parsed.get("tahun")
+
+        # Pastikan tahun_final valid (positive integer). Jika tidak ada, set None.
+        if tahun_final is None or int(tahun_final) <= 0:
+            tahun_final = None  # Document will be stored directly in jenis folder
+        else:
+            tahun_final = int(tahun_final)
+    except (ValueError, TypeError):
+        # Jika parsing gagal, set None
+        tahun_final = None
+
+    # Jenis: input -> parsed -> fallback kecil -> default 'keluar'
+    jenis_final = overrides.get("jenis") or parsed.get("jenis")
+    if jenis_final is None:
+        kode = rules.get_rule_engine().scan(nomor_final, ("kode_masuk", "kode_keluar"))
+        if kode.matched("kode_masuk"):
+            jenis_final = "masuk"
+        elif kode.matched("kode_keluar"):
+            jenis_final = "keluar"
+    if jenis_final not in {"masuk", "keluar"}:
+        jenis_final = "keluar"
+
+    # --- Foldering: different structure for invalid docs ---
+    slug = slugify_nomor(nomor_final)
+    if tahun_final and bulan_final:
+        # Valid document: store in tahun/jenis/slug structure
+        base_dir: Path = settings.STORAGE_ROOT_DIR / str(tahun_final) / jenis_final / slug
+    else:
+        # Invalid document (no tahun or bulan): store directly in jenis/slug
+        base_dir: Path = settings.STORAGE_ROOT_DIR / jenis_final / slug
+    if unique_folder and (base_dir / METADATA_FILENAME).exists():
+        base_dir = base_dir.with_name(f"{slug}-{sha256[:8]}")
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    # --- Simpan file asli (rename atomik dari spool) ---
+    original_name = f"original.{ext}"
+    original_path = move_into(Path(source_path), base_dir / original_name)
+
+    written: List[Path] = []  # dibersihkan bila langkah berikutnya gagal
+    try:
+        # --- Simpan text.txt (kalau ada) ---
+        final_text_path = None
+        if text_content:
+            final_text_path = base_dir / TEXT_FILENAME
+            written.append(final_text_path)
+            final_text_path.write_text(text_content, encoding="utf-8")
+
+        # --- Siapkan metadata.json ---
+        metadata_path = base_dir / METADATA_FILENAME
+        metadata = {
+            "uploaded_at": now_utc.isoformat() + "Z",
+            "file_original": original_name,
+            "mime_type": mime_type,
+            "size_bytes": size_bytes,
+            "hash_sha256": sha256,
+            "ocr_enabled": bool(settings.TESSERACT_CMD) or ocr_used,
+            "text_path": final_text_path.as_posix() if final_text_path else None,
+            "source_filename": filename,
+            "text_complete": text_complete,
+            "pages": pages,
+        }
+        if extraction_error:
+            metadata["extraction_error"] = extraction_error
+        metadata.update({
+            "tahun": tahun_final,
+            "jenis": jenis_final,
+            "nomor": nomor_final,
+            "perihal": perihal_final,
+            "tanggal_surat": tanggal_final,
+            "pengirim": overrides.get("pengirim") or parsed.get("pengirim"),
+            "penerima": overrides.get("penerima") or parsed.get("penerima"),
+            "parsed": parsed,
+        })
+        written.append(metadata_path)
+        metadata_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        # --- Simpan ke SQLite ---
+        doc = Document(
+            tahun=tahun_final,
+            jenis=jenis_final,
+            nomor_surat=nomor_final,
+            perihal=perihal_final,
+            tanggal_surat=tanggal_final,
+            bulan=bulan_final,
+            pengirim=metadata["pengirim"],
+            penerima=metadata["penerima"],
+            stored_path=original_path.as_posix(),
+            metadata_path=metadata_path.as_posix().replace("\\", "/"),
+            uploaded_at=now_utc,
+            mime_type=mime_type,
+            file_hash=sha256,
+            ocr_enabled=metadata["ocr_enabled"],
+        )
+        db.add(doc)
+        if commit:
+            db.commit()
+            db.refresh(doc)
+        else:
+            db.flush()
+    except BaseException:
+        _undo_store(original_path, Path(source_path), written)
+        raise
+
+    # --- Respons ---
+    response = {
+        "id": doc.id,
+        "message": "uploaded",
+        "tahun": tahun_final,
+        "jenis": jenis_final,
+        "nomor": nomor_final,               # legacy key (backward compatibility)
+        "nomor_surat": nomor_final,        # canonical key
+        "perihal": perihal_final,
+        "stored_path": doc.stored_path,
+        "metadata_path": doc.metadata_path,
+        "mime_type": mime_type,
+        "size": size_bytes,
+        "hash": f"sha256:{sha256}",
+        "text_complete": text_complete,
+        "parsed": parsed,
+    }
+    if extraction_error:
+        response["extraction_error"] = extraction_error
+    return response
+
+
+def _undo_store(original_path: Path, source_path: Path, written: List[Path]) -> None:
+    """Kembalikan file asli ke spool & hapus file yang sudah ditulis `store_document` (best effort)."""
+    try:
+        move_into(original_path, source_path)
+    except OSError as e:
+        log.warning(f"Could not move {original_path} back to {source_path}: {e}")
+    for path in written:
+        path.unlink(missing_ok=True)
+    _remove_empty_dir(original_path.parent)
+
+
+def remove_stored_files(stored: Dict) -> None:
+    """Hapus file arsip dokumen yang barisnya batal di-commit (best effort)."""
+    stored_path = Path(stored["stored_path"])
+    for path in (stored_path, Path(stored["metadata_path"]), stored_path.parent / TEXT_FILENAME):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            log.warning(f"Could not remove {path}: {e}")
+    _remove_empty_dir(stored_path.parent)
+
+
+def _remove_empty_dir(path: Path) -> None:
+    try:
+        path.rmdir()
+    except OSError:
+        pass  # masih berisi file lain
+
+
+def ingest_document(
+    db: Session,
+    source_path: Path,
+    mime_type: str,
+    filename: Optional[str],
+    sha256: str,
+    size_bytes: int,
+    overrides: Optional[Dict] = None,
+    uploaded_at: Optional[datetime] = None,
+    run: Optional[Callable] = None,
+) -> Dict:
+    """Jalankan pipeline lengkap (analyze + store) untuk satu file spool secara sinkron.
+
+    `run(fn, *args)` menjalankan fungsi analisis; mis. `extraction_scheduler.call_analysis`
+    agar tahap CPU-bound berjalan di jalur cepat/lambat (default: dipanggil langsung).
+
+    Ekstraksi yang gagal di sandbox tidak menggagalkan job: dokumen disimpan dengan
+    `extraction_error` (lihat `failed_analysis`).
+
+    Raises:
+        DuplicateDocumentError: jika hash sudah ada di database.
+    """
+    if find_duplicate(db, sha256):
+        raise DuplicateDocumentError(sha256)
+
+    now_utc = uploaded_at or datetime.utcnow()
+    extraction_error = None
+    analysis = cached_analysis(sha256, filename, now_utc)
+    if analysis is None:
+        fn = analysis_fn()
+        args = (source_path, mime_type, filename, now_utc)
+        try:
+            analysis = run(fn, *args) if run is not None else fn(*args)
+        except SandboxError as e:
+            extraction_error = str(e)
+            analysis = failed_analysis(e, filename, now_utc)
+    text_content, ocr_used, parsed, pages = analysis
+    text_complete = text_is_complete(ocr_used, pages) and not extraction_error
+    result = store_document(
+        db,
+        source_path=source_path,
+        mime_type=mime_type,
+        filename=filename,
+        sha256=sha256,
+        size_bytes=size_bytes,
+        text_content=text_content,
+        ocr_used=ocr_used,
+        parsed=parsed,
+        overrides=overrides,
+        uploaded_at=now_utc,
+        text_complete=text_complete,
+        pages=pages,
+        extraction_error=extraction_error,
+    )
+    # Setelah tersimpan, hash ini selalu duplikat -> entri cache tidak berguna lagi
+    analysis_cache.discard(sha256)
+    if not text_complete and not extraction_error:
+        schedule_text_completion(result["stored_path"], result["metadata_path"], mime_type)
+    return result
@@ -0,0 +1,232 @@
+"""
+Antrean job ingest asinkron.
+
+Endpoint upload cukup memindahkan file spool ke folder job dan membuat baris `IngestJob`
+(status 'queued'); pool worker lokal (thread) lalu menjalankan pipeline
+`app.services.ingest.ingest_document` (tahap CPU-bound lewat `extraction_scheduler`) dan
+memperbarui status job:
+
+    queued -> running -> done | failed
+
+Worker mengklaim job dengan satu UPDATE bersyarat (`WHERE status='queued'`); hanya yang
+rowcount-nya 1 yang menjalankan pipeline, sehingga beberapa antrean/proses yang berbagi
+database tidak memproses job yang sama dua kali. Selama 'running', pemilik memperbarui
+`heartbeat_at` tiap sepertiga `INGEST_JOB_LEASE_SECONDS`. Saat startup, job 'queued'
+diserahkan ulang dan job 'running' yang lease-nya kedaluwarsa (pemiliknya mati) diantrekan
+ulang; job yang masih diproses worker lain dibiarkan.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.constants import JOBS_DIR_NAME
+from app.database import SessionLocal
+from app.models import IngestJob
+from app.services.scheduler import extraction_scheduler
+from app.services.ingest import DuplicateDocumentError, ingest_document
+from app.utils.fileops import SpooledUpload, move_into
+
+log = logging.getLogger(__name__)
+
+
+def jobs_dir() -> Path:
+    d = settings.TEMP_UPLOAD_PATH / JOBS_DIR_NAME
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+class IngestJobQueue:
+    """Pool worker lokal untuk memproses `IngestJob`.
+
+    `session_factory` dapat di-inject untuk testing.
+    """
+
+    def __init__(self, workers: Optional[int] = None, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.workers = max(1, workers or settings.INGEST_WORKERS)
+        self.session_factory = session_factory
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-64:]
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active: Set[str] = set()  # job yang sedang dijalankan antrean ini (heartbeat)
+        self._active_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-worker")
+            self._stop.clear()
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="ingest-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+        return self._executor
+
+    def enqueue(
+        self,
+        db: Session,
+        upload: SpooledUpload,
+        mime_type: str,
+        filename: Optional[str],
+        overrides: Optional[Dict] = None,
+    ) -> IngestJob:
+        """Pindahkan file spool ke folder job, buat baris job, lalu serahkan ke worker."""
+        job_id = uuid.uuid4().hex
+        spool_path = move_into(upload.path, jobs_dir() / f"{job_id}.upload")
+
+        job = IngestJob(
+            id=job_id,
+            status="queued",
+            filename=filename,
+            mime_type=mime_type,
+            file_hash=upload.sha256,
+            spool_path=spool_path.as_posix(),
+            options=json.dumps(overrides or {}, ensure_ascii=False),
+            created_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self.submit(job_id)
+        return job
+
+    def submit(self, job_id: str) -> None:
+        self._ensure_executor().submit(self._run, job_id)
+
+    def resume_pending(self) -> int:
+        """Serahkan ulang job 'queued' dan antrekan ulang job 'running' yang lease-nya kedaluwarsa
+        (pemiliknya mati saat memproses). Job dengan heartbeat segar dibiarkan."""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.INGEST_JOB_LEASE_SECONDS)
+        db = self.session_factory()
+        try:
+            expired = db.execute(
+                update(IngestJob)
+                .where(
+                    IngestJob.status == "running",
+                    or_(IngestJob.heartbeat_at.is_(None), IngestJob.heartbeat_at < cutoff),
+                )
+                .values(status="queued", owner=None, heartbeat_at=None)
+            ).rowcount
+            db.commit()
+            ids = [row.id for row in db.query(IngestJob.id).filter(IngestJob.status == "queued")]
+        finally:
+            db.close()
+
+        # Job yang sama mungkin juga diserahkan antrean lain: klaim di `_run` menentukan pemenangnya
+        for job_id in ids:
+            self.submit(job_id)
+        if ids:
+            log.info(f"Resumed {len(ids)} pending ingest job(s) ({expired} with expired lease)")
+        return len(ids)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._stop.set()
+        self._heartbeat_thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def _claim(self, db: Session, job_id: str) -> bool:
+        """queued -> running secara atomik; True hanya untuk satu pemanggil."""
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(IngestJob)
+            .where(IngestJob.id == job_id, IngestJob.status == "queued")
+            .values(status="running", owner=self.owner, heartbeat_at=now, started_at=now)
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    def heartbeat(self) -> int:
+        """Perbarui `heartbeat_at` semua job yang sedang dijalankan antrean ini."""
+        with self._active_lock:
+            ids = list(self._active)
+        if not ids:
+            return 0
+        db = self.session_factory()
+        try:
+            updated = db.execute(
+                update(IngestJob)
+                .where(IngestJob.id.in_(ids), IngestJob.owner == self.owner, IngestJob.status == "running")
+                .values(heartbeat_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+            return updated
+        finally:
+            db.close()
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(1, settings.INGEST_JOB_LEASE_SECONDS // 3)
+        while not self._stop.wait(interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                log.warning(f"Ingest job heartbeat failed: {e}")
+
+    def _run(self, job_id: str) -> None:
+        db = self.session_factory()
+        try:
+            if not self._claim(db, job_id):
+                log.debug(f"Ingest job {job_id} already claimed or finished, skipping")
+                return
+            with self._active_lock:
+                self._active.add(job_id)
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+
+            spool_path = Path(job.spool_path)
+            try:
+                result = ingest_document(
+                    db,
+                    source_path=spool_path,
+                    mime_type=job.mime_type,
+                    filename=job.filename,
+                    sha256=job.file_hash,
+                    size_bytes=spool_path.stat().st_size,
+                    overrides=json.loads(job.options or "{}"),
+                    uploaded_at=job.created_at,
+                    # Tahap CPU-bound lewat jalur cepat/lambat yang sama dengan handler upload
+                    run=extraction_scheduler.call_analysis,
+                )
+            except DuplicateDocumentError:
+                db.rollback()
+                job.status = "failed"
+                job.error = "File yang sama sudah pernah diunggah (hash duplikat)"
+            except Exception as e:
+                db.rollback()
+                log.error(f"Ingest job {job_id} failed: {e}", exc_info=True)
+                job.status = "failed"
+                job.error = str(e) or e.__class__.__name__
+            else:
+                job.status = "done"
+                job.document_id = result.get("id")
+                job.result = json.dumps(result, ensure_ascii=False, default=str)
+
+            job.finished_at = datetime.utcnow()
+            job.heartbeat_at = job.finished_at
+            db.commit()
+
+            # File spool tidak dibutuhkan lagi setelah job selesai (best-effort)
+            try:
+                spool_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+        except Exception as e:
+            log.error(f"Ingest worker crashed on job {job_id}: {e}", exc_info=True)
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+            db.close()
+
+
+# Antrean default yang dipakai router & lifespan
+job_queue = IngestJobQueue()
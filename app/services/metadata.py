@@ -7,18 +7,39 @@ Disesuaikan untuk pola surat Kelurahan DKI:
 - Label umum: Nomor, Sifat, Lampiran, Hal/Perihal.
 - Tanggal format Indonesia: 12 Desember 2025.
 - Jenis: 'masuk' vs 'keluar' - uses ML classifier if available, otherwise heuristics.
+
+`parse_metadata` menormalisasi teks sekali lalu menjalankan semua extractor atas teks
+yang sama (fungsi `_scan_*`); pola regex dikompilasi sekali di level modul dan pencarian
+token nomor / kop hanya membaca jendela header (`NOMOR_HEADER_LINES`, `KOP_HEADER_LINES`
+baris pertama). Pola berlabel (Nomor, Hal, Kepada Yth, ...) tidak di-scan dari awal teks:
+salinan huruf kecil (`_fold`) dipakai untuk mencari kemunculan pertama kata labelnya
+dengan `str.find`, regex baru dijalankan dari posisi itu (atau dilewati bila kata label
+tidak ada). Fungsi `extract_*` publik tetap menerima teks mentah.
+Regresi: tests/fixtures/metadata_golden.json (`scripts/generate_metadata_golden.py`),
+throughput: `scripts/bench_metadata.py`.
+
+`parse_metadata_batch` untuk reprocessing massal (mis. `scripts/reparse_metadata.py`):
+input di-stream per potongan `METADATA_BATCH_SIZE`, tiap potongan diklasifikasi dengan satu
+panggilan model (`classify_batch`), opsional disebar ke beberapa proses; hasil keluar
+sebagai iterator berurutan sehingga memori tidak mengikuti ukuran arsip.
 """
 
 import logging
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from app.services import rules
 
 log = logging.getLogger(__name__)
 
-# Try to import ML classifier
+# Try to import ML classifier (modelnya dimuat saat pertama dipakai, lihat model_registry)
 try:
     from app.services.classifier_ml import classify as ml_classify
+    from app.services.classifier_ml import classify_batch as ml_classify_batch
     USE_ML_CLASSIFIER = True
     log.info("✅ ML Classifier available for metadata extraction")
 except ImportError:
@@ -31,11 +52,103 @@ BULAN_ID = {
 }
 
 
+# Jendela header (jumlah baris pertama) untuk token nomor tanpa label & deteksi kop
+NOMOR_HEADER_LINES = 15
+KOP_HEADER_LINES = 20
+
+# Klasifikasi ML dipakai untuk teks > ML_MIN_CHARS bila confidence > ML_MIN_CONFIDENCE
+ML_MIN_CHARS = 50
+ML_MIN_CONFIDENCE = 0.7
+
+# Set aturan (app.services.rules) yang dicek di header untuk deteksi kop
+KOP_RULE_SETS = ("kop_keluar", "kop_keluar_wilayah", "kop_instansi_lain")
+
+# Jumlah dokumen per potongan `parse_metadata_batch` (satu panggilan model per potongan)
+METADATA_BATCH_SIZE = 256
+
+# (text, filename, uploaded_at)
+BatchItem = Tuple[str, Optional[str], datetime]
+
+# --- Pola, dikompilasi sekali ---
+# Run spasi/tab -> satu spasi; spasi tunggal tidak perlu diganti
+_WS_RUN = re.compile(r"\t[ \t]*| [ \t]+")
+# Pemisah baris yang sama dengan str.splitlines()
+_LINE_BREAK = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+_LINE_BREAK_CHAR = re.compile("[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def _labeled(words: Tuple[str, ...], tail: str) -> Tuple[Pattern, Tuple[str, ...]]:
+    """Pola `(?i)\\b(kata|...)\\b` + `tail` beserta literal huruf kecil untuk prefilter `_search`."""
+    return re.compile(rf"(?i)\b({'|'.join(words)})\b{tail}"), tuple(w.lower() for w in words)
+
+
+_SIFAT = _labeled(("Sifat", "Sibat", "Sitat"), r"\s*[:=]?\s*([A-Za-z]+)")
+_NOMOR_LABEL = _labeled(("No", "Nomor", "Nemor", "Nomer"), r"[\s:.;]*([A-Za-z0-9./\-]+)")
+_NOMOR_TOKEN = re.compile(r"[A-Za-z0-9./\-]{4,}")
+_DATE_TOKEN = re.compile(r"\d{1,2}-\d{1,2}-\d{4}")
+_DIGIT = re.compile(r"\d")
+_SEPARATOR = re.compile(r"[./\-]")
+_PERIHAL_LABEL = _labeled(("Hal", "Perihal"), r"\s*[:\-]?\s*(.+)")
+_PERIHAL_KEYWORD = _labeled(
+    ("Permohonan", "Balasan", "Undangan", "Disposisi", "Pemberitahuan", "Pengajuan", "Laporan", "Surat"), ""
+)
+_FILENAME_KODE_REST = re.compile(r"^\s*[A-Za-z0-9.\-\/]+\s+(.+)$")
+_TANGGAL = re.compile(r"(\d{1,2})\s+([A-Za-z]+)\s+(20\d{2})", re.IGNORECASE)
+_YEAR = re.compile(r"\b(20\d{2})\b")
+_PENERIMA = _labeled(("Kepada",), r"\s+Yth\.?\s*(.+)")
+_PENGIRIM = _labeled(("Dari", "Pengirim"), r"\s*:\s*(.+)")
+
+
 def _clean_text(text: str) -> str:
     # Bersihkan noise OCR umum dan normalisasi spasi
     t = (text or "").replace("/-", "-")
-    t = re.sub(r"[ \t]+", " ", t)
-    return t
+    return _WS_RUN.sub(" ", t)
+
+
+def _fold(T: str) -> Optional[str]:
+    """Salinan huruf kecil sepanjang `T` untuk prefilter literal; None bila panjangnya berubah.
+
+    `(?i)` juga mencocokkan 'ı' dengan 'i' dan 'ſ' dengan 's', jadi keduanya ikut dilipat.
+    """
+    folded = T.lower()
+    if len(folded) != len(T):  # mis. 'İ' -> 'i̇': posisi tidak lagi sejajar
+        return None
+    if "\u0131" in folded or "\u017f" in folded:
+        folded = folded.replace("\u0131", "i").replace("\u017f", "s")
+    return folded
+
+
+def _search(label: Tuple[Pattern, Tuple[str, ...]], T: str, folded: Optional[str] = None):
+    """Sama dengan `pattern.search(T)` untuk pola `_labeled`.
+
+    Setiap match diawali salah satu kata label, jadi pencarian dimulai dari kemunculan
+    pertama kata itu di `folded` dan dilewati bila tidak ada satu pun.
+    """
+    pattern, literals = label
+    if folded is None:
+        return pattern.search(T)
+    starts = [i for i in map(folded.find, literals) if i >= 0]
+    return pattern.search(T, min(starts)) if starts else None
+
+
+def _head_lines(text: str, n: int) -> List[str]:
+    """Sama dengan `text.splitlines()[:n]` tanpa memecah seluruh teks."""
+    parts = _LINE_BREAK.split(text, maxsplit=n)
+    if len(parts) > n:
+        return parts[:n]
+    # Seluruh teks terpecah: splitlines tidak menghasilkan baris kosong setelah pemisah terakhir
+    if parts[-1] == "":
+        parts.pop()
+    return parts
+
+
+def _line_at(text: str, pos: int) -> str:
+    """Baris (menurut `str.splitlines`) yang memuat posisi `pos`."""
+    start = 0
+    for m in _LINE_BREAK_CHAR.finditer(text, 0, pos):
+        start = m.end()
+    end = _LINE_BREAK_CHAR.search(text, pos)
+    return text[start:end.start() if end else len(text)]
 
 
 def extract_sifat_surat(text: str) -> Optional[str]:
@@ -43,10 +156,13 @@ def extract_sifat_surat(text: str) -> Optional[str]:
     Ekstrak Sifat Surat (Penting, Biasa, Rahasia, dll).
     Hanya relevan untuk surat keluar.
     """
-    T = _clean_text(text)
+    return _scan_sifat(_clean_text(text))
+
+
+def _scan_sifat(T: str, folded: Optional[str] = None) -> Optional[str]:
     # Cari pola "Sifat : Biasa/Penting/Rahasia"
     # Kadang OCR baca "Sifat :" jadi "Sifat =" atau "Sitat"
-    m = re.search(r"(?i)\b(Sifat|Sibat|Sitat)\b\s*[:=]?\s*([A-Za-z]+)", T)
+    m = _search(_SIFAT, T, folded)
     if m:
         sifat = m.group(2).strip()
         # Validasi sederhana: hanya ambil jika panjang kata masuk akal
@@ -59,11 +175,12 @@ def extract_nomor_surat(text: str, filename: Optional[str] = None) -> Optional[s
     Ekstrak nomor surat (contoh: 655-HM.03.04, 123/SK/2025, dll).
     Pola: angka + tanda pemisah + kode instansi
     """
+    return _scan_nomor(_clean_text(text), filename)
 
-    T = _clean_text(text)
 
+def _scan_nomor(T: str, filename: Optional[str] = None, folded: Optional[str] = None) -> Optional[str]:
     # 1) 'Nomor: ...'
-    m = re.search(r"(?i)\b(No|Nomor|Nemor|Nomer)\b[\s:.;]*([A-Za-z0-9./\-]+)", T)
+    m = _search(_NOMOR_LABEL, T, folded)
     if m:
         nomor = m.group(2).strip()
         nomor = nomor.strip(".,;:/-")
@@ -71,12 +188,10 @@ def extract_nomor_surat(text: str, filename: Optional[str] = None) -> Optional[s
              return nomor
 
     # 2) Token kode di header
-    lines = [l.strip() for l in T.splitlines()]
-    for l in lines[:15]:
-        tokens = l.split()
-        for token in tokens:
-             if re.match(r"^[A-Za-z0-9./\-]{4,}$", token) and re.search(r"\d", token) and re.search(r"[./\-]", token):
-                 if not re.match(r"^\d{1,2}-\d{1,2}-\d{4}$", token):
+    for l in _head_lines(T, NOMOR_HEADER_LINES):
+        for token in l.split():
+             if _NOMOR_TOKEN.fullmatch(token) and _DIGIT.search(token) and _SEPARATOR.search(token):
+                 if not _DATE_TOKEN.fullmatch(token):
                     return token.strip(".,;")
 
     # 3) Fallback filename
@@ -84,7 +199,7 @@ def extract_nomor_surat(text: str, filename: Optional[str] = None) -> Optional[s
         name = filename.rsplit(".", 1)[0]
         # Ambil kata pertama sebagai potensi nomor jika mengandung digit
         parts = name.split(maxsplit=1)
-        if parts and re.search(r"\d", parts[0]) and len(parts[0]) > 3:
+        if parts and _DIGIT.search(parts[0]) and len(parts[0]) > 3:
              return parts[0].strip()
 
     return None
@@ -97,23 +212,24 @@ def extract_perihal(text: str, filename: Optional[str] = None) -> Optional[str]:
       - Fallback: baris yang mengandung kata kunci umum (Permohonan, Balasan, Undangan, Disposisi)
       - Fallback filename: 'KODE PERIHAL.pdf' -> ambil PERIHAL
     """
-    T = _clean_text(text)
+    return _scan_perihal(_clean_text(text), filename)
+
 
-    # Label langsung
-    m = re.search(r"(?i)\b(Hal|Perihal)\b\s*[:\-]?\s*(.+)", T)
+def _scan_perihal(T: str, filename: Optional[str] = None, folded: Optional[str] = None) -> Optional[str]:
+    # Label langsung ('.' tidak melewati '\n', jadi grup sudah satu baris)
+    m = _search(_PERIHAL_LABEL, T, folded)
     if m:
-        return re.split(r"\n", m.group(2))[0].strip()
+        return m.group(2).strip()
 
-    # Kata kunci umum
-    keywords = r"(Permohonan|Balasan|Undangan|Disposisi|Pemberitahuan|Pengajuan|Laporan|Surat)"
-    for l in T.splitlines():
-        if re.search(rf"(?i)\b{keywords}\b", l):
-            return l.strip()
+    # Kata kunci umum: baris pertama yang memuatnya
+    m = _search(_PERIHAL_KEYWORD, T, folded)
+    if m:
+        return _line_at(T, m.start()).strip()
 
     # Fallback filename
     if filename:
         name = filename.rsplit(".", 1)[0]
-        mm = re.match(r"^\s*[A-Za-z0-9.\-\/]+\s+(.+)$", name)
+        mm = _FILENAME_KODE_REST.match(name)
         if mm:
             return mm.group(1).strip()
 
@@ -125,8 +241,11 @@ def extract_tanggal(text: str) -> Optional[datetime]:
     Format: '12 Desember 2025' atau 'Jakarta, 12 Desember 2025'
     Fallback: hanya tahun (20xx) -> tanggal 1 Januari tahun tsb.
     """
-    T = _clean_text(text)
-    m = re.search(r"(\d{1,2})\s+([A-Za-z]+)\s+(20\d{2})", T, re.IGNORECASE)
+    return _scan_tanggal(_clean_text(text))
+
+
+def _scan_tanggal(T: str) -> Optional[datetime]:
+    m = _TANGGAL.search(T)
     if m:
         day = int(m.group(1))
         month_name = m.group(2).lower()
@@ -138,7 +257,7 @@ def extract_tanggal(text: str) -> Optional[datetime]:
             except Exception:
                 return None
 
-    y = re.search(r"\b(20\d{2})\b", T)
+    y = _YEAR.search(T)
     if y:
         return datetime(int(y.group(1)), 1, 1)
     return None
@@ -150,17 +269,20 @@ def extract_pengirim_penerima(text: str) -> Dict[str, Optional[str]]:
       - Penerima dari 'Kepada Yth ...'
       - Pengirim dari 'Dari:'/ 'Pengirim:'
     """
-    T = _clean_text(text)
+    return _scan_pengirim_penerima(_clean_text(text))
+
+
+def _scan_pengirim_penerima(T: str, folded: Optional[str] = None) -> Dict[str, Optional[str]]:
     pengirim = None
     penerima = None
 
-    m_to = re.search(r"(?i)\bKepada\b\s+Yth\.?\s*(.+)", T)
+    m_to = _search(_PENERIMA, T, folded)
     if m_to:
-        penerima = re.split(r"\n", m_to.group(1))[0].strip()
+        penerima = m_to.group(2).strip()
 
-    m_from = re.search(r"(?i)\b(Dari|Pengirim)\b\s*:\s*(.+)", T)
+    m_from = _search(_PENGIRIM, T, folded)
     if m_from:
-        pengirim = re.split(r"\n", m_from.group(2))[0].strip()
+        pengirim = m_from.group(2).strip()
 
     return {"pengirim": pengirim, "penerima": penerima}
 
@@ -182,12 +304,12 @@ def decide_tahun(
         return tanggal.year
 
     if nomor:
-        m = re.search(r"\b(20\d{2})\b", nomor)
+        m = _YEAR.search(nomor)
         if m:
             return int(m.group(1))
 
     if filename:
-        m = re.search(r"\b(20\d{2})\b", filename)
+        m = _YEAR.search(filename)
         if m:
             return int(m.group(1))
 
@@ -201,72 +323,93 @@ def detect_jenis(text: str, nomor: Optional[str] = None, filename: Optional[str]
     2. Fallback to heuristics: KOP detection, nomor patterns, filename
     """
     # Try ML classifier first if available and text is sufficient
-    if USE_ML_CLASSIFIER and text and len(text.strip()) > 50:
-        try:
-            jenis, confidence = ml_classify(text)
-            # Use ML prediction if high confidence
-            if confidence > 0.7:
-                log.info(f"ML Classifier: {jenis} (confidence: {confidence:.2%})")
-                return jenis
-            else:
-                log.debug(f"ML Classifier low confidence ({confidence:.2%}), using rules")
-        except Exception as e:
-            log.warning(f"ML classification failed: {e}, falling back to rules")
-    
+    jenis = _ml_jenis(text)
+    if jenis:
+        return jenis
+
     # Fallback to rule-based heuristics
-    T = _clean_text(text)
-    
-    # --- Rule 1 Only: Kop Detection for Pela Mampang ---
-    # Cari di 20 baris pertama (header)
-    lines = T.splitlines()[:20]
-    header_text = " ".join(lines).upper()
+    return _detect_jenis_rules(_clean_text(text), nomor, filename)
+
+
+def _ml_eligible(text: str) -> bool:
+    return bool(USE_ML_CLASSIFIER and text and len(text.strip()) > ML_MIN_CHARS)
+
+
+def _ml_jenis(text: str) -> Optional[str]:
+    """Jenis dari classifier bila tersedia & cukup yakin, selain itu None (pakai aturan)."""
+    if not _ml_eligible(text):
+        return None
+    try:
+        jenis, confidence = ml_classify(text)
+        # Use ML prediction if high confidence
+        if confidence > ML_MIN_CONFIDENCE:
+            log.info(f"ML Classifier: {jenis} (confidence: {confidence:.2%})")
+            return jenis
+        log.debug(f"ML Classifier low confidence ({confidence:.2%}), using rules")
+    except Exception as e:
+        log.warning(f"ML classification failed: {e}, falling back to rules")
+    return None
+
+
+def _detect_jenis_rules(T: str, nomor: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """Heuristik jenis dari teks yang sudah dinormalisasi: kop, kode nomor, nama file."""
+    engine = rules.get_rule_engine()
 
-    # Cek eksistensi Kop "KELURAHAN PELA MAMPANG"
-    has_kop_pela_mampang = ("KELURAHAN PELA MAMPANG" in header_text) or \
-                           ("PEMERINTAH KOTA ADMINISTRASI JAKARTA SELATAN" in header_text and "KECAMATAN MAMPANG PRAPATAN" in header_text)
+    # --- Rule 1 Only: Kop Detection for Pela Mampang ---
+    # Cari di 20 baris pertama (header); set aturan kop di data/classification_rules.json
+    header = engine.scan(" ".join(_head_lines(T, KOP_HEADER_LINES)), KOP_RULE_SETS)
 
-    if has_kop_pela_mampang:
+    # Kop "KELURAHAN PELA MAMPANG" (atau kop Jakarta Selatan + Kecamatan Mampang Prapatan)
+    if header.matched("kop_keluar") or header.matched("kop_keluar_wilayah"):
         return "keluar"
-    
+
     # Jika ada teks panjang di header tapi BUKAN Pela Mampang -> Masuk (dari instansi lain)
     # Asumsi: Header surat biasanya ada "PEMERINTAH..." atau "KEMENTERIAN..."
-    if "PEMERINTAH" in header_text or "KEMENTERIAN" in header_text or "DEWAN" in header_text or "PT." in header_text:
+    if header.matched("kop_instansi_lain"):
         return "masuk"
 
     # --- Fallback (Jika OCR Header Gagal/Tidak Ada Kop) ---
-    
+
     # Cek Nomor (Helper)
     if nomor:
-        if re.search(r"(?i)(?:^|/|[-_])SM(?:/|[-_]|$)", nomor):
+        kode = engine.scan(nomor, ("kode_masuk", "kode_keluar"))
+        if kode.matched("kode_masuk"):
             return "masuk"
-        if re.search(r"(?i)(?:^|/|[-_])SK(?:/|[-_]|$)", nomor):
+        if kode.matched("kode_keluar"):
             return "keluar"
 
     # Cek Filename (Helper)
     if filename:
-        name = filename.rsplit(".", 1)[0]
-        if re.search(r"(?i)(?:^|/|[-_])SM(?:/|[-_]|$)", name) or re.search(r"(?i)\bmasuk\b", name):
+        name = engine.scan(filename.rsplit(".", 1)[0], ("nama_file_masuk", "nama_file_keluar"))
+        if name.matched("nama_file_masuk"):
             return "masuk"
-        if re.search(r"(?i)(?:^|/|[-_])SK(?:/|[-_]|$)", name) or re.search(r"(?i)\bkeluar\b", name):
+        if name.matched("nama_file_keluar"):
             return "keluar"
-    
+
     # Default ke Lainnya (jika tidak terdeteksi pola surat umum)
     return "lainnya"
 
 
 def parse_metadata(text: str, filename: Optional[str], uploaded_at: datetime) -> Dict[str, Optional[str]]:
     """
-    Parser terpadu untuk satu surat.
+    Parser terpadu untuk satu surat (teks dinormalisasi sekali untuk semua extractor).
     """
-    nomor = extract_nomor_surat(text, filename)
-    sifat = extract_sifat_surat(text)
-    perihal = extract_perihal(text, filename)
-    dt = extract_tanggal(text)
+    return _parse(text, filename, uploaded_at, _ml_jenis(text))
+
+
+def _parse(text: str, filename: Optional[str], uploaded_at: datetime, jenis_ml: Optional[str]) -> Dict[str, Optional[str]]:
+    """Semua extractor atas satu teks; `jenis_ml` = hasil classifier yang diterima (atau None)."""
+    T = _clean_text(text)
+    folded = _fold(T)
+    nomor = _scan_nomor(T, filename, folded)
+    sifat = _scan_sifat(T, folded)
+    perihal = _scan_perihal(T, filename, folded)
+    dt = _scan_tanggal(T)
     tanggal_str = dt.strftime("%d %B %Y") if dt and dt.day != 1 else (dt.strftime("%Y") if dt else None)
 
     tahun = decide_tahun(dt, uploaded_at, nomor, filename)
-    jenis = detect_jenis(text, nomor, filename)
-    peng_pener = extract_pengirim_penerima(text)
+    jenis = jenis_ml or _detect_jenis_rules(T, nomor, filename)
+    peng_pener = _scan_pengirim_penerima(T, folded)
 
     return {
         "nomor": nomor,       # Real Number for DB/Slug
@@ -278,3 +421,64 @@ def parse_metadata(text: str, filename: Optional[str], uploaded_at: datetime) ->
         "pengirim": peng_pener.get("pengirim"),
         "penerima": peng_pener.get("penerima"),
     }
+
+
+def _parse_chunk(chunk: List[BatchItem]) -> List[Dict[str, Optional[str]]]:
+    """Parse satu potongan batch; semua teks yang layak ML diklasifikasi dalam satu panggilan."""
+    jenis_ml: List[Optional[str]] = [None] * len(chunk)
+    eligible = [i for i, (text, _filename, _uploaded_at) in enumerate(chunk) if _ml_eligible(text)]
+    if eligible:
+        try:
+            results = ml_classify_batch([chunk[i][0] for i in eligible])
+        except Exception as e:
+            log.warning(f"ML batch classification failed: {e}, falling back to rules")
+            results = []
+        for i, (jenis, confidence) in zip(eligible, results):
+            if confidence > ML_MIN_CONFIDENCE:
+                jenis_ml[i] = jenis
+        log.debug(f"ML Classifier batch: {sum(j is not None for j in jenis_ml)}/{len(eligible)} confident")
+    return [
+        _parse(text, filename, uploaded_at, jenis)
+        for (text, filename, uploaded_at), jenis in zip(chunk, jenis_ml)
+    ]
+
+
+def _chunks(items: Iterable[BatchItem], size: int) -> Iterator[List[BatchItem]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_metadata_batch(
+    items: Iterable[BatchItem],
+    chunk_size: int = METADATA_BATCH_SIZE,
+    workers: int = 1,
+) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    `parse_metadata` untuk banyak dokumen: (text, filename, uploaded_at) -> dict, urutan sama.
+
+    `items` dibaca malas per `chunk_size`; dengan `workers > 1` potongan diproses di process
+    pool dan paling banyak `2 * workers` potongan berjalan/menunggu sekaligus, jadi memori
+    tetap datar untuk arsip sebesar apa pun. Hasilnya identik dengan `parse_metadata` per
+    dokumen (kecuali log per dokumen dari classifier).
+    """
+    chunks = _chunks(items, max(1, chunk_size))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending: Deque = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
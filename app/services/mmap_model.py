@@ -0,0 +1,200 @@
+"""
+Format model classifier yang di-memory-map (dibagi antar worker uvicorn/gunicorn).
+
+`classifier_model.pkl` (Pipeline TfidfVectorizer + MultinomialNB) di-unpickle ulang di setiap
+proses worker: dict vocabulary, set `stop_words_` (istilah yang dipangkas saat training, tidak
+dipakai saat prediksi) dan array bobot tersalin ke heap masing-masing. Format ini menyimpan
+yang dibutuhkan saat prediksi saja, sebagai array NumPy `.npy` yang dibuka `mmap_mode="r"`
+sehingga semua worker berbagi page cache yang sama:
+
+- `vocab`: istilah UTF-8 terurut (dtype `S<n>`), dicari per batch dengan `np.searchsorted`;
+  `columns`: indeks fitur untuk setiap istilah terurut
+- `idf`, `feature_log_prob`, `class_log_prior`, `classes`
+- `manifest.json`: parameter analyzer & nama file array; ditulis terakhir (ganti atomik)
+  sehingga registry yang memantau file (`model_registry`) tidak membaca export setengah jadi
+
+`MappedModel.predict_proba` mereplikasi analyzer 'word' sklearn (lowercase, token_pattern,
+n-gram), tf-idf (norm, sublinear_tf) dan `MultinomialNB.predict_proba` dengan hasil yang
+sama (selisih pembulatan float). Export: `scripts/export_mmap_model.py`; arahkan
+`ML_MODEL_PATH` ke direktori hasil export.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, List, Sequence, Union
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+MAPPED_FORMAT = "tfidf-multinomialnb-mmap/1"
+MANIFEST_FILENAME = "manifest.json"
+ARRAYS = ("vocab", "columns", "idf", "feature_log_prob", "class_log_prior", "classes")
+
+# Parameter TfidfVectorizer yang harus bernilai default agar analyzer di bawah identik
+_DEFAULT_VECTORIZER_PARAMS = {
+    "analyzer": "word",
+    "preprocessor": None,
+    "tokenizer": None,
+    "stop_words": None,
+    "strip_accents": None,
+    "input": "content",
+    "binary": False,
+}
+
+
+def _split_pipeline(pipeline: Any):
+    try:
+        vectorizer = pipeline.steps[0][1]
+        classifier = pipeline.steps[-1][1]
+    except (AttributeError, IndexError, TypeError):
+        raise ValueError("expected a sklearn Pipeline (TfidfVectorizer, MultinomialNB)")
+    if len(pipeline.steps) != 2 or type(vectorizer).__name__ != "TfidfVectorizer" or type(classifier).__name__ != "MultinomialNB":
+        raise ValueError(f"unsupported pipeline for mmap export: {[type(s).__name__ for _, s in pipeline.steps]}")
+    params = vectorizer.get_params()
+    for key, expected in _DEFAULT_VECTORIZER_PARAMS.items():
+        if params.get(key) != expected:
+            raise ValueError(f"unsupported TfidfVectorizer {key}={params.get(key)!r} for mmap export")
+    return vectorizer, classifier
+
+
+def export_model(pipeline: Any, out_dir: Union[str, Path], version: str = "") -> Path:
+    """Tulis `pipeline` ke `out_dir` dalam format mmap. File array diberi sufiks versi (sha256
+    parameter analyzer + isi array) lalu manifest diganti atomik; array versi lama dihapus (best effort)."""
+    vectorizer, classifier = _split_pipeline(pipeline)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    params = vectorizer.get_params()
+    analyzer = {
+        "lowercase": bool(params["lowercase"]),
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "norm": params["norm"],
+        "use_idf": bool(params["use_idf"]),
+        "sublinear_tf": bool(params["sublinear_tf"]),
+    }
+    terms = sorted(vectorizer.vocabulary_, key=lambda t: t.encode("utf-8"))
+    arrays = {
+        "vocab": np.array([t.encode("utf-8") for t in terms], dtype=bytes),
+        "columns": np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32),
+        "idf": np.ascontiguousarray(vectorizer.idf_ if params["use_idf"] else np.ones(len(terms)), dtype=np.float64),
+        "feature_log_prob": np.ascontiguousarray(classifier.feature_log_prob_, dtype=np.float64),
+        "class_log_prior": np.ascontiguousarray(classifier.class_log_prior_, dtype=np.float64),
+        "classes": np.array([str(c) for c in classifier.classes_]),
+    }
+    if not version:
+        digest = hashlib.sha256(json.dumps(analyzer, sort_keys=True).encode("utf-8"))
+        for array in arrays.values():
+            digest.update(array.tobytes())
+        version = digest.hexdigest()[:12]
+    files = {}
+    for name, array in arrays.items():
+        files[name] = f"{name}-{version}.npy"
+        # Selalu file baru + ganti atomik: export ulang versi yang sama tidak menimpa isi
+        # file yang sedang di-mmap worker lain
+        tmp = out_dir / (files[name] + ".tmp")
+        with tmp.open("wb") as fh:
+            np.save(fh, array, allow_pickle=False)
+        os.replace(tmp, out_dir / files[name])
+
+    manifest = {"format": MAPPED_FORMAT, "version": version, "n_features": len(terms), **analyzer, "files": files}
+    tmp = out_dir / (MANIFEST_FILENAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1) + "\n", encoding="utf-8")
+    os.replace(tmp, out_dir / MANIFEST_FILENAME)
+
+    keep = set(files.values())
+    for stale in out_dir.glob("*.npy"):
+        if stale.name not in keep:
+            try:
+                stale.unlink()
+            except OSError:
+                # Windows: file yang masih di-mmap worker tidak bisa dihapus; dibersihkan export berikutnya
+                pass
+    return out_dir
+
+
+class MappedModel:
+    """Pengganti Pipeline untuk prediksi (`predict_proba`, `predict`, `classes_`) di atas array mmap."""
+
+    def __init__(self, path: Union[str, Path], mmap_mode: str = "r") -> None:
+        self.path = Path(path)
+        manifest = json.loads((self.path / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+        if manifest.get("format") != MAPPED_FORMAT:
+            raise ValueError(f"unsupported model format {manifest.get('format')!r} in {self.path}")
+        self.manifest = manifest
+        self.version = manifest["version"]
+        arrays = {name: np.load(self.path / manifest["files"][name], mmap_mode=mmap_mode) for name in ARRAYS}
+        self.vocab = arrays["vocab"]
+        self.columns = arrays["columns"]
+        self.idf = arrays["idf"]
+        self.feature_log_prob = arrays["feature_log_prob"]
+        self.class_log_prior = arrays["class_log_prior"]
+        self.classes_ = np.asarray(arrays["classes"])
+        self._token = re.compile(manifest["token_pattern"])
+        self._min_n, self._max_n = manifest["ngram_range"]
+
+    def _analyze(self, text: str) -> List[str]:
+        """Sama dengan `build_analyzer()` TfidfVectorizer analyzer='word' tanpa stop words."""
+        if self.manifest["lowercase"]:
+            text = text.lower()
+        original = self._token.findall(text)
+        min_n, max_n = self._min_n, self._max_n
+        if max_n == 1:
+            return original
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        space_join = " ".join
+        n_original = len(original)
+        for n in range(min_n, min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(space_join(original[i : i + n]))
+        return tokens
+
+    def _features(self, text: str):
+        """(kolom fitur, nilai tf-idf ternormalisasi) untuk satu dokumen (sparse)."""
+        counts = Counter(self._analyze(text))
+        if not counts:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        terms = np.array([t.encode("utf-8") for t in counts], dtype=bytes)
+        pos = np.searchsorted(self.vocab, terms)
+        pos[pos >= len(self.vocab)] = 0
+        hit = self.vocab[pos] == terms
+        if not hit.any():
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        cols = self.columns[pos[hit]].astype(np.intp)
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))[hit]
+        if self.manifest["sublinear_tf"]:
+            tf = np.log(tf) + 1
+        values = tf * self.idf[cols] if self.manifest["use_idf"] else tf
+        norm = self.manifest["norm"]
+        if norm == "l2":
+            values = values / np.sqrt(np.dot(values, values))
+        elif norm == "l1":
+            values = values / np.abs(values).sum()
+        return cols, values
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        jll = np.empty((len(texts), len(self.classes_)))
+        for row, text in enumerate(texts):
+            cols, values = self._features(text)
+            jll[row] = self.feature_log_prob[:, cols] @ values + self.class_log_prior
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+    def __repr__(self) -> str:
+        return f"MappedModel({self.path.as_posix()!r}, version={self.version!r}, n_features={self.manifest['n_features']})"
+
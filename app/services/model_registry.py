@@ -0,0 +1,237 @@
+"""
+Registry model classifier ML (jenis surat): dimuat saat pertama dipakai, bisa diganti
+tanpa restart.
+
+Sebelumnya `classifier_ml` menjalankan `joblib.load` saat import, sehingga setiap worker,
+script dan test membayar waktu muat model di startup, dan model hasil training ulang baru
+terpakai setelah restart. Sekarang:
+
+- `model_registry.current` memuat model (`settings.ML_MODEL_PATH`: file .pkl, atau direktori
+  format mmap yang dibagi antar worker, lihat `app.services.mmap_model`) saat pertama dibutuhkan;
+  `warmup()` (lifespan, bila `ML_MODEL_WARMUP`) memuat + satu prediksi kosong di startup
+- `reload()` memuat versi baru (pembaca tidak menunggu) lalu menukar referensi secara atomik; pemanggil
+  yang sedang memakai versi lama tetap memegang objeknya sampai selesai. Bila gagal dimuat,
+  versi lama tetap aktif
+- `start()` memantau file model (mtime & ukuran) tiap `ML_MODEL_WATCH_INTERVAL` detik dan
+  reload otomatis bila berubah; `POST /admin/model/reload` untuk reload manual
+- `stats()` (GET /healthz/model): versi aktif (sha256 file), waktu & durasi muat, error terakhir
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+Signature = Tuple[int, int]  # (mtime_ns, size) file model
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    model: Any
+    version: str  # 12 digit pertama sha256 isi file (.pkl / manifest mmap)
+    path: str
+    signature: Signature
+    loaded_at: datetime
+    load_seconds: float
+
+    def as_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": self.loaded_at.isoformat() + "Z",
+            "load_seconds": round(self.load_seconds, 4),
+        }
+
+
+def _model_file(path: Path) -> Path:
+    """File yang menandai versi model: file .pkl itu sendiri, atau manifest format mmap."""
+    if path.is_dir():
+        from app.services.mmap_model import MANIFEST_FILENAME
+
+        return path / MANIFEST_FILENAME
+    return path
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        st = _model_file(path).stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_version(path: Path) -> str:
+    digest = hashlib.sha256()
+    with _model_file(path).open("rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def load_model(path: Path) -> Any:
+    """Direktori export mmap (`app.services.mmap_model`) atau pickle joblib."""
+    if path.is_dir():
+        from app.services.mmap_model import MappedModel
+
+        return MappedModel(path)
+    import joblib
+
+    return joblib.load(path)
+
+
+class ModelRegistry:
+    """Satu model aktif per proses; muat malas, reload atomik, pemantauan file opsional."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, loader: Callable[[Path], Any] = load_model) -> None:
+        self._path = Path(path) if path else None
+        self._loader = loader
+        self._current: Optional[LoadedModel] = None
+        self._checked = False  # percobaan muat pertama sudah dilakukan (berhasil atau tidak)
+        self._failed_signature: Optional[Signature] = None
+        self._lock = threading.Lock()  # serialisasi muat/reload; pembaca tidak pernah menunggu setelah muat pertama
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+        self.loads = 0
+        self.failures = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path or settings.ML_MODEL_FILE
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        """Model aktif (dimuat saat pertama dipanggil); None bila file tidak ada / gagal dimuat."""
+        if not self._checked:
+            with self._lock:
+                if not self._checked:
+                    self._load_locked()
+        return self._current
+
+    @property
+    def model(self) -> Any:
+        loaded = self.current
+        return loaded.model if loaded else None
+
+    def reload(self) -> Optional[LoadedModel]:
+        """Muat ulang file model sekarang. Gagal -> versi lama tetap aktif, error di `self.error`."""
+        with self._lock:
+            self._load_locked()
+        return self._current
+
+    def warmup(self) -> Optional[LoadedModel]:
+        """Muat model + satu prediksi agar request pertama tidak membayar biaya inisialisasi."""
+        loaded = self.current
+        if loaded is not None:
+            try:
+                loaded.model.predict_proba([""])
+            except Exception as e:
+                log.warning(f"ML model warm-up failed: {e}")
+        return loaded
+
+    def _load_locked(self) -> None:
+        try:
+            self._load_attempt()
+        finally:
+            # Baru ditandai setelah percobaan selesai: pemanggil bersamaan saat muat pertama
+            # menunggu lock, bukan langsung melihat `_current is None` (fallback aturan)
+            self._checked = True
+
+    def _load_attempt(self) -> None:
+        path = self.path
+        signature = _signature(path)
+        if signature is None:
+            self.error = f"model file not found: {path}"
+            if self._current is None:
+                log.info(f"ML model not available ({path}), using rule-based classification")
+            else:
+                log.warning(f"ML model file missing ({path}), keeping version {self._current.version}")
+            return
+        t0 = time.perf_counter()
+        try:
+            version = _file_version(path)
+            model = self._loader(path)
+        except Exception as e:
+            self.failures += 1
+            self._failed_signature = signature
+            self.error = f"{type(e).__name__}: {e}"
+            kept = f", keeping version {self._current.version}" if self._current else ", using rule-based"
+            log.warning(f"ML model load failed ({path}): {e}{kept}")
+            return
+        loaded = LoadedModel(
+            model=model,
+            version=version,
+            path=path.as_posix(),
+            signature=signature,
+            loaded_at=datetime.utcnow(),
+            load_seconds=time.perf_counter() - t0,
+        )
+        previous, self._current = self._current, loaded
+        self._failed_signature = None
+        self.error = None
+        self.loads += 1
+        if previous is None:
+            log.info(f"✅ ML classifier {loaded.version} loaded from {path} in {loaded.load_seconds:.2f}s")
+        elif previous.version != loaded.version:
+            log.info(f"ML classifier swapped {previous.version} -> {loaded.version} in {loaded.load_seconds:.2f}s")
+
+    def check_for_update(self) -> bool:
+        """Reload bila file berubah sejak versi aktif (atau sejak percobaan gagal terakhir)."""
+        signature = _signature(self.path)
+        if signature is None or signature == self._failed_signature:
+            return False
+        active = self._current.signature if self._current else None
+        if signature == active:
+            return False
+        self.reload()
+        return True
+
+    def start(self, interval: Optional[int] = None, warmup: Optional[bool] = None) -> None:
+        """Warm-up opsional (default settings.ML_MODEL_WARMUP), lalu pantau file tiap `interval` detik."""
+        if settings.ML_MODEL_WARMUP if warmup is None else warmup:
+            self.warmup()
+        interval = settings.ML_MODEL_WATCH_INTERVAL if interval is None else interval
+        if interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,), name="ml-model-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _loop(self, interval: int) -> None:
+        while not self._stop.wait(interval):
+            try:
+                # Model belum pernah diminta: tidak perlu dimuat hanya karena file berubah
+                if self._checked:
+                    self.check_for_update()
+            except Exception as e:
+                log.warning(f"ML model watch failed: {e}")
+
+    def stats(self) -> Dict:
+        loaded = self._current
+        return {
+            "loaded": loaded is not None,
+            "checked": self._checked,
+            "path": self.path.as_posix(),
+            "active": loaded.as_dict() if loaded else None,
+            "loads": self.loads,
+            "failures": self.failures,
+            "error": self.error,
+            "watching": self._thread is not None,
+            "pid": os.getpid(),
+        }
+
+
+# Registry default yang dipakai classifier_ml, lifespan & router admin/health
+model_registry = ModelRegistry()
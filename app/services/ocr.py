@@ -1,13 +1,33 @@
 
 # app/services/ocr.py
 """
-OCR untuk PDF scan menggunakan PyMuPDF (render) + pytesseract.
+OCR untuk PDF scan menggunakan PyMuPDF (render) + backend Tesseract.
+
+Backend OCR (`settings.OCR_BACKEND`, lihat `get_backend`):
+- `tesserocr`   : binding C-API, satu engine per thread/proses dengan data bahasa dimuat
+                  sekali; tanpa subprocess & file temp per halaman.
+- `pytesseract` : menjalankan `tesseract` sebagai subprocess per halaman (fallback).
+- `auto`        : tesserocr bila terpasang & bisa diinisialisasi, selain itu pytesseract.
+
+Ketersediaan engine, versi & bahasa diambil dari probe `ocr_capabilities` (sekali saat
+startup), bukan dicoba ulang per halaman.
 """
 
+import hashlib
 import logging
+import os
 import tempfile
-from pathlib import Path
+import threading
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Executor, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple, Union
 from app.config import settings
+from app.services.ocr_cache import ocr_page_cache
+from app.services.ocr_capabilities import ocr_capabilities
+from app.services.ocr_preprocess import preprocess_image, preprocess_signature
+from app.services.scheduler import ocr_page_governor
+from app.utils.hash import sha256_copy
 
 log = logging.getLogger(__name__)
 
@@ -17,6 +37,11 @@ try:
 except Exception:
     pytesseract = None
 
+try:
+    import tesserocr
+except Exception:
+    tesserocr = None
+
 try:
     from PIL import Image
 except Exception:
@@ -38,61 +63,381 @@ if pytesseract and settings.TESSERACT_CMD:
 
 from app.constants import DEFAULT_OCR_DPI, TESSERACT_LANG
 
-def ocr_pdf_to_text(path: str, dpi: int = DEFAULT_OCR_DPI) -> str:
-    """
-    Render setiap halaman PDF ke gambar dan lakukan OCR, gabungkan hasil per halaman.
+# Kunci cache OCR untuk halaman yang di-OCR dengan bahasa default tesseract
+DEFAULT_LANG_KEY = "default"
 
-    Perbaikan:
-    - Coba bahasa 'ind' lalu fallback ke default jika gagal
-    - Konversi ke grayscale dan sederhana threshold bila perlu
-    - Tangani error per-halaman agar OCR halaman lain tetap berjalan
-    - Improved logging dan tempfile cleanup dengan context manager
+
+class PytesseractBackend:
+    """OCR via pytesseract (subprocess `tesseract` per gambar).
+
+    `lang=None` memakai bahasa default tesseract. Bila bahasa belum diketahui tersedia
+    (probe tidak bisa membaca daftar bahasa), ketersediaannya ditentukan sekali: bila OCR
+    pertama dengan `lang` gagal, panggilan berikutnya langsung memakai bahasa default
+    (tanpa OCR dua kali per halaman).
     """
-    text_chunks = []
 
-    if not pytesseract:
-        log.warning("pytesseract not available, OCR skipped")
-        return ""
+    name = "pytesseract"
 
-    with fitz.open(path) as doc:
-        total_pages = doc.page_count
-        log.info(f"Starting OCR on {path}: {total_pages} pages")
-        for page_number, page in enumerate(doc, start=1):
+    def __init__(
+        self,
+        module=None,
+        lang: Optional[str] = TESSERACT_LANG,
+        version: Optional[str] = None,
+        lang_ok: Optional[bool] = None,
+    ) -> None:
+        self.module = module if module is not None else pytesseract
+        self.lang = lang
+        # True = traineddata terpasang menurut probe; None = diketahui dari OCR pertama
+        self._lang_ok: Optional[bool] = lang_ok if lang else False
+        self._version: Optional[str] = version
+
+    @property
+    def cache_lang(self) -> Optional[str]:
+        """Bahasa yang benar-benar dipakai, untuk kunci cache OCR; None = belum pasti (jangan di-cache)."""
+        if self._lang_ok is None:
+            return None
+        return self.lang if self._lang_ok else DEFAULT_LANG_KEY
+
+    @property
+    def engine(self) -> str:
+        """Identitas engine untuk kunci cache OCR."""
+        if self._version is None:
             try:
-                pix = page.get_pixmap(dpi=dpi)
+                self._version = str(self.module.get_tesseract_version())
+            except Exception:
+                self._version = "unknown"
+        return f"tesseract-{self._version}"
+
+    def image_to_string(self, img) -> str:
+        if self._lang_ok is not False:
+            try:
+                text = self.module.image_to_string(img, lang=self.lang)
+                self._lang_ok = True
+                return text
             except Exception as e:
-                log.warning(f"Failed to render page {page_number}: {e}")
-                continue
+                if self._lang_ok:
+                    raise  # bahasa pernah berhasil -> ini kegagalan halaman, bukan bahasa
+                # Bila default juga gagal, masalahnya bukan bahasa: status tetap belum diketahui
+                text = self.module.image_to_string(img)
+                log.warning(f"OCR with lang={self.lang} failed ({e}); using tesseract default language")
+                self._lang_ok = False
+                return text
+        return self.module.image_to_string(img)
+
 
-            # Use TemporaryDirectory context manager for automatic cleanup
+class TesserocrBackend:
+    """OCR in-process via tesserocr: satu `PyTessBaseAPI` per thread, dibuat sekali & dipakai ulang."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: Optional[str] = TESSERACT_LANG) -> None:
+        if tesserocr is None:
+            raise RuntimeError("tesserocr not installed")
+        self.lang = lang
+        self._lang_failed = False
+        self._local = threading.local()
+        self._api()  # gagal cepat bila engine tidak bisa diinisialisasi
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
             try:
-                with tempfile.TemporaryDirectory() as tmp_dir:
-                    tmp_file = Path(tmp_dir) / f"page_{page_number}.png"
-                    tmp_file.write_bytes(pix.tobytes("png"))
+                api = tesserocr.PyTessBaseAPI(lang=self.lang) if self.lang else tesserocr.PyTessBaseAPI()
+            except RuntimeError as e:
+                log.warning(f"tesserocr lang={self.lang} unavailable ({e}); using default language")
+                self._lang_failed = True
+                api = tesserocr.PyTessBaseAPI()
+            self._local.api = api
+        return api
 
-                    img = Image.open(tmp_file)
-                    # Konversi ke grayscale untuk meningkatkan OCR pada gambar dokumen
-                    img = img.convert("L")
+    @property
+    def engine(self) -> str:
+        return f"tesserocr-{tesserocr.tesseract_version().split()[1]}"
 
-                    # Coba OCR dengan bahasa Indonesia terlebih dahulu
-                    try:
-                        txt = pytesseract.image_to_string(img, lang=TESSERACT_LANG)
-                    except Exception as e:
-                        log.debug(f"Page {page_number} OCR with lang={TESSERACT_LANG} failed: {e}")
-                        # Fallback tanpa spesifikasi bahasa
-                        try:
-                            txt = pytesseract.image_to_string(img)
-                        except Exception as e:
-                            log.error(f"Page {page_number} OCR default failed: {e}")
-                            txt = ""
-
-                    log.debug(f"Page {page_number} OCR extracted {len(txt or '')} chars")
-                    text_chunks.append(txt or "")
+    @property
+    def cache_lang(self) -> Optional[str]:
+        """Bahasa yang benar-benar dipakai, untuk kunci cache OCR."""
+        return self.lang if self.lang and not self._lang_failed else DEFAULT_LANG_KEY
+
+    def image_to_string(self, img) -> str:
+        api = self._api()
+        api.SetImage(img)
+        return api.GetUTF8Text()
+
+
+OCR_BACKENDS = {"auto", "tesserocr", "pytesseract"}
+_backends: Dict[str, object] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None):
+    """Backend OCR per proses (dibuat sekali), atau None bila tidak ada yang tersedia.
+
+    `tesserocr` yang tidak tersedia jatuh ke pytesseract. Bahasa & versi diambil dari
+    `ocr_capabilities`; backend dibuat ulang bila hasil probe berubah.
+    """
+    name = (name or settings.OCR_BACKEND or "auto").lower()
+    if name not in OCR_BACKENDS:
+        log.warning(f"Unknown OCR_BACKEND={name!r}, falling back to 'auto'")
+        name = "auto"
+    with _backends_lock:
+        if name not in _backends:
+            caps = ocr_capabilities.current
+            lang = caps.ocr_lang(TESSERACT_LANG)
+            if lang != TESSERACT_LANG:
+                log.warning(f"Tesseract language '{TESSERACT_LANG}' not installed; OCR uses default language")
+            backend = None
+            if name != "pytesseract" and caps.tesserocr:
+                try:
+                    backend = TesserocrBackend(lang=lang)
+                except Exception as e:
+                    log.info(f"tesserocr backend unavailable ({e}), using pytesseract")
+            if backend is None and caps.pytesseract and caps.tesseract_version:
+                # Bahasa yang tercantum di daftar probe tidak perlu diverifikasi lewat OCR pertama
+                lang_ok = True if lang and caps.languages else None
+                backend = PytesseractBackend(lang=lang, version=caps.tesseract_version, lang_ok=lang_ok)
+            _backends[name] = backend
+        return _backends[name]
+
+
+def cache_lang(backend) -> Optional[str]:
+    """Bahasa efektif backend untuk kunci cache OCR; None = belum pasti, halaman tidak di-cache."""
+    return getattr(backend, "cache_lang", None)
+
+
+def _reset_backends(_caps=None) -> None:
+    with _backends_lock:
+        _backends.clear()
+
+
+ocr_capabilities.on_change(_reset_backends)
+
+
+@contextmanager
+def _pdf_path(source: Union[str, bytes]):
+    """Path PDF untuk worker pool: path apa adanya, bytes ditulis ke file temp sementara."""
+    if not isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+    fd, tmp = tempfile.mkstemp(suffix=".pdf", prefix="ocr-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(source)
+        yield tmp
+    finally:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _open_pdf(source: Union[str, bytes]):
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def source_sha256(source: Union[str, bytes]) -> str:
+    """SHA-256 isi PDF (path atau bytes), dipakai sebagai kunci cache OCR."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    with open(source, "rb") as fh:
+        return sha256_copy(fh)[0]
+
+
+def pdf_page_count(source: Union[str, bytes]) -> Optional[int]:
+    """Jumlah halaman PDF, atau None bila PyMuPDF tidak tersedia / PDF tidak terbaca."""
+    if fitz is None:
+        return None
+    try:
+        with _open_pdf(source) as doc:
+            return doc.page_count
+    except Exception:
+        return None
+
+
+def ocr_workers(requested: Optional[int] = None) -> int:
+    """Jumlah worker OCR: argumen -> settings.OCR_WORKERS -> jumlah CPU."""
+    return max(1, requested or settings.OCR_WORKERS or os.cpu_count() or 1)
+
+
+def render_page_image(page, dpi: int):
+    """Render halaman langsung ke grayscale dan bungkus sebagai PIL image tanpa salinan.
+
+    Pixmap dirender dalam colorspace GRAY (1 byte/pixel, tanpa alpha) lalu buffer
+    `samples_mv` dipakai langsung oleh PIL — tanpa encode PNG, tanpa file temp.
+    Pixmap dikembalikan juga karena image berbagi memori dengannya.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    return img, pix
+
+
+def _ocr_page(doc, page_number: int, dpi: int) -> Optional[str]:
+    """Render + OCR satu halaman. Halaman yang gagal menghasilkan `None` (tidak di-cache)."""
+    try:
+        img, pix = render_page_image(doc.load_page(page_number - 1), dpi)
+        img = preprocess_image(img)
+    except Exception as e:
+        log.warning(f"Failed to render page {page_number}: {e}")
+        return None
+
+    try:
+        # Backend menangani fallback bahasa sekali per proses, bukan per halaman
+        txt = get_backend().image_to_string(img)
+        log.debug(f"Page {page_number} OCR extracted {len(txt or '')} chars")
+        return txt or ""
+    except Exception as e:
+        # Jangan berhenti jika satu halaman gagal
+        log.error(f"Page {page_number} processing failed: {e}", exc_info=True)
+        return None
+
+
+# Pool proses OCR bersama (satu per proses server, dibuat saat pertama dibutuhkan).
+# Start method 'spawn': fork dari server multithread (threadpool, worker job, jalur scheduler)
+# bisa mewarisi lock yang sedang dipegang thread lain dan deadlock.
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=ocr_workers(), mp_context=get_context("spawn"))
+        return _ocr_pool
+
+
+def shutdown_ocr_pool(wait: bool = False) -> None:
+    """Hentikan pool OCR bersama (lifespan shutdown, atau setelah pool rusak)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _ocr_worker_page(args: Tuple[str, int, int]) -> Optional[str]:
+    path, page_number, dpi = args
+    # PDF dibuka per tugas dan langsung ditutup: worker tidak boleh memegang file spool/temp
+    # setelah tugas selesai (di Windows file yang terbuka tidak bisa dipindah/dihapus)
+    try:
+        doc = _open_pdf(path)
+    except Exception as e:
+        log.warning(f"Failed to open {path} in OCR worker: {e}")
+        return None
+    with doc:
+        return _ocr_page(doc, page_number, dpi)
+
+
+def _map_pages(pool: Executor, path: str, pages: List[int], dpi: int, limit: int) -> List[Optional[str]]:
+    """OCR `pages` di `pool` dengan paling banyak `limit` halaman berjalan; urutan hasil = urutan
+    `pages`. Halaman yang gagal (termasuk exception di worker) menghasilkan None."""
+    results: Dict[int, Optional[str]] = {}
+    queue = iter(enumerate(pages))
+    running: Dict[Future, int] = {}
+
+    def _submit_next() -> None:
+        for idx, page_number in queue:
+            running[pool.submit(_ocr_worker_page, (path, page_number, dpi))] = idx
+            return
+
+    for _ in range(max(1, limit)):
+        _submit_next()
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            idx = running.pop(future)
+            try:
+                results[idx] = future.result()
+            except BrokenExecutor:
+                raise
             except Exception as e:
-                # Jangan berhenti jika satu halaman gagal
-                log.error(f"Page {page_number} processing failed: {e}", exc_info=True)
-                text_chunks.append("")
+                log.error(f"Page {pages[idx]} OCR worker failed: {e}")
+                results[idx] = None
+            _submit_next()
+    return [results[i] for i in range(len(pages))]
+
+
+def ocr_pdf_pages(
+    source: Union[str, bytes],
+    pages: Optional[List[int]] = None,
+    dpi: int = DEFAULT_OCR_DPI,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """OCR halaman tertentu (`pages`, 1-based; default semua). Teks per halaman, urutan sama.
+
+    Halaman yang gagal di-OCR menghasilkan string kosong.
+    """
+    backend = get_backend()
+    if backend is None:
+        log.warning("No OCR backend available (tesserocr/pytesseract), OCR skipped")
+        return [""] * len(pages or [])
+
+    path = source if isinstance(source, str) else "<bytes>"
+    sha256 = source_sha256(source) if ocr_page_cache.enabled else None
+    engine = f"pymupdf+{backend.engine}{preprocess_signature()}"
+
+    with _open_pdf(source) as doc:
+        total_pages = doc.page_count
+        if pages is None:
+            pages = list(range(1, total_pages + 1))
+
+        def _ocr_missing(missing: List[int]) -> List[Optional[str]]:
+            # Jumlah worker dibatasi slot halaman OCR global yang tersedia
+            with ocr_page_governor.reserve(min(ocr_workers(workers), len(missing))) as n_workers:
+                log.info(f"Starting OCR on {path}: {len(missing)}/{total_pages} pages, {n_workers} worker(s)")
+                if n_workers <= 1:
+                    return [_ocr_page(doc, n, dpi) for n in missing]
+                # Worker pool bersama membuka PDF dari path (bytes ditulis ke file temp sekali)
+                with _pdf_path(source) as pdf_path:
+                    try:
+                        return _map_pages(_get_ocr_pool(), pdf_path, missing, dpi, n_workers)
+                    except BrokenExecutor as e:
+                        log.error(f"OCR process pool broken ({e}); OCR {path} in-process")
+                        shutdown_ocr_pool()
+                        return [_ocr_page(doc, n, dpi) for n in missing]
+
+        # Kunci cache = bahasa yang dipakai tesseract (bukan TESSERACT_LANG): hasil OCR dengan
+        # bahasa default tidak terpakai lagi setelah traineddata 'ind' dipasang
+        lang = cache_lang(backend)
+        return ocr_page_cache.ocr_pages(sha256 if lang else None, list(pages), dpi, lang or "", engine, _ocr_missing)
+
+
+def ocr_pdf_to_text(
+    source: Union[str, bytes],
+    dpi: int = DEFAULT_OCR_DPI,
+    workers: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> str:
+    """
+    Render setiap halaman PDF ke gambar dan lakukan OCR, gabungkan hasil per halaman.
+    `source` berupa path atau bytes PDF (dibuka langsung dari memori).
+
+    Perbaikan:
+    - Coba bahasa 'ind' lalu fallback ke default jika gagal (diputuskan sekali per backend)
+    - Backend OCR dapat dipilih (`get_backend`): tesserocr in-process atau pytesseract
+    - Render langsung ke grayscale di PyMuPDF, tanpa PNG/file temp (`render_page_image`)
+    - Preprocessing opsional (deskew, crop, binarize, downscale) via settings.OCR_PREPROCESS
+    - Tangani error per-halaman agar OCR halaman lain tetap berjalan
+    - Halaman dibagi ke process pool bersama (spawn, settings.OCR_WORKERS proses; per dokumen
+      `workers` halaman berjalan, dibatasi slot `ocr_page_governor`); worker membuka PDF
+      per halaman dan langsung menutupnya. Urutan halaman tetap.
+    - Hasil per halaman di-cache persisten (`ocr_page_cache`); hanya halaman yang belum
+      ada di cache yang di-render & di-OCR.
+    - `max_pages` membatasi OCR ke N halaman pertama (mode header-first).
+    """
+    if get_backend() is None:
+        log.warning("No OCR backend available (tesserocr/pytesseract), OCR skipped")
+        return ""
+
+    pages = None
+    if max_pages:
+        total_pages = pdf_page_count(source) or max_pages
+        pages = list(range(1, min(total_pages, max_pages) + 1))
+    text_chunks = ocr_pdf_pages(source, pages, dpi=dpi, workers=workers)
 
+    path = source if isinstance(source, str) else "<bytes>"
     result = "\n".join([t for t in text_chunks if t and t.strip()])
     log.info(f"OCR completed: {len(result)} chars extracted from {path}")
     return result.strip()
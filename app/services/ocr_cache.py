@@ -0,0 +1,225 @@
+"""
+Cache persisten hasil OCR per halaman.
+
+OCR adalah tahap paling mahal pada ingest; dokumen yang sama sering diproses ulang
+(ingest ulang, /upload/analyze lalu /upload/, reprocess setelah perbaikan parser).
+Hasil OCR disimpan per kunci:
+
+    (sha256 isi PDF, nomor halaman, dpi, bahasa tesseract, versi engine)
+
+di file SQLite terpisah (default: `ocr_cache.db` di samping database aplikasi), sehingga
+bertahan lintas restart dan dapat dipakai bersama oleh thread maupun proses worker.
+Total ukuran teks dibatasi `OCR_CACHE_MAX_BYTES`; bila terlampaui, entri yang paling lama
+tidak diakses dibuang. Counter hit/miss ikut disimpan di file cache (lihat `stats()`).
+
+Halaman yang OCR-nya gagal tidak disimpan, hanya halaman dengan hasil (termasuk kosong).
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+# Sisakan ruang setelah eviction agar tidak evict di setiap put
+_EVICT_TARGET_RATIO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    sha256 TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    dpi INTEGER NOT NULL,
+    lang TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (sha256, page, dpi, lang, engine)
+);
+CREATE INDEX IF NOT EXISTS ix_ocr_pages_accessed_at ON ocr_pages (accessed_at);
+CREATE TABLE IF NOT EXISTS ocr_cache_counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class OcrPageCache:
+    """Store SQLite untuk teks OCR per halaman dengan eviction berdasarkan ukuran."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self._path = Path(path) if path is not None else None
+        self._max_bytes = max_bytes
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._initialized: Optional[Path] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else settings.OCR_CACHE_FILE
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else settings.OCR_CACHE_MAX_BYTES
+
+    @property
+    def enabled(self) -> bool:
+        enabled = self._enabled if self._enabled is not None else settings.OCR_CACHE_ENABLED
+        return enabled and self.max_bytes > 0
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        path = self.path
+        if self._initialized != path:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(path, timeout=30)
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                finally:
+                    conn.close()
+                self._initialized = path
+
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, name: str, value: int) -> None:
+        if value:
+            conn.execute(
+                "INSERT INTO ocr_cache_counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, value),
+            )
+
+    def get_many(self, sha256: str, pages: Sequence[int], dpi: int, lang: str, engine: str) -> Dict[int, str]:
+        """Ambil teks untuk `pages` yang ada di cache; hit/miss dihitung per halaman."""
+        if not self.enabled or not pages:
+            return {}
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT page, text FROM ocr_pages WHERE sha256 = ? AND dpi = ? AND lang = ? AND engine = ?",
+                    (sha256, dpi, lang, engine),
+                ).fetchall()
+                wanted = set(pages)
+                found = {page: text for page, text in rows if page in wanted}
+                if found:
+                    # Hanya halaman yang benar-benar dipakai: halaman lain dokumen ini tetap "dingin" untuk LRU
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE ocr_pages SET accessed_at = ? WHERE sha256 = ? AND page = ? AND dpi = ? AND lang = ? AND engine = ?",
+                        [(now, sha256, page, dpi, lang, engine) for page in found],
+                    )
+                self._count(conn, "hits", len(found))
+                self._count(conn, "misses", len(wanted) - len(found))
+                return found
+        except sqlite3.Error as e:
+            log.warning(f"OCR cache lookup failed: {e}")
+            return {}
+
+    def put_many(self, sha256: str, texts: Dict[int, str], dpi: int, lang: str, engine: str) -> None:
+        """Simpan teks per halaman lalu evict entri terlama bila melebihi `max_bytes`."""
+        if not self.enabled or not texts:
+            return
+        now = time.time()
+        rows = [
+            (sha256, page, dpi, lang, engine, text, len(text.encode("utf-8")), now)
+            for page, text in texts.items()
+        ]
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO ocr_pages (sha256, page, dpi, lang, engine, text, size, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            log.warning(f"OCR cache store failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        evicted = 0
+        doomed = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM ocr_pages ORDER BY accessed_at"):
+            if total <= target:
+                break
+            doomed.append((rowid,))
+            total -= size
+            evicted += 1
+        conn.executemany("DELETE FROM ocr_pages WHERE rowid = ?", doomed)
+        self._count(conn, "evictions", evicted)
+        log.info(f"OCR cache evicted {evicted} page(s), {total} bytes left")
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM ocr_pages")
+            conn.execute("DELETE FROM ocr_cache_counters")
+
+    def stats(self) -> Dict:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM ocr_cache_counters").fetchall())
+        return {
+            "enabled": True,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def ocr_pages(
+        self,
+        sha256: Optional[str],
+        pages: Sequence[int],
+        dpi: int,
+        lang: str,
+        engine: str,
+        ocr_missing: Callable[[List[int]], List[Optional[str]]],
+    ) -> List[str]:
+        """Teks per halaman (urutan `pages`): dari cache bila ada, sisanya via `ocr_missing`.
+
+        `ocr_missing(pages)` mengembalikan teks per halaman; `None` berarti OCR halaman itu
+        gagal (hasil kosong, tidak disimpan ke cache).
+        """
+        cached = self.get_many(sha256, pages, dpi, lang, engine) if sha256 else {}
+        missing = [p for p in pages if p not in cached]
+        fresh: Dict[int, str] = {}
+        if missing:
+            for page, text in zip(missing, ocr_missing(missing)):
+                if text is not None:
+                    fresh[page] = text
+            if sha256:
+                self.put_many(sha256, fresh, dpi, lang, engine)
+        elif pages:
+            log.info(f"OCR cache hit for all {len(pages)} page(s) of {sha256[:12]}")
+        return [cached.get(p, fresh.get(p, "")) for p in pages]
+
+
+# Cache default yang dipakai `ocr_pdf_to_text` & `TextExtractor`
+ocr_page_cache = OcrPageCache()
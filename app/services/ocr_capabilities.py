@@ -0,0 +1,193 @@
+"""
+Probe kemampuan OCR (sekali saat startup, di-refresh berkala di background).
+
+Sebelumnya tiap halaman OCR mencoba `lang=TESSERACT_LANG` lalu mengulang tanpa bahasa
+bila gagal, dan `/healthz/ocr` mengimpor modul serta menjalankan `tesseract --version`
+di setiap request. Sekarang semua itu diperiksa sekali oleh `probe_capabilities()` dan
+hasilnya disimpan di `ocr_capabilities.current`:
+
+- modul tersedia: pytesseract, tesserocr, PyMuPDF, Pillow, pdf2image
+- Poppler (`pdftoppm`) untuk pdf2image
+- versi tesseract & daftar bahasa (traineddata) yang terpasang
+
+Dipakai oleh backend OCR (`app.services.ocr.get_backend`), `TextExtractor` dan router
+health. `ocr_capabilities.start()` dipanggil di lifespan; interval refresh diatur
+`settings.OCR_PROBE_INTERVAL` (detik, 0 = tanpa refresh).
+"""
+
+import logging
+import os
+import shutil
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.config import settings
+from app.constants import TESSERACT_LANG
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OcrCapabilities:
+    pytesseract: bool = False
+    tesserocr: bool = False
+    pymupdf: bool = False
+    pillow: bool = False
+    pdf2image: bool = False
+    poppler: bool = False
+    tesseract_cmd: str = ""
+    tesseract_cmd_exists: bool = False
+    tesseract_version: Optional[str] = None
+    languages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    probed_at: Optional[datetime] = None
+
+    @property
+    def tesseract(self) -> bool:
+        """Ada engine tesseract yang bisa dipakai (in-process atau binary)."""
+        return self.tesserocr or (self.pytesseract and self.tesseract_version is not None)
+
+    @property
+    def ocr(self) -> bool:
+        return self.pymupdf and self.pillow and self.tesseract
+
+    def ocr_lang(self, preferred: str = TESSERACT_LANG) -> Optional[str]:
+        """Bahasa yang dipakai OCR: `preferred` bila traineddata-nya terpasang.
+
+        None = pakai bahasa default tesseract. Bila daftar bahasa tidak diketahui
+        (probe gagal), `preferred` tetap dicoba.
+        """
+        if not self.languages or preferred in self.languages:
+            return preferred
+        return None
+
+    def as_dict(self) -> Dict:
+        data = asdict(self)
+        data["probed_at"] = self.probed_at.isoformat() + "Z" if self.probed_at else None
+        return data
+
+
+def probe_capabilities() -> OcrCapabilities:
+    """Periksa modul, binary & bahasa OCR. Tidak pernah raise."""
+    found: Dict = {}
+    errors: List[str] = []
+
+    try:
+        import pytesseract
+        found["pytesseract"] = True
+    except Exception:
+        pytesseract = None
+
+    try:
+        import tesserocr
+        found["tesserocr"] = True
+    except Exception:
+        tesserocr = None
+
+    for key, module in (("pymupdf", "fitz"), ("pillow", "PIL.Image"), ("pdf2image", "pdf2image")):
+        try:
+            __import__(module)
+            found[key] = True
+        except Exception:
+            pass
+
+    found["poppler"] = shutil.which("pdftoppm") is not None
+
+    tcmd = str(settings.TESSERACT_CMD or "")
+    found["tesseract_cmd"] = tcmd
+    found["tesseract_cmd_exists"] = bool(tcmd and os.path.exists(tcmd))
+
+    languages: List[str] = []
+    if pytesseract:
+        try:
+            if tcmd:
+                pytesseract.pytesseract.tesseract_cmd = tcmd
+            found["tesseract_version"] = str(pytesseract.get_tesseract_version())
+            languages = list(pytesseract.get_languages(config=""))
+        except Exception as e:
+            errors.append(str(e))
+    if tesserocr and not languages:
+        try:
+            languages = list(tesserocr.get_languages()[1])
+            found.setdefault("tesseract_version", tesserocr.tesseract_version().split()[1])
+        except Exception as e:
+            errors.append(str(e))
+
+    return OcrCapabilities(
+        languages=sorted(set(languages)),
+        error="; ".join(errors) or None,
+        probed_at=datetime.utcnow(),
+        **found,
+    )
+
+
+class OcrCapabilityProbe:
+    """Menyimpan hasil probe terakhir dan me-refresh-nya berkala di thread daemon."""
+
+    def __init__(self, probe: Callable[[], OcrCapabilities] = probe_capabilities) -> None:
+        self._probe = probe
+        self._current: Optional[OcrCapabilities] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[OcrCapabilities], None]] = []
+
+    @property
+    def current(self) -> OcrCapabilities:
+        """Hasil probe terakhir; probe pertama dijalankan saat dibutuhkan (mis. di proses worker)."""
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._probe()
+        return self._current
+
+    def on_change(self, listener: Callable[[OcrCapabilities], None]) -> None:
+        """Daftarkan callback yang dipanggil bila hasil refresh berbeda (mis. reset backend)."""
+        self._listeners.append(listener)
+
+    def refresh(self) -> OcrCapabilities:
+        caps = self._probe()
+        with self._lock:
+            previous, self._current = self._current, caps
+        if previous is not None and _comparable(previous) != _comparable(caps):
+            log.info(f"OCR capabilities changed: ocr={caps.ocr} version={caps.tesseract_version} langs={caps.languages}")
+            for listener in self._listeners:
+                listener(caps)
+        return caps
+
+    def start(self, interval: Optional[int] = None) -> OcrCapabilities:
+        """Probe sekarang, lalu refresh tiap `interval` detik (default settings.OCR_PROBE_INTERVAL)."""
+        caps = self.refresh()
+        log.info(
+            f"OCR capabilities: ocr={caps.ocr} tesseract={caps.tesseract_version} "
+            f"langs={caps.languages} poppler={caps.poppler} tesserocr={caps.tesserocr}"
+        )
+        interval = settings.OCR_PROBE_INTERVAL if interval is None else interval
+        if interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,), name="ocr-probe", daemon=True)
+            self._thread.start()
+        return caps
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _loop(self, interval: int) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                log.warning(f"OCR capability refresh failed: {e}")
+
+
+def _comparable(caps: OcrCapabilities) -> Dict:
+    data = asdict(caps)
+    data.pop("probed_at")
+    return data
+
+
+# Probe default yang dipakai backend OCR, TextExtractor & router health
+ocr_capabilities = OcrCapabilityProbe()
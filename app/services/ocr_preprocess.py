@@ -0,0 +1,211 @@
+
+# app/services/ocr_preprocess.py
+"""
+Preprocessing gambar halaman sebelum OCR (NumPy, tervektorisasi).
+
+Hasil scan mesin fotokopi kantor sering miring, abu-abu, dan berbingkai hitam; sebelumnya
+gambar hanya dikonversi ke grayscale. Pipeline di sini dipilih lewat
+`settings.OCR_PREPROCESS` (daftar langkah dipisah koma, dijalankan berurutan):
+
+- `downscale` : perkecil halaman yang resolusinya berlebih (lebar > OCR_PREPROCESS_MAX_WIDTH)
+- `crop`      : buang bingkai gelap hasil scan lalu margin putih (padding kecil disisakan)
+- `deskew`    : luruskan halaman miring; sudut dicari lewat variansi profil proyeksi
+                piksel tinta untuk semua kandidat sudut sekaligus
+- `binarize`  : threshold Otsu dari histogram (hitam/putih)
+
+Kosong = tanpa preprocessing (perilaku lama). Pilih kombinasi lewat
+`scripts/bench_ocr_preprocess.py` (throughput + akurasi field pada korpus fixture).
+Semua langkah memakai operasi array (histogram, bincount, reduksi baris/kolom), tanpa
+loop per piksel; rotasi & resize memakai PIL.
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+# Piksel < ambang ini dianggap tinta saat mencari skew / border (skala 0-255)
+INK_THRESHOLD = 128
+# Baris/kolom yang > fraksi ini gelap dianggap bingkai scanner, bukan isi
+BORDER_INK_RATIO = 0.6
+CROP_PADDING = 16
+# Rentang & resolusi pencarian sudut deskew (derajat)
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.2
+# Skew dicari pada versi kecil halaman & sampel piksel tinta agar tetap murah
+DESKEW_WORK_WIDTH = 1000
+DESKEW_MAX_SAMPLES = 40000
+# Sudut sekecil ini tidak dirotasi (rotasi ikut mengaburkan huruf)
+DESKEW_MIN_ANGLE = 0.3
+
+
+def _gray(img) -> "np.ndarray":
+    if img.mode != "L":
+        img = img.convert("L")
+    return np.asarray(img)
+
+
+def otsu_threshold(arr: "np.ndarray") -> int:
+    """Ambang Otsu: nilai yang memaksimalkan variansi antar-kelas histogram."""
+    hist = np.bincount(arr.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+    w0 = np.cumsum(hist)
+    w1 = w0[-1] - w0
+    sum0 = np.cumsum(hist * levels)
+    m0 = sum0 / np.maximum(w0, 1)
+    m1 = (sum0[-1] - sum0) / np.maximum(w1, 1)
+    between = w0 * w1 * (m0 - m1) ** 2
+    return int(np.argmax(between))
+
+
+def binarize(img):
+    """Hitam/putih dengan ambang Otsu (latar abu-abu jadi putih bersih)."""
+    gray = img if img.mode == "L" else img.convert("L")
+    t = otsu_threshold(np.asarray(gray))
+    # Lookup table 256 entri: lebih murah daripada membuat array hasil per piksel
+    lut = np.where(np.arange(256) > t, 255, 0).astype(np.uint8)
+    return gray.point(lut.tolist())
+
+
+def estimate_skew(arr: "np.ndarray", max_angle: float = DESKEW_MAX_ANGLE, step: float = DESKEW_STEP) -> float:
+    """Sudut miring teks (derajat; positif = berlawanan arah jarum jam).
+
+    Koordinat piksel tinta diproyeksikan ke sumbu vertikal untuk semua kandidat sudut
+    sekaligus (matriks sudut x piksel). Pada sudut yang benar baris teks jatuh ke bin yang
+    sama sehingga profil proyeksi paling "tajam" (jumlah kuadrat selisih antar bin terbesar).
+    """
+    ys, xs = np.nonzero(arr < INK_THRESHOLD)
+    if ys.size < 100:
+        return 0.0
+    if ys.size > DESKEW_MAX_SAMPLES:
+        idx = np.linspace(0, ys.size - 1, DESKEW_MAX_SAMPLES).astype(np.int64)
+        ys, xs = ys[idx], xs[idx]
+
+    angles = np.deg2rad(np.arange(-max_angle, max_angle + step / 2, step))
+    # y' = y*cos(a) + x*sin(a): posisi baris setelah rotasi sebesar -a
+    proj = ys[None, :] * np.cos(angles)[:, None] + xs[None, :] * np.sin(angles)[:, None]
+    proj = np.rint(proj - proj.min(axis=1, keepdims=True)).astype(np.int64)
+    n_bins = int(proj.max()) + 1
+    # bincount per sudut dalam satu panggilan: geser tiap baris ke rentang bin-nya sendiri
+    flat = (proj + np.arange(len(angles))[:, None] * n_bins).ravel()
+    profiles = np.bincount(flat, minlength=len(angles) * n_bins).reshape(len(angles), n_bins)
+    score = (np.diff(profiles, axis=1).astype(np.float64) ** 2).sum(axis=1)
+    return float(np.rad2deg(angles[int(np.argmax(score))]))
+
+
+def deskew(img):
+    """Luruskan halaman bila kemiringannya >= DESKEW_MIN_ANGLE."""
+    gray = img if img.mode == "L" else img.convert("L")
+    work = gray
+    if gray.width > DESKEW_WORK_WIDTH:
+        scale = DESKEW_WORK_WIDTH / gray.width
+        work = gray.resize((DESKEW_WORK_WIDTH, max(1, round(gray.height * scale))), Image.BOX)
+    angle = estimate_skew(np.asarray(work))
+    if abs(angle) < DESKEW_MIN_ANGLE:
+        return gray
+    log.debug(f"Deskew {angle:.2f} deg")
+    return gray.rotate(-angle, resample=Image.BILINEAR, expand=False, fillcolor=255)
+
+
+def _trim_border(dark: "np.ndarray", axis: int) -> slice:
+    """Lewati baris (axis=1) / kolom (axis=0) bingkai gelap di kedua tepi."""
+    ratio = dark.mean(axis=axis)
+    inner = np.nonzero(ratio < BORDER_INK_RATIO)[0]
+    if inner.size == 0:
+        return slice(0, 0)
+    # hanya bingkai yang menempel di tepi yang dibuang, bukan garis di tengah halaman
+    first, last = int(inner[0]), int(inner[-1])
+    return slice(first, last + 1)
+
+
+def crop_border(img, padding: int = CROP_PADDING):
+    """Buang bingkai hitam scanner lalu margin kosong; sisakan `padding` piksel putih."""
+    arr = _gray(img)
+    dark = arr < INK_THRESHOLD
+    rows = _trim_border(dark, axis=1)
+    cols = _trim_border(dark, axis=0)
+    inner = dark[rows, cols]
+    if inner.size == 0:
+        return img if img.mode == "L" else img.convert("L")
+    # Kotak isi: baris/kolom pertama & terakhir yang mengandung tinta
+    row_ink = np.nonzero(inner.any(axis=1))[0]
+    col_ink = np.nonzero(inner.any(axis=0))[0]
+    if row_ink.size == 0 or col_ink.size == 0:
+        return img if img.mode == "L" else img.convert("L")
+    top = rows.start + int(row_ink[0])
+    bottom = rows.start + int(row_ink[-1]) + 1
+    left = cols.start + int(col_ink[0])
+    right = cols.start + int(col_ink[-1]) + 1
+
+    content = arr[top:bottom, left:right]
+    out = np.full((content.shape[0] + 2 * padding, content.shape[1] + 2 * padding), 255, dtype=np.uint8)
+    out[padding:padding + content.shape[0], padding:padding + content.shape[1]] = content
+    return Image.fromarray(out, "L")
+
+
+def downscale(img, max_width: Optional[int] = None):
+    """Perkecil halaman yang lebih lebar dari `max_width` (default OCR_PREPROCESS_MAX_WIDTH).
+
+    Render 300+ dpi dari PDF yang ukuran kertasnya besar menghasilkan gambar yang
+    memperlambat tesseract tanpa menambah akurasi.
+    """
+    max_width = max_width or settings.OCR_PREPROCESS_MAX_WIDTH
+    if not max_width or img.width <= max_width:
+        return img
+    scale = max_width / img.width
+    return img.resize((max_width, max(1, round(img.height * scale))), Image.BOX)
+
+
+PREPROCESS_STEPS: Dict[str, Callable] = {
+    "downscale": downscale,
+    "crop": crop_border,
+    "deskew": deskew,
+    "binarize": binarize,
+}
+
+
+def parse_steps(spec: Optional[str] = None) -> List[str]:
+    """Daftar langkah dari string koma (default settings.OCR_PREPROCESS); nama asing diabaikan."""
+    spec = settings.OCR_PREPROCESS if spec is None else spec
+    steps = []
+    for name in (s.strip().lower() for s in (spec or "").split(",")):
+        if not name:
+            continue
+        if name not in PREPROCESS_STEPS:
+            log.warning(f"Unknown OCR preprocess step {name!r} ignored")
+            continue
+        steps.append(name)
+    return steps
+
+
+def preprocess_signature(steps: Optional[Sequence[str]] = None) -> str:
+    """Penanda pipeline untuk kunci cache OCR (kosong bila tanpa preprocessing)."""
+    steps = parse_steps() if steps is None else list(steps)
+    if not steps or np is None:
+        return ""
+    sig = ",".join(steps)
+    if "downscale" in steps:
+        sig += f";w{settings.OCR_PREPROCESS_MAX_WIDTH}"
+    return f"+pre:{sig}"
+
+
+def preprocess_image(img, steps: Optional[Sequence[str]] = None):
+    """Jalankan pipeline pada satu gambar halaman. Tanpa NumPy, gambar dikembalikan apa adanya."""
+    steps = parse_steps() if steps is None else list(steps)
+    if not steps or np is None or Image is None:
+        return img
+    for name in steps:
+        img = PREPROCESS_STEPS[name](img)
+    return img
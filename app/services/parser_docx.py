@@ -1,15 +1,53 @@
 
 # app/services/parser_docx.py
 """
-Ekstraksi teks dari DOCX menggunakan python-docx:
-- Mengambil teks paragraf
-- Mengambil teks dalam tabel (opsional)
+Ekstraksi teks dari DOCX tanpa membangun object model python-docx:
+- `word/document.xml` dibaca langsung dari zip dengan parser XML inkremental (iterparse),
+  elemen yang sudah diproses dibuang sehingga memori tidak mengikuti ukuran dokumen
+- Paragraf & sel tabel dikeluarkan sesuai urutan di dokumen (sel gabungan hanya sekali)
+- Header & footer ikut diambil (kop surat sering ada di header): header di awal, footer
+  di akhir, teks yang sama dari beberapa section hanya sekali
+- Text box (mis. kop dalam shape) ikut; salinan `mc:Fallback`-nya dilewati
+Sumber bisa berupa path, bytes, atau file-like.
+
+`extract_text_from_docx_legacy` (python-docx, urutan lama: semua paragraf lalu semua sel
+tabel) dipertahankan untuk perbandingan & sebagai fallback bila struktur paket tidak
+terbaca. Lihat `scripts/bench_docx_text.py`.
 """
 
+import io
+import logging
+import posixpath
+import re
+import zipfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from xml.etree import ElementTree as ET
+
 from docx import Document
 
-def extract_text_from_docx(path: str) -> str:
-    doc = Document(path)
+log = logging.getLogger(__name__)
+
+DocxSource = Union[str, bytes, BinaryIO]
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+_P, _R, _TC = _W + "p", _W + "r", _W + "tc"
+_T, _TAB, _PTAB, _BR, _CR, _NB_HYPHEN = (
+    _W + "t", _W + "tab", _W + "ptab", _W + "br", _W + "cr", _W + "noBreakHyphen",
+)
+_BR_TYPE = _W + "type"
+
+_MAIN_DOCUMENT = "word/document.xml"
+
+
+def extract_text_from_docx_legacy(source: DocxSource) -> str:
+    """Implementasi lama via python-docx (paragraf body, lalu teks setiap sel tabel)."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    doc = Document(source)
     texts = []
 
     # Paragraf
@@ -25,3 +63,132 @@ def extract_text_from_docx(path: str) -> str:
                     texts.append(cell.text)
 
     return "\n".join(texts)
+
+
+def _iter_part_blocks(stream: BinaryIO) -> Iterator[str]:
+    """Teks per blok (paragraf di luar tabel / satu sel tabel) dari satu part XML, urut dokumen.
+
+    Teks run mengikuti python-docx: `w:t`, tab -> "\\t", line break & `w:cr` -> "\\n",
+    break halaman/kolom -> "", `w:noBreakHyphen` -> "-". Paragraf dalam sel digabung
+    dengan baris baru; sel kosong (termasuk lanjutan sel gabungan vertikal) dilewati.
+    """
+    paragraphs: List[List[str]] = []  # stack: text box bisa berisi paragraf di dalam paragraf
+    cells: List[List[str]] = []  # stack: tabel bersarang
+    in_run = 0
+    skip = 0
+
+    for event, el in ET.iterparse(stream, events=("start", "end")):
+        tag = el.tag
+        if tag == _MC_FALLBACK:
+            skip += 1 if event == "start" else -1
+            if event == "end":
+                el.clear()
+            continue
+        if skip:
+            continue
+
+        if event == "start":
+            if tag == _P:
+                paragraphs.append([])
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _R:
+                in_run += 1
+            continue
+
+        if tag == _R:
+            in_run -= 1
+        elif in_run and paragraphs and tag in (_T, _TAB, _PTAB, _BR, _CR, _NB_HYPHEN):
+            if tag == _T:
+                paragraphs[-1].append(el.text or "")
+            elif tag in (_TAB, _PTAB):
+                paragraphs[-1].append("\t")
+            elif tag == _CR or (tag == _BR and el.get(_BR_TYPE, "textWrapping") == "textWrapping"):
+                paragraphs[-1].append("\n")
+            elif tag == _NB_HYPHEN:
+                paragraphs[-1].append("-")
+        elif tag == _P:
+            text = "".join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            elif text:
+                yield text
+            el.clear()
+        elif tag == _TC:
+            text = "\n".join(cells.pop())
+            if text:
+                yield text
+            el.clear()
+
+
+def _read_rels(zf: zipfile.ZipFile, name: str) -> List[Tuple[str, str, str]]:
+    """(Id, Type, Target) dari part relationships; kosong bila part tidak ada."""
+    try:
+        data = zf.read(name)
+    except KeyError:
+        return []
+    return [(r.get("Id", ""), r.get("Type", ""), r.get("Target", "")) for r in ET.fromstring(data).iter(_REL)]
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _natural_key(name: str):
+    return [int(s) if s.isdigit() else s for s in re.split(r"(\d+)", name)]
+
+
+def _package_parts(zf: zipfile.ZipFile) -> Tuple[str, List[str], List[str]]:
+    """Part dokumen utama beserta part header & footer-nya (urut nama: header1, header2, ...)."""
+    main = next(
+        (_resolve("", target) for _id, rel_type, target in _read_rels(zf, "_rels/.rels") if rel_type.endswith("/officeDocument")),
+        _MAIN_DOCUMENT,
+    )
+    base_dir, filename = posixpath.split(main)
+    headers, footers = [], []
+    for _id, rel_type, target in _read_rels(zf, posixpath.join(base_dir, "_rels", filename + ".rels")):
+        if rel_type.endswith("/header"):
+            headers.append(_resolve(base_dir, target))
+        elif rel_type.endswith("/footer"):
+            footers.append(_resolve(base_dir, target))
+    return main, sorted(set(headers), key=_natural_key), sorted(set(footers), key=_natural_key)
+
+
+def _unique(blocks: Iterable[str], seen: Set[str]) -> Iterator[str]:
+    for block in blocks:
+        if block not in seen:
+            seen.add(block)
+            yield block
+
+
+def iter_docx_blocks(source: DocxSource) -> Iterator[str]:
+    """Blok teks DOCX: header, isi dokumen (urutan asli), lalu footer."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with zipfile.ZipFile(source) as zf:
+        main, headers, footers = _package_parts(zf)
+        seen: Set[str] = set()
+        for part in headers:
+            with zf.open(part) as fh:
+                yield from _unique(_iter_part_blocks(fh), seen)
+        with zf.open(main) as fh:
+            yield from _iter_part_blocks(fh)
+        for part in footers:
+            with zf.open(part) as fh:
+                yield from _unique(_iter_part_blocks(fh), seen)
+
+
+def extract_text_from_docx(source: DocxSource) -> str:
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    start: Optional[int] = source.tell() if hasattr(source, "tell") else None
+    try:
+        return "\n".join(iter_docx_blocks(source))
+    except (KeyError, ET.ParseError) as e:
+        # Paket tidak standar: serahkan ke python-docx
+        log.warning(f"Streaming DOCX extraction failed ({e}); falling back to python-docx")
+        if start is not None:
+            source.seek(start)
+        return extract_text_from_docx_legacy(source)
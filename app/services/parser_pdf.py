@@ -2,27 +2,118 @@
 # app/services/parser_pdf.py
 """
 Ekstraksi teks dari PDF. Coba teks native; bila kosong, tandai sebagai scan.
+Sumber bisa berupa path, bytes, atau file-like (tanpa perlu file temp).
+
+Backend teks native (`settings.PDF_TEXT_BACKEND`):
+- `pymupdf`  : default; ekstraksi di MuPDF (C), jauh lebih cepat untuk PDF panjang
+- `pdfminer` : parser pure Python (perilaku lama); juga dipakai otomatis bila PyMuPDF
+               tidak terpasang atau gagal membaca file
+
+Kedua backend menulis karakter form feed setelah tiap halaman; `split_pages` dan
+`scanned_pages` memakai pemisah itu untuk menentukan halaman mana yang hanya berisi gambar.
+Bandingkan kecepatan & kesamaan hasil dengan `scripts/bench_pdf_text.py`.
 """
 
+import io
 import logging
-from typing import Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 from pdfminer.high_level import extract_text
 
+from app.config import settings
+
+try:
+    import fitz  # PyMuPDF
+except Exception:
+    fitz = None
+
 log = logging.getLogger(__name__)
 
+# Path, bytes, atau file-like (BytesIO / file spool) — pdfminer menerima path & stream
+PdfSource = Union[str, bytes, BinaryIO]
+
+PAGE_SEPARATOR = "\x0c"
+
+
+def _describe(source: PdfSource) -> str:
+    return source if isinstance(source, str) else f"<{type(source).__name__}>"
+
+
+def pdfminer_text(source: PdfSource) -> str:
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return extract_text(source) or ""
+
+
+def pymupdf_text(source: PdfSource) -> str:
+    """Teks native per halaman via PyMuPDF, urut posisi blok (`sort=True`) seperti layout
+    pdfminer, tiap halaman diakhiri form feed."""
+    if fitz is None:
+        raise RuntimeError("PyMuPDF not installed")
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        data = source if isinstance(source, (bytes, bytearray)) else source.read()
+        doc = fitz.open(stream=data, filetype="pdf")
+    with doc:
+        return "".join(page.get_text("text", sort=True) + PAGE_SEPARATOR for page in doc)
+
+
+PDF_TEXT_BACKENDS: Dict[str, Callable[[PdfSource], str]] = {
+    "pymupdf": pymupdf_text,
+    "pdfminer": pdfminer_text,
+}
 
-def extract_text_from_pdf(path: str) -> Tuple[str, bool]:
+
+def extract_pdf_text(source: PdfSource, backend: Optional[str] = None) -> str:
+    """Teks native PDF dengan backend `backend` (default settings.PDF_TEXT_BACKEND).
+
+    Bila backend selain pdfminer gagal, pdfminer dicoba. Stream dibaca sekali ke memori
+    agar bisa dipakai ulang oleh fallback.
+    """
+    name = (backend or settings.PDF_TEXT_BACKEND or "pymupdf").lower()
+    if name not in PDF_TEXT_BACKENDS:
+        log.warning(f"Unknown PDF_TEXT_BACKEND={name!r}, falling back to 'pdfminer'")
+        name = "pdfminer"
+    if name == "pdfminer":
+        return pdfminer_text(source)
+
+    if not isinstance(source, (str, bytes, bytearray)):
+        source = source.read()
+    try:
+        return PDF_TEXT_BACKENDS[name](source)
+    except Exception as e:
+        log.warning(f"{name} text extraction failed for {_describe(source)} ({e}); using pdfminer")
+        return pdfminer_text(source)
+
+
+def extract_text_from_pdf(source: PdfSource) -> Tuple[str, bool]:
     """
     Returns: (text, is_scanned)
     is_scanned True bila text kosong/nyaris kosong -> perlu OCR.
     """
     try:
-        text = extract_text(path) or ""
-        log.debug(f"Extracted {len(text)} chars from {path}")
+        text = extract_pdf_text(source)
+        log.debug(f"Extracted {len(text)} chars from {_describe(source)}")
     except Exception as e:
-        log.error(f"Failed to extract text from {path}: {e}", exc_info=True)
+        log.error(f"Failed to extract text from {_describe(source)}: {e}", exc_info=True)
         text = ""
     from app.constants import SCANNED_TEXT_THRESHOLD
     is_scanned = (len(text.strip()) < SCANNED_TEXT_THRESHOLD)  # ambang sederhana
-    log.debug(f"PDF {path} is_scanned={is_scanned} (text length: {len(text.strip())})")
+    log.debug(f"PDF {_describe(source)} is_scanned={is_scanned} (text length: {len(text.strip())})")
     return (text, is_scanned)
+
+
+def split_pages(text: str) -> List[str]:
+    """Pecah output backend teks menjadi teks per halaman (form feed ditulis setelah tiap halaman)."""
+    if not text:
+        return []
+    pages = text.split(PAGE_SEPARATOR)
+    if text.endswith(PAGE_SEPARATOR):
+        pages.pop()
+    return pages
+
+
+def scanned_pages(page_texts: List[str]) -> List[int]:
+    """Nomor halaman (1-based) yang teks native-nya di bawah ambang -> perlu OCR."""
+    from app.constants import SCANNED_PAGE_TEXT_THRESHOLD
+    return [n for n, t in enumerate(page_texts, start=1) if len(t.strip()) < SCANNED_PAGE_TEXT_THRESHOLD]
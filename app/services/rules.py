@@ -0,0 +1,172 @@
+"""
+Rule engine untuk klasifikasi jenis surat (masuk/keluar) berbasis kata kunci & pola.
+
+Aturan tidak lagi di-hardcode: semua set kata kunci / regex dibaca dari file data
+(`settings.CLASSIFICATION_RULES_PATH`, default data/classification_rules.json) dan
+dikompilasi sekali saat pertama dipakai (`get_rule_engine()`; lifespan memuatnya di startup
+agar kesalahan konfigurasi langsung terlihat). Satu `scan` menormalisasi teks sekali (huruf kecil) lalu menghitung
+hit setiap aturan di set yang diminta:
+
+- `keywords`: substring literal, dihitung dengan `str.count` (fastsearch C)
+- `patterns`: regex (ditulis huruf kecil); bila `anchor` diisi, regex hanya dicoba di
+  kemunculan literal itu (`str.find`) alih-alih di setiap posisi teks
+
+Regex gabungan (satu alternasi untuk semua aturan) sempat diukur: di `re` CPython jauh
+lebih lambat daripada pendekatan di atas untuk teks OCR besar, lihat `scripts/bench_rules.py`.
+
+Dipakai bersama oleh `classifier_ml.classify_rules` (skor per `jenis`), deteksi kop di
+`metadata.detect_jenis` dan fallback kode SM/SK nomor saat menyimpan dokumen.
+"""
+
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+MATCH_MODES = {"any", "all"}
+
+
+class RulesFileError(ValueError):
+    """File aturan tidak ada / bukan JSON / isinya tidak valid; pesan menyebut file & setting."""
+
+
+class _Rule:
+    __slots__ = ("label", "literal", "pattern", "anchor")
+
+    def __init__(self, label: str, literal: Optional[str] = None, pattern: Optional[Pattern] = None, anchor: Optional[str] = None):
+        self.label = label
+        self.literal = literal
+        self.pattern = pattern
+        self.anchor = anchor
+
+    def count(self, text: str) -> int:
+        if self.literal is not None:
+            return text.count(self.literal)
+        if self.anchor is None:
+            return sum(1 for _ in self.pattern.finditer(text))
+        hits = 0
+        pos = text.find(self.anchor)
+        while pos >= 0:
+            if self.pattern.match(text, pos):
+                hits += 1
+            pos = text.find(self.anchor, pos + 1)
+        return hits
+
+
+class RuleSet:
+    """Sekelompok aturan; cocok bila salah satu (`match: any`) / semua (`all`) aturannya kena."""
+
+    def __init__(self, name: str, rules: List[_Rule], weight: float = 1.0, jenis: Optional[str] = None, match: str = "any"):
+        self.name = name
+        self.rules = rules
+        self.weight = weight
+        self.jenis = jenis
+        self.match = match
+
+
+class RuleHits:
+    """Hasil `RuleEngine.scan`: jumlah hit per aturan untuk setiap set yang di-scan."""
+
+    def __init__(self, engine: "RuleEngine", counts: Dict[str, List[int]]) -> None:
+        self._engine = engine
+        self._counts = counts
+
+    def counts(self, name: str) -> Dict[str, int]:
+        return {rule.label: n for rule, n in zip(self._engine.sets[name].rules, self._counts[name])}
+
+    def matched(self, name: str) -> bool:
+        counts = self._counts[name]
+        if self._engine.sets[name].match == "all":
+            return all(counts)
+        return any(counts)
+
+    def score(self, name: str) -> float:
+        """Bobot set x jumlah aturan berbeda yang kena."""
+        return self._engine.sets[name].weight * sum(1 for n in self._counts[name] if n)
+
+    def scores(self) -> Dict[str, float]:
+        """Total skor per jenis dari set yang punya `jenis`."""
+        totals: Dict[str, float] = {}
+        for name in self._counts:
+            jenis = self._engine.sets[name].jenis
+            if jenis:
+                totals[jenis] = totals.get(jenis, 0) + self.score(name)
+        return totals
+
+
+class RuleEngine:
+    def __init__(self, spec: Dict, source: str = "<dict>") -> None:
+        self.source = source
+        self.version = spec.get("version")
+        self.sets: Dict[str, RuleSet] = {}
+        for name, raw in (spec.get("sets") or {}).items():
+            self.sets[name] = self._compile_set(name, raw)
+        log.info(f"Loaded {sum(len(s.rules) for s in self.sets.values())} classification rules from {source}")
+
+    def _compile_set(self, name: str, raw: Dict) -> RuleSet:
+        match = raw.get("match", "any")
+        if match not in MATCH_MODES:
+            raise ValueError(f"Rule set {name!r}: match must be one of {sorted(MATCH_MODES)}")
+        rules = [_Rule(kw.lower(), literal=kw.lower()) for kw in raw.get("keywords", [])]
+        for item in raw.get("patterns", []):
+            try:
+                pattern = re.compile(item["pattern"])
+            except (KeyError, re.error) as e:
+                raise ValueError(f"Rule set {name!r}: invalid pattern {item!r}: {e}") from e
+            anchor = item.get("anchor")
+            rules.append(_Rule(item["pattern"], pattern=pattern, anchor=anchor.lower() if anchor else None))
+        if not rules:
+            raise ValueError(f"Rule set {name!r} has no keywords or patterns")
+        return RuleSet(name, rules, weight=float(raw.get("weight", 1)), jenis=raw.get("jenis"), match=match)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "RuleEngine":
+        path = Path(path)
+        try:
+            return cls(json.loads(path.read_text(encoding="utf-8")), source=path.as_posix())
+        except (OSError, ValueError) as e:
+            raise RulesFileError(
+                f"Cannot load classification rules from {path} (setting CLASSIFICATION_RULES_PATH): {e}"
+            ) from e
+
+    def scan(self, text: str, sets: Optional[Iterable[str]] = None) -> RuleHits:
+        """Normalisasi `text` sekali (huruf kecil) lalu hitung hit setiap aturan di `sets` (default semua)."""
+        lowered = (text or "").lower()
+        names = self.sets.keys() if sets is None else sets
+        return RuleHits(self, {name: [rule.count(lowered) for rule in self.sets[name].rules] for name in names})
+
+    def scoring_sets(self) -> Tuple[str, ...]:
+        return tuple(name for name, s in self.sets.items() if s.jenis)
+
+
+_engine: Optional[RuleEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_rule_engine() -> RuleEngine:
+    """Engine aktif; dimuat dari `settings.CLASSIFICATION_RULES_FILE` saat pertama dipakai
+    (bukan saat import, agar file aturan yang rusak tidak menggagalkan import aplikasi)."""
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            if _engine is None:
+                load_rules()
+            engine = _engine
+    return engine
+
+
+def load_rules(path: Optional[Union[str, Path]] = None) -> RuleEngine:
+    """Muat ulang aturan (default `settings.CLASSIFICATION_RULES_FILE`) sebagai engine aktif.
+
+    Raises:
+        RulesFileError: file tidak ada, bukan JSON, atau aturannya tidak valid
+    """
+    global _engine
+    _engine = RuleEngine.from_file(path or settings.CLASSIFICATION_RULES_FILE)
+    return _engine
@@ -0,0 +1,275 @@
+"""
+Sandbox ekstraksi: pekerjaan ingest dijalankan di subprocess worker yang diawasi.
+
+PDF rusak / patologis bisa membuat pdfminer atau PyMuPDF berputar bermenit-menit atau
+memakan gigabyte memori. Dengan `INGEST_EXECUTOR=sandbox`, `IngestExecutor` memakai
+`SandboxPool`:
+
+- tiap dokumen dijalankan di worker subprocess (spawn) milik satu thread pengawas
+- batas waktu per dokumen (`SANDBOX_TIMEOUT`, jalur OCR `SANDBOX_OCR_TIMEOUT`): worker
+  (beserta proses anaknya, mis. pool OCR) di-kill, pemanggil menerima `SandboxTimeout`
+- batas RSS (`SANDBOX_MAX_RSS_MB`, termasuk proses anak) dipantau berkala dari proses
+  utama: bila terlampaui worker di-kill dan pemanggil menerima `SandboxMemoryExceeded`
+- worker didaur ulang setelah `SANDBOX_MAX_TASKS` dokumen (membuang memori yang bocor /
+  terfragmentasi); worker yang mati mendadak diganti (`SandboxCrashed`)
+
+Semua kegagalan adalah turunan `SandboxError`; pipeline ingest menyimpan dokumen dengan
+metadata dari nama file dan mencatat `extraction_error` di metadata.json.
+Pemantauan RSS memakai /proc (Linux); di platform lain hanya batas waktu yang berlaku.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set
+
+log = logging.getLogger(__name__)
+
+# Interval pengecekan hasil / RSS worker (detik)
+_POLL_INTERVAL = 0.25
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class SandboxError(RuntimeError):
+    """Ekstraksi di worker sandbox gagal (timeout, memori, atau worker mati)."""
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+class SandboxMemoryExceeded(SandboxError):
+    pass
+
+
+class SandboxCrashed(SandboxError):
+    pass
+
+
+def _worker_main(conn) -> None:
+    """Loop worker: terima callable, kirim ("ok", hasil) atau ("error", exception)."""
+    # Ctrl+C ditangani proses utama; worker dihentikan lewat pesan None / kill
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            reply = ("ok", task())
+        except BaseException as e:  # noqa: BLE001 - diteruskan ke pemanggil
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Hasil / exception tidak bisa di-pickle
+            conn.send(("error", SandboxError(f"Unpicklable sandbox result: {e!r}")))
+    conn.close()
+
+
+def _children(pid: int) -> List[int]:
+    kids: List[int] = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", encoding="ascii") as fh:
+                kids.extend(int(k) for k in fh.read().split())
+    except (OSError, ValueError):
+        pass
+    return kids
+
+
+def _descendants(pid: int) -> List[int]:
+    found: List[int] = []
+    stack = _children(pid)
+    while stack:
+        child = stack.pop()
+        found.append(child)
+        stack.extend(_children(child))
+    return found
+
+
+def _rss(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def tree_rss(pid: int) -> Optional[int]:
+    """RSS proses beserta seluruh turunannya (bytes), None bila tidak bisa dibaca."""
+    own = _rss(pid)
+    if own is None:
+        return None
+    return own + sum(_rss(child) or 0 for child in _descendants(pid))
+
+
+class _Worker:
+    def __init__(self, ctx, name: str) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), name=name)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def stop(self) -> None:
+        """Hentikan dengan sopan (selesai tugas berjalan), kill bila tidak keluar."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self) -> None:
+        """Kill worker beserta proses anaknya (mis. process pool OCR)."""
+        doomed = _descendants(self.pid)
+        self.process.kill()
+        for pid in doomed:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxPool(Executor):
+    """Executor dengan satu worker subprocess per slot, batas waktu & RSS per tugas."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout: Optional[float] = None,
+        max_rss_mb: Optional[int] = None,
+        max_tasks: Optional[int] = None,
+        name: str = "sandbox",
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout or None
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.max_tasks = max_tasks or None
+        self.name = name
+        self._ctx = multiprocessing.get_context("spawn")
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._idle: List[_Worker] = []
+        self._workers: Set[_Worker] = set()
+        self._lock = threading.Lock()
+        self._rss_supported = os.path.exists("/proc/self/statm")
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ("started", "recycled", "timeouts", "memory_kills", "crashes"), 0
+        )
+        if self.max_rss and not self._rss_supported:
+            log.warning("Sandbox RSS limit needs /proc; only timeouts are enforced on this platform")
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        return self._threads.submit(self._run, partial(fn, *args, **kwargs))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._workers.discard(worker)
+            worker = _Worker(self._ctx, f"{self.name}-worker")
+            self._workers.add(worker)
+            self.counters["started"] += 1
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        if self.max_tasks and worker.tasks >= self.max_tasks:
+            self._discard(worker)
+            worker.stop()
+            self._count("recycled")
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _fail(self, worker: _Worker, counter: str, error: SandboxError) -> SandboxError:
+        self._discard(worker)
+        worker.kill()
+        self._count(counter)
+        log.warning(f"Sandbox worker {worker.pid} killed: {error}")
+        return error
+
+    def _run(self, task: Callable) -> Any:
+        worker = self._checkout()
+        try:
+            worker.conn.send(task)
+        except (OSError, ValueError) as e:
+            raise self._fail(worker, "crashes", SandboxCrashed(f"Sandbox worker unavailable: {e}"))
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        while True:
+            wait = _POLL_INTERVAL if deadline is None else min(_POLL_INTERVAL, deadline - time.monotonic())
+            if wait <= 0:
+                raise self._fail(worker, "timeouts", SandboxTimeout(f"Extraction exceeded {self.timeout:g}s time limit"))
+            try:
+                if worker.conn.poll(wait):
+                    status, value = worker.conn.recv()
+                    break
+            except (EOFError, OSError):
+                code = worker.process.exitcode
+                raise self._fail(worker, "crashes", SandboxCrashed(f"Sandbox worker died (exit code {code})"))
+            if self.max_rss and self._rss_supported:
+                rss = tree_rss(worker.pid)
+                if rss is not None and rss > self.max_rss:
+                    raise self._fail(
+                        worker,
+                        "memory_kills",
+                        SandboxMemoryExceeded(
+                            f"Extraction exceeded {self.max_rss // (1024 * 1024)} MB memory limit "
+                            f"({rss // (1024 * 1024)} MB)"
+                        ),
+                    )
+
+        worker.tasks += 1
+        self._checkin(worker)
+        if status == "error":
+            raise value
+        return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "workers": len(self._workers),
+                "idle": len(self._idle),
+                "timeout": self.timeout,
+                "max_rss_mb": self.max_rss // (1024 * 1024) if self.max_rss else None,
+                "max_tasks": self.max_tasks,
+            }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._threads.shutdown(wait=wait, cancel_futures=cancel_futures)
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            if wait:
+                worker.stop()
+            else:
+                worker.kill()
@@ -0,0 +1,329 @@
+"""
+Penjadwal ekstraksi: jalur cepat & lambat + batas global halaman OCR.
+
+DOCX / PDF native selesai dalam milidetik, PDF scan bisa bermenit-menit. Sebelumnya
+keduanya berbagi satu pool (`ingest_executor`), sehingga satu batch scan membuat upload
+DOCX interaktif ikut mengantre. Sekarang setiap analisis dokumen lewat `extraction_scheduler`:
+
+- `fast` : DOCX & PDF yang semua halamannya punya teks native (pool `ingest_executor`)
+- `slow` : PDF dengan halaman gambar (perlu OCR) & OCR lengkap di background
+           (pool terpisah, `OCR_LANE_CONCURRENCY` dokumen sekaligus)
+
+Jalur ditentukan dari isi file (`lane_for`: font & gambar per halaman via PyMuPDF, jauh
+lebih murah daripada ekstraksi teks). Tiap jalur punya antrean sendiri; pekerjaan baru
+diteruskan ke pool hanya bila ada slot kosong, sehingga kedalaman antrean & waktu tunggu
+bisa diukur (`metrics()`, dipakai `GET /healthz/ingest`).
+
+`ocr_page_governor` membatasi jumlah halaman yang di-render + OCR bersamaan di seluruh
+proses: default min(CPU - 1, memori tersedia / OCR_PAGE_MEMORY_MB), atau
+`OCR_MAX_PAGES_IN_FLIGHT`. Pool OCR per dokumen (`app.services.ocr`, `TextExtractor`)
+memesan slot sebelum render dan memakai sebanyak slot yang diberikan. Dengan
+`INGEST_EXECUTOR=process` / `sandbox` batas ini berlaku per proses worker.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from app.config import settings
+from app.constants import SCANNED_PAGE_TEXT_THRESHOLD
+from app.services.executor import IngestExecutor, ingest_executor
+
+log = logging.getLogger(__name__)
+
+try:
+    import fitz  # PyMuPDF
+except Exception:
+    fitz = None
+
+FAST_LANE = "fast"
+SLOW_LANE = "slow"
+LANES = (FAST_LANE, SLOW_LANE)
+
+PDF_MIME = "application/pdf"
+_MB = 1024 * 1024
+# Batas OCR dihitung ulang paling sering tiap N detik (memori tersedia berubah)
+_CAP_REFRESH_SECONDS = 10.0
+# Jumlah sampel waktu tunggu terakhir untuk p95
+_WAIT_SAMPLES = 512
+
+
+class WaitStats:
+    """Statistik waktu tunggu (ms) dari sampel terakhir."""
+
+    def __init__(self) -> None:
+        self._samples: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> Dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": round(self.max * 1000, 1)}
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class Lane:
+    """Antrean FIFO di depan satu `IngestExecutor`.
+
+    Paling banyak `executor.max_workers` pekerjaan diteruskan ke pool; sisanya menunggu di
+    antrean lane sehingga waktu tunggu diukur di proses ini (juga untuk process pool).
+    """
+
+    def __init__(self, name: str, executor: IngestExecutor) -> None:
+        self.name = name
+        self.executor = executor
+        self._queue: Deque[Tuple] = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.waits = WaitStats()
+
+    @property
+    def limit(self) -> int:
+        return self.executor.max_workers
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        outer: Future = Future()
+        item = (outer, fn, args, kwargs, time.monotonic())
+        with self._lock:
+            self.submitted += 1
+            if self._running < self.limit:
+                self._running += 1
+            else:
+                self._queue.append(item)
+                item = None
+        if item is not None:
+            self._dispatch(item)
+        return outer
+
+    def _dispatch(self, item: Tuple) -> None:
+        outer, fn, args, kwargs, queued_at = item
+        if not outer.set_running_or_notify_cancel():
+            self._release()  # dibatalkan selagi mengantre
+            return
+        with self._lock:
+            self.waits.record(time.monotonic() - queued_at)
+        try:
+            inner = self.executor.submit(fn, *args, **kwargs)
+        except Exception as e:
+            self._finish(outer, None, e)
+            return
+        inner.add_done_callback(lambda f: self._finish(outer, f))
+
+    def _finish(self, outer: Future, inner: Optional[Future], error: Optional[BaseException] = None) -> None:
+        if inner is not None:
+            error = inner.exception() if not inner.cancelled() else RuntimeError(f"{self.name} lane task cancelled")
+        with self._lock:
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        if error is None:
+            outer.set_result(inner.result())
+        else:
+            outer.set_exception(error)
+        self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            item = self._queue.popleft() if self._queue else None
+            if item is None:
+                self._running -= 1
+        if item is not None:
+            self._dispatch(item)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            metrics = {
+                "limit": self.limit,
+                "running": self._running,
+                "queued": len(self._queue),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait": self.waits.snapshot(),
+            }
+        sandbox = self.executor.sandbox_stats()
+        if sandbox is not None:
+            metrics["sandbox"] = sandbox
+        return metrics
+
+
+def pdf_needs_ocr(path: Path) -> bool:
+    """True bila ada halaman PDF hasil scan: tanpa font, atau bergambar dengan teks nyaris kosong.
+
+    Umumnya hanya resource halaman yang dibaca; teks hanya diekstrak untuk halaman yang
+    punya gambar. PDF yang tidak bisa dibuka dianggap tidak perlu OCR (ekstraksi gagal cepat).
+    """
+    if fitz is None:
+        return True  # tidak bisa memeriksa: anggap mahal
+    try:
+        with fitz.open(path) as doc:
+            for page in doc:
+                if not page.get_fonts():
+                    return True
+                if page.get_images() and len(page.get_text("text").strip()) < SCANNED_PAGE_TEXT_THRESHOLD:
+                    return True  # font ada tetapi teksnya nyaris kosong (mis. hanya nomor halaman)
+    except Exception as e:
+        log.debug(f"Lane probe failed for {path}: {e}")
+    return False
+
+
+class ExtractionScheduler:
+    """Meneruskan analisis dokumen ke jalur `fast` atau `slow` sesuai kebutuhan OCR."""
+
+    def __init__(self, fast: IngestExecutor, slow: IngestExecutor) -> None:
+        self.lanes: Dict[str, Lane] = {FAST_LANE: Lane(FAST_LANE, fast), SLOW_LANE: Lane(SLOW_LANE, slow)}
+
+    @staticmethod
+    def lane_for(path: Path, mime_type: str) -> str:
+        if mime_type == PDF_MIME and pdf_needs_ocr(Path(path)):
+            return SLOW_LANE
+        return FAST_LANE
+
+    def submit(self, lane: str, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        return self.lanes[lane].submit(fn, *args, **kwargs)
+
+    def submit_analysis(self, fn: Callable, path: Path, mime_type: str, *args: Any) -> Future:
+        """Jalankan `fn(path, mime_type, *args)` di jalur yang sesuai untuk file tersebut."""
+        return self.submit(self.lane_for(path, mime_type), fn, path, mime_type, *args)
+
+    def call_analysis(self, fn: Callable, path: Path, mime_type: str, *args: Any) -> Any:
+        """Seperti `submit_analysis` tetapi menunggu hasilnya (untuk thread worker job)."""
+        return self.submit_analysis(fn, path, mime_type, *args).result()
+
+    async def run_analysis(self, fn: Callable, path: Path, mime_type: str, *args: Any) -> Any:
+        """Versi async: penentuan jalur & pekerjaannya tidak memblokir event loop."""
+        lane = await asyncio.to_thread(self.lane_for, path, mime_type)
+        return await asyncio.wrap_future(self.submit(lane, fn, path, mime_type, *args))
+
+    def metrics(self) -> Dict:
+        return {
+            "lanes": {name: lane.metrics() for name, lane in self.lanes.items()},
+            "ocr_pages": ocr_page_governor.metrics(),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        for lane in self.lanes.values():
+            lane.executor.shutdown(wait=wait)
+
+
+def available_memory() -> Optional[int]:
+    """Memori yang tersedia (bytes) dari /proc/meminfo atau sysconf; None bila tidak diketahui."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def ocr_page_cap() -> int:
+    """Batas halaman OCR bersamaan: OCR_MAX_PAGES_IN_FLIGHT, atau CPU - 1 (satu core untuk
+    jalur cepat) dibatasi memori tersedia / OCR_PAGE_MEMORY_MB."""
+    if settings.OCR_MAX_PAGES_IN_FLIGHT > 0:
+        return settings.OCR_MAX_PAGES_IN_FLIGHT
+    cap = max(1, (os.cpu_count() or 1) - 1)
+    memory = available_memory()
+    if memory and settings.OCR_PAGE_MEMORY_MB > 0:
+        cap = min(cap, max(1, memory // (settings.OCR_PAGE_MEMORY_MB * _MB)))
+    return cap
+
+
+class OcrPageGovernor:
+    """Semaphore global untuk halaman OCR yang sedang di-render/di-OCR."""
+
+    def __init__(self, cap: Callable[[], int] = ocr_page_cap) -> None:
+        self._cap_fn = cap
+        self._cap: Optional[int] = None
+        self._cap_at = 0.0
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self.waits = WaitStats()
+
+    @property
+    def cap(self) -> int:
+        now = time.monotonic()
+        if self._cap is None or now - self._cap_at > _CAP_REFRESH_SECONDS:
+            self._cap, self._cap_at = max(1, self._cap_fn()), now
+        return self._cap
+
+    @contextmanager
+    def reserve(self, pages: int) -> Iterator[int]:
+        """Pesan hingga `pages` slot; menunggu sampai minimal satu slot bebas.
+
+        Yields jumlah slot yang diberikan (1..pages) = jumlah worker OCR yang boleh dipakai.
+        """
+        wanted = max(1, pages)
+        started = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    cap = self.cap
+                    if self._in_use < cap:
+                        break
+                    self._cond.wait(timeout=_CAP_REFRESH_SECONDS)
+            finally:
+                self._waiting -= 1
+            granted = min(wanted, cap - self._in_use)
+            self._in_use += granted
+            self.waits.record(time.monotonic() - started)
+        try:
+            yield granted
+        finally:
+            with self._cond:
+                self._in_use -= granted
+                self._cond.notify_all()
+
+    def metrics(self) -> Dict:
+        memory = available_memory()
+        with self._cond:
+            return {
+                "cap": self.cap,
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "memory_available_mb": memory // _MB if memory else None,
+                "wait": self.waits.snapshot(),
+            }
+
+
+def _ocr_lane_workers() -> int:
+    return settings.OCR_LANE_CONCURRENCY or max(1, (os.cpu_count() or 1) // 2)
+
+
+# Batas global halaman OCR (dipakai `app.services.ocr` & `TextExtractor`)
+ocr_page_governor = OcrPageGovernor()
+
+# Scheduler default: jalur cepat memakai `ingest_executor`, jalur OCR pool sendiri
+extraction_scheduler = ExtractionScheduler(
+    fast=ingest_executor,
+    slow=IngestExecutor(max_workers=_ocr_lane_workers(), name="ingest-ocr", timeout=settings.SANDBOX_OCR_TIMEOUT),
+)
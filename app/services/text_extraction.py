@@ -4,24 +4,37 @@
 Bridge untuk ekstraksi teks yang memanfaatkan parser buatan kamu:
 - DOCX: app.services.parser_docx.extract_text_from_docx(path)
 - PDF:  app.services.parser_pdf.extract_text_from_pdf(path) -> (text, is_scanned)
+        (PyMuPDF atau pdfminer, lihat settings.PDF_TEXT_BACKEND)
 - OCR (opsional) untuk PDF scan jika TESSERACT_CMD di .env diisi.
 
 Perubahan: diperkenalkan `TextExtractor` service class agar strategi ekstraksi dapat di-mock
 atau di-inject untuk testing/konfigurasi. Sebuah wrapper `extract_text_and_save` tetap
 tersedia untuk kompatibilitas.
+
+`extract_text_from_file` memproses file yang sudah ada di disk (mis. hasil spool upload)
+tanpa menyalinnya lagi ke file temp; `extract_text_and_save` membaca bytes langsung dari
+memori. File temp (bernama unik) hanya dibuat bila backend OCR eksternal butuh path.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, Callable
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import io
 import json
+import os
 
 from app.config import settings
-from app.constants import PDF2IMAGE_DPI, TMP_UPLOAD_NAME, TESSERACT_LANG
+from app.constants import PDF2IMAGE_DPI
+from app.services.ocr_cache import ocr_page_cache
+from app.services.ocr_capabilities import ocr_capabilities
+from app.services.ocr_preprocess import preprocess_image, preprocess_signature
+from app.services.scheduler import ocr_page_governor
+from app.utils.fileops import temp_file_for
 
 # Import parser buatan kamu
 from app.services.parser_docx import extract_text_from_docx
-from app.services.parser_pdf import extract_text_from_pdf
+from app.services.parser_pdf import PAGE_SEPARATOR, extract_text_from_pdf, scanned_pages, split_pages
 
 # OCR (opsional)
 try:
@@ -33,6 +46,22 @@ except Exception:
     convert_from_bytes = None
 
 
+@dataclass
+class ExtractedText:
+    """Extraction result; `pages` holds the per-page decision for PDFs:
+    `{"page": n, "mode": "native" | "ocr" | "scanned", "native_chars": int}`
+    ("scanned" = image-only page that was not OCR'd).
+    """
+
+    text_path: Optional[Path]
+    text_content: str
+    ocr_used: bool
+    pages: Optional[List[Dict]] = None
+
+    def as_tuple(self) -> Tuple[Optional[Path], str, bool]:
+        return self.text_path, self.text_content, self.ocr_used
+
+
 class TextExtractor:
     """Service class that encapsulates text extraction strategy for DOCX/PDF and OCR.
 
@@ -45,40 +74,260 @@ class TextExtractor:
         pytesseract_mod=None,
         convert_from_bytes_fn: Callable | None = None,
         ocr_pdf_fn: Callable | None = None,
+        ocr_workers: Optional[int] = None,
     ) -> None:
         self.tesseract_cmd = tesseract_cmd or (Path(settings.TESSERACT_CMD) if settings.TESSERACT_CMD else None)
         self.pytesseract = pytesseract_mod if pytesseract_mod is not None else pytesseract
         self.convert_from_bytes = convert_from_bytes_fn if convert_from_bytes_fn is not None else convert_from_bytes
         self.external_ocr_pdf = ocr_pdf_fn  # function(path) -> text (string)
+        self._ocr_backend = None
+        self.ocr_workers = max(1, ocr_workers or settings.OCR_WORKERS or os.cpu_count() or 1)
 
     @staticmethod
     def _write_text(path: Path, text: str) -> None:
         path.write_text(text, encoding="utf-8")
 
+    def _prepare_tesseract(self) -> None:
+        try:
+            self.pytesseract.pytesseract.tesseract_cmd = str(self.tesseract_cmd)
+        except Exception:
+            # If assignment fails, ignore and let pytesseract use defaults
+            pass
+
+    @property
+    def ocr_backend(self):
+        """OCR backend (see `app.services.ocr.get_backend`); an injected `pytesseract_mod`
+        is wrapped in a `PytesseractBackend`."""
+        if self._ocr_backend is None:
+            from app.services.ocr import PytesseractBackend, get_backend
+
+            if self.pytesseract is not pytesseract:
+                self._ocr_backend = PytesseractBackend(self.pytesseract)
+            else:
+                self._ocr_backend = get_backend() or PytesseractBackend(self.pytesseract)
+        return self._ocr_backend
+
+    def _pdf2image_ready(self, converter: Optional[Callable]) -> bool:
+        """pdf2image OCR needs TESSERACT_CMD and a converter; the stock pdf2image converters
+        also need Poppler and a working tesseract according to the capability probe, so a
+        missing dependency is skipped up front instead of failing on every document."""
+        if not (self.tesseract_cmd and self.pytesseract and converter):
+            return False
+        if converter is convert_from_bytes or converter is convert_from_path:
+            caps = ocr_capabilities.current
+            return caps.poppler and caps.tesseract
+        return True
+
+    def _ocr_image(self, img) -> str:
+        return self.ocr_backend.image_to_string(img)
+
+    def _ocr_page_image(self, img) -> Optional[str]:
+        try:
+            return self._ocr_image(preprocess_image(img))
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).warning(f"OCR page failed: {e}")
+            return None
+
+    def _ocr_image_list(self, pages, workers: Optional[int] = None) -> List[Optional[str]]:
+        """OCR rendered pages in parallel, keeping page order (`None` = page failed).
+
+        pytesseract runs tesseract as a subprocess, so a thread pool is enough to use
+        several cores (and avoids pickling PIL images to a process pool). Without explicit
+        `workers`, slots are reserved from the global `ocr_page_governor`.
+        """
+        pages = list(pages)
+        if not pages:
+            return []
+        if workers is None:
+            with ocr_page_governor.reserve(min(self.ocr_workers, len(pages))) as slots:
+                return self._ocr_image_list(pages, workers=slots)
+        workers = min(workers, len(pages))
+        if workers <= 1:
+            return [self._ocr_page_image(img) for img in pages]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-page") as pool:
+            return list(pool.map(self._ocr_page_image, pages))
+
+    def _ocr_images(self, pages) -> str:
+        return PAGE_SEPARATOR.join(t or "" for t in self._ocr_image_list(pages)).strip()
+
+    def _page_windows(self, pages: List[int], size: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Split page numbers into contiguous (first, last) windows of at most `size` pages
+        (default `ocr_workers`)."""
+        size = size or self.ocr_workers
+        windows: List[Tuple[int, int]] = []
+        for n in pages:
+            if windows and n == windows[-1][1] + 1 and n - windows[-1][0] < size:
+                windows[-1] = (windows[-1][0], n)
+            else:
+                windows.append((n, n))
+        return windows
+
+    def _ocr_pdf_page_texts(
+        self,
+        source: Union[bytes, Path],
+        convert: Callable,
+        dpi: int,
+        pages: Optional[List[int]] = None,
+        max_pages: Optional[int] = None,
+    ) -> List[str]:
+        """Render via `convert(**kwargs)` + OCR, consulting the persistent page cache.
+
+        Pages are rendered in `first_page`/`last_page` windows of `ocr_workers` pages (or
+        fewer, as granted by `ocr_page_governor`) and
+        each window is OCR'd and released before the next one is rendered, so peak memory
+        follows the number of pages OCR'd concurrently instead of the document length.
+        Only pages missing from `ocr_page_cache` are rendered. `pages` selects specific
+        pages (default: all); `max_pages` limits OCR to the first N pages.
+
+        Returns text per OCR'd page, in page order.
+        """
+        from app.services.ocr import cache_lang, pdf_page_count, source_sha256
+
+        pdf_source = source if isinstance(source, bytes) else str(source)
+        if pages is None:
+            page_count = pdf_page_count(pdf_source)
+            if not page_count:
+                # Jumlah halaman tidak diketahui: render sekaligus (perilaku lama)
+                if max_pages:
+                    return [t or "" for t in self._ocr_image_list(convert(dpi=dpi, first_page=1, last_page=max_pages))]
+                return [t or "" for t in self._ocr_image_list(convert(dpi=dpi, thread_count=self.ocr_workers))]
+            pages = list(range(1, page_count + 1))
+        if max_pages:
+            pages = [n for n in pages if n <= max_pages]
+
+        def _ocr_missing(missing: List[int]) -> List[Optional[str]]:
+            texts: List[Optional[str]] = []
+            # Window size follows the page slots granted by the global OCR governor
+            with ocr_page_governor.reserve(min(self.ocr_workers, len(missing))) as slots:
+                for first, last in self._page_windows(missing, slots):
+                    images = convert(dpi=dpi, first_page=first, last_page=last, thread_count=last - first + 1)
+                    texts.extend(self._ocr_image_list(images, workers=slots))
+                    del images
+            return texts
+
+        lang = cache_lang(self.ocr_backend)
+        if not ocr_page_cache.enabled or not lang:
+            return [t or "" for t in _ocr_missing(pages)]
+        return ocr_page_cache.ocr_pages(
+            source_sha256(pdf_source),
+            pages,
+            dpi,
+            lang,
+            f"pdf2image+{self.ocr_backend.engine}{preprocess_signature()}",
+            _ocr_missing,
+        )
+
+    def _ocr_pdf_cached(
+        self,
+        source: Union[bytes, Path],
+        convert: Callable,
+        dpi: int,
+        max_pages: Optional[int] = None,
+    ) -> str:
+        return PAGE_SEPARATOR.join(self._ocr_pdf_page_texts(source, convert, dpi, max_pages=max_pages)).strip()
+
+    def _ocr_selected_pages(self, path: Optional[Path], content: Optional[bytes], pages: List[int]) -> Dict[int, str]:
+        """OCR only `pages` (1-based) of a PDF (image-only pages of a mixed or fully scanned PDF).
+
+        Tries pdf2image first, then PyMuPDF (`app.services.ocr.ocr_pdf_pages`). An injected
+        `ocr_pdf_fn` works on whole files only, so it is not used here.
+        """
+        import logging
+        log = logging.getLogger(__name__)
+
+        converter = self.convert_from_bytes if content is not None else convert_from_path
+        if self._pdf2image_ready(converter):
+            try:
+                self._prepare_tesseract()
+                if content is not None:
+                    convert = lambda **kw: converter(content, **kw)
+                else:
+                    convert = lambda **kw: converter(str(path), **kw)
+                texts = self._ocr_pdf_page_texts(content if content is not None else path, convert, PDF2IMAGE_DPI, pages=pages)
+                if any(t.strip() for t in texts):
+                    return dict(zip(pages, texts))
+            except Exception as e:
+                log.warning(f"OCR failed (Poppler/Tesseract might not be installed): {e}")
+
+        try:
+            from app.services.ocr import ocr_pdf_pages
+
+            texts = ocr_pdf_pages(path.as_posix() if path is not None else content, pages)
+            return dict(zip(pages, texts))
+        except Exception as e:
+            log.warning(f"PyMuPDF OCR failed: {e}")
+            return {}
+
+    def _ocr_whole_document(
+        self,
+        path: Optional[Path],
+        content: Optional[bytes],
+        temp_file_name: Optional[str],
+        max_pages: Optional[int],
+        known_pages: bool,
+    ) -> str:
+        """OCR satu dokumen utuh untuk PDF yang jumlah halamannya tidak diketahui (pdf2image,
+        lalu `ocr_pdf_fn` / PyMuPDF), atau hanya `ocr_pdf_fn` bila OCR per halaman sudah dicoba."""
+        ocr_text = ""
+        if not known_pages:
+            if content is not None:
+                ocr_text = self._ocr_pdf_to_text_from_bytes(content)
+            else:
+                ocr_text = self._ocr_pdf_to_text_from_path(path, max_pages=max_pages)
+        if not ocr_text and self.external_ocr_pdf is not None:
+            try:
+                if path is not None:
+                    ocr_text = self.external_ocr_pdf(path.as_posix())
+                else:
+                    with temp_file_for(content, suffix=".pdf", prefix=temp_file_name) as tmp_path:
+                        ocr_text = self.external_ocr_pdf(tmp_path.as_posix())
+            except Exception:
+                ocr_text = ""
+        elif not ocr_text and not known_pages:
+            try:
+                # lazy import to avoid hard dependency
+                from app.services.ocr import ocr_pdf_to_text
+
+                ocr_text = ocr_pdf_to_text(
+                    path.as_posix() if path is not None else content,
+                    max_pages=max_pages if path is not None else None,
+                )
+            except Exception:
+                ocr_text = ""
+        return (ocr_text or "").strip()
+
+    @staticmethod
+    def _split_ocr_pages(
+        ocr_text: str, page_texts: List[str], wanted: List[int]
+    ) -> Tuple[Dict[int, str], List[str], List[int]]:
+        """Petakan teks OCR satu dokumen ke halaman lewat `PAGE_SEPARATOR`.
+
+        Returns (teks per halaman yang tidak kosong, teks native per halaman, halaman yang di-OCR).
+        Tanpa jumlah halaman, potongan teks menjadi halaman. Bila jumlahnya tidak cocok (OCR
+        eksternal tanpa pemisah halaman), seluruh teks dicatat di halaman pertama yang di-OCR.
+        """
+        if not ocr_text or (page_texts and not wanted):
+            return {}, page_texts, wanted
+        pieces = [t.strip() for t in split_pages(ocr_text)]
+        if not page_texts:
+            page_texts = [""] * len(pieces)
+            wanted = list(range(1, len(pieces) + 1))
+        if len(pieces) == len(wanted):
+            return {n: t for n, t in zip(wanted, pieces) if t}, page_texts, wanted
+        return {wanted[0]: ocr_text}, page_texts, wanted
+
     def _ocr_pdf_to_text_from_bytes(self, content: bytes, dpi: int = PDF2IMAGE_DPI) -> str:
         """Attempt OCR from PDF bytes (pdf2image + pytesseract).
 
         Returns extracted text or empty string if not available.
         """
-        if not (self.tesseract_cmd and self.pytesseract and self.convert_from_bytes):
+        if not self._pdf2image_ready(self.convert_from_bytes):
             return ""
         
         try:
-            try:
-                self.pytesseract.pytesseract.tesseract_cmd = str(self.tesseract_cmd)
-            except Exception:
-                # If assignment fails, ignore and let pytesseract use defaults
-                pass
-
-            pages = self.convert_from_bytes(content, dpi=dpi)
-            lines = []
-            for img in pages:
-                try:
-                    t = self.pytesseract.image_to_string(img, lang=TESSERACT_LANG)
-                except Exception:
-                    t = self.pytesseract.image_to_string(img)
-                lines.append(t)
-            return "\n".join(lines).strip()
+            self._prepare_tesseract()
+            return self._ocr_pdf_cached(content, lambda **kw: self.convert_from_bytes(content, **kw), dpi)
         except Exception as e:
             # Handle missing Poppler or other OCR errors gracefully
             import logging
@@ -86,85 +335,164 @@ class TextExtractor:
             log.warning(f"OCR failed (Poppler/Tesseract might not be installed): {e}")
             return ""
 
-    def extract_text_and_save(
+    def _ocr_pdf_to_text_from_path(self, path: Path, dpi: int = PDF2IMAGE_DPI, max_pages: Optional[int] = None) -> str:
+        """Same as `_ocr_pdf_to_text_from_bytes` but lets pdf2image read the file directly."""
+        if not self._pdf2image_ready(convert_from_path):
+            return ""
+
+        try:
+            self._prepare_tesseract()
+            return self._ocr_pdf_cached(Path(path), lambda **kw: convert_from_path(str(path), **kw), dpi, max_pages)
+        except Exception as e:
+            import logging
+            log = logging.getLogger(__name__)
+            log.warning(f"OCR failed (Poppler/Tesseract might not be installed): {e}")
+            return ""
+
+    def _extract(
         self,
-        content: bytes,
         mime_type: str,
-        base_dir: Path,
+        base_dir: Optional[Path],
+        path: Optional[Path] = None,
+        content: Optional[bytes] = None,
         temp_file_name: Optional[str] = None,
-    ) -> Tuple[Optional[Path], str, bool]:
-        """Main entry: save temporary upload, parse, try OCR fallback and write text.txt.
+        max_pages: Optional[int] = None,
+    ) -> "ExtractedText":
+        """Core extraction from either a file on disk (`path`) or in-memory `content`.
 
-        Returns: (text_path, text_content, ocr_used)
+        Parsers (pdfminer, python-docx, PyMuPDF) read streams directly; a uniquely named
+        temp file is only created when an injected `ocr_pdf_fn` needs a path.
+        `max_pages` limits built-in OCR of scanned PDFs on disk to the first N pages.
+
+        PDFs are classified per page (native text vs. image-only, via the text backend's page
+        breaks): only image-only pages are OCR'd and merged back in page order, joined by
+        `PAGE_SEPARATOR`; each page records its own outcome (native / ocr / scanned). A fully
+        scanned PDF whose pages cannot be counted goes through the whole-document OCR fallbacks.
         """
         text_content = ""
         ocr_used = False
+        pages: Optional[List[Dict]] = None
 
-        # Simpan sementara untuk parser kamu (karena butuh path)
-        temp_dir: Path = settings.TEMP_UPLOAD_PATH
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        name = temp_file_name or TMP_UPLOAD_NAME
-        # Tentukan ekstensi sederhana dari MIME
-        ext = ".pdf" if mime_type == "application/pdf" else ".docx"
-        tmp_path = temp_dir / f"{name}{ext}"
-        tmp_path.write_bytes(content)
+        def _source():
+            return path.as_posix() if path is not None else io.BytesIO(content)
 
         if mime_type == "application/pdf":
             # Pakai parser_pdf
-            text, is_scanned = extract_text_from_pdf(tmp_path.as_posix())
+            text, is_scanned = extract_text_from_pdf(_source())
             text_content = (text or "").strip()
+            page_texts = split_pages(text or "")
+            to_ocr = scanned_pages(page_texts)
+            ocr_done: List[int] = []
 
             # OCR fallback jika scan dan OCR aktif/tersedia
             if is_scanned and not text_content:
                 import logging
                 log = logging.getLogger(__name__)
                 log.info("PDF is scanned/image-only, attempting OCR...")
-                
-                # 1) coba OCR dari bytes (pdf2image + pytesseract) bila tersedia
-                ocr_text = self._ocr_pdf_to_text_from_bytes(content)
-                
-                if ocr_text:
-                    log.info(f"OCR successful: extracted {len(ocr_text)} characters")
 
-                # 2) fallback ke PyMuPDF-based OCR (disk-based) jika in-memory OCR tidak tersedia
-                if not ocr_text and self.external_ocr_pdf is not None:
-                    try:
-                        ocr_text = self.external_ocr_pdf(tmp_path.as_posix())
-                    except Exception:
-                        ocr_text = ""
-                elif not ocr_text:
-                    try:
-                        # lazy import to avoid hard dependency
-                        from app.services.ocr import ocr_pdf_to_text
-
-                        ocr_text = ocr_pdf_to_text(tmp_path.as_posix())
-                    except Exception:
-                        ocr_text = ""
-
-                if ocr_text:
-                    text_content = ocr_text
+                if not page_texts:
+                    # Backend teks tidak memberi batas halaman: jumlah halaman dari PyMuPDF
+                    from app.services.ocr import pdf_page_count
+
+                    page_texts = [""] * (pdf_page_count(path.as_posix() if path is not None else content) or 0)
+                    to_ocr = scanned_pages(page_texts)
+
+                # 1) OCR per halaman (pdf2image, lalu PyMuPDF): hasil tiap halaman tercatat sendiri
+                wanted = [n for n in to_ocr if not max_pages or n <= max_pages]
+                ocr_by_page = self._ocr_selected_pages(path, content, wanted) if wanted else {}
+                ocr_by_page = {n: t.strip() for n, t in ocr_by_page.items() if t and t.strip()}
+
+                # 2) fallback OCR satu dokumen: jumlah halaman tidak diketahui (pdf2image) atau OCR eksternal
+                if not ocr_by_page:
+                    ocr_text = self._ocr_whole_document(path, content, temp_file_name, max_pages, known_pages=bool(wanted))
+                    ocr_by_page, page_texts, wanted = self._split_ocr_pages(ocr_text, page_texts, wanted)
+
+                if ocr_by_page:
+                    merged = [ocr_by_page.get(n, native) for n, native in enumerate(page_texts, start=1)]
+                    text_content = PAGE_SEPARATOR.join(merged).strip()
                     ocr_used = True
+                    ocr_done = sorted(ocr_by_page)
+                    to_ocr = scanned_pages(page_texts)
+                    log.info(f"OCR successful: extracted {len(text_content)} characters from {len(ocr_done)} page(s)")
                 else:
                     log.warning("OCR returned no text. Install Poppler for better OCR support.")
 
+            elif to_ocr:
+                # Campuran: halaman native dipakai apa adanya, hanya halaman gambar yang di-OCR
+                wanted = [n for n in to_ocr if not max_pages or n <= max_pages]
+                ocr_by_page = {
+                    n: t.strip()
+                    for n, t in (self._ocr_selected_pages(path, content, wanted) if wanted else {}).items()
+                    if t and t.strip()
+                }
+                if ocr_by_page:
+                    merged = [ocr_by_page.get(n, native) for n, native in enumerate(page_texts, start=1)]
+                    text_content = PAGE_SEPARATOR.join(merged).strip()
+                    ocr_used = True
+                    ocr_done = sorted(ocr_by_page)
+
+            pages = [
+                {
+                    "page": n,
+                    "mode": "native" if n not in to_ocr else ("ocr" if n in ocr_done else "scanned"),
+                    "native_chars": len(native.strip()),
+                }
+                for n, native in enumerate(page_texts, start=1)
+            ] or None
+
         elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
             # Pakai parser_docx
-            text_content = (extract_text_from_docx(tmp_path.as_posix()) or "").strip()
+            text_content = (extract_text_from_docx(_source()) or "").strip()
 
         # Tulis text.txt jika ada
         text_path = None
-        if text_content:
+        if text_content and base_dir is not None:
             from app.constants import TEXT_FILENAME
             text_path = base_dir / TEXT_FILENAME
             self._write_text(text_path, text_content)
 
-        # Bersihkan file temp (best-effort)
-        try:
-            tmp_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+        return ExtractedText(text_path, text_content, ocr_used, pages)
 
-        return text_path, text_content, ocr_used
+    def extract_document(
+        self,
+        path: Path,
+        mime_type: str,
+        base_dir: Optional[Path] = None,
+        max_pages: Optional[int] = None,
+    ) -> ExtractedText:
+        """Like `extract_text_from_file`, plus the per-page native/OCR decision for PDFs."""
+        return self._extract(mime_type, base_dir, path=Path(path), max_pages=max_pages)
+
+    def extract_text_from_file(
+        self,
+        path: Path,
+        mime_type: str,
+        base_dir: Optional[Path] = None,
+        max_pages: Optional[int] = None,
+    ) -> Tuple[Optional[Path], str, bool]:
+        """Parse a file that is already on disk (no temp copy), try OCR fallback.
+
+        `text.txt` is only written when `base_dir` is given. `max_pages` limits OCR of
+        scanned PDFs to the first N pages (header-first mode).
+
+        Returns: (text_path, text_content, ocr_used)
+        """
+        return self.extract_document(path, mime_type, base_dir, max_pages).as_tuple()
+
+    def extract_text_and_save(
+        self,
+        content: bytes,
+        mime_type: str,
+        base_dir: Path,
+        temp_file_name: Optional[str] = None,
+    ) -> Tuple[Optional[Path], str, bool]:
+        """Main entry: parse uploaded bytes in memory, try OCR fallback and write text.txt.
+
+        `temp_file_name` is only used as prefix when a backend needs a temp file.
+
+        Returns: (text_path, text_content, ocr_used)
+        """
+        return self._extract(mime_type, base_dir, content=content, temp_file_name=temp_file_name).as_tuple()
 
 
 # Backwards-compatible convenience function
@@ -179,3 +507,20 @@ def extract_text_and_save(
 ) -> Tuple[Optional[Path], str, bool]:
     return _default_extractor.extract_text_and_save(content=content, mime_type=mime_type, base_dir=base_dir, temp_file_name=temp_file_name)
 
+
+def extract_text_from_file(
+    path: Path,
+    mime_type: str,
+    base_dir: Optional[Path] = None,
+    max_pages: Optional[int] = None,
+) -> Tuple[Optional[Path], str, bool]:
+    return _default_extractor.extract_text_from_file(path=path, mime_type=mime_type, base_dir=base_dir, max_pages=max_pages)
+
+
+def extract_document(
+    path: Path,
+    mime_type: str,
+    base_dir: Optional[Path] = None,
+    max_pages: Optional[int] = None,
+) -> ExtractedText:
+    return _default_extractor.extract_document(path=path, mime_type=mime_type, base_dir=base_dir, max_pages=max_pages)
@@ -1,9 +1,15 @@
 from pathlib import Path
+import os
 import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional
 
 from app.config import settings
+from app.utils.hash import sha256_copy
 
 
 def backup_folder(src: Path) -> Optional[Path]:
@@ -20,3 +26,76 @@ def backup_folder(src: Path) -> Optional[Path]:
     dst.parent.mkdir(parents=True, exist_ok=True)
     shutil.copytree(src, dst)
     return dst
+
+
+@dataclass
+class SpooledUpload:
+    path: Path
+    sha256: str
+    size_bytes: int
+
+
+def spool_dir() -> Path:
+    from app.constants import SPOOL_DIR_NAME
+    d = settings.TEMP_UPLOAD_PATH / SPOOL_DIR_NAME
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def spool_upload(
+    file_obj: BinaryIO,
+    dest_dir: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> SpooledUpload:
+    """
+    Stream `file_obj` chunk demi chunk ke file unik di `dest_dir` sambil menghitung SHA-256.
+
+    Batas `max_bytes` dicek di tengah stream (raise `FileTooLargeError`); file parsial
+    selalu dihapus bila terjadi error.
+    """
+    from app.constants import UPLOAD_CHUNK_SIZE
+    dest = (dest_dir or spool_dir()) / f"{uuid.uuid4().hex}.part"
+    try:
+        with dest.open("wb") as out:
+            sha256, size = sha256_copy(file_obj, out, chunk_size=chunk_size or UPLOAD_CHUNK_SIZE, max_bytes=max_bytes)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return SpooledUpload(path=dest, sha256=sha256, size_bytes=size)
+
+
+def move_into(src: Path, dst: Path) -> Path:
+    """
+    Pindahkan `src` ke `dst` tanpa menyalin isi (rename atomik di filesystem yang sama).
+    Fallback ke `shutil.move` bila beda device.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.move(str(src), str(dst))
+    return dst
+
+
+@contextmanager
+def temp_file_for(content: bytes, suffix: str = "", prefix: Optional[str] = None) -> Iterator[Path]:
+    """
+    Tulis `content` ke file temp bernama unik di TEMP_UPLOAD_DIR dan hapus setelah dipakai.
+
+    Hanya untuk backend yang wajib menerima path; aman dipakai paralel.
+    """
+    from app.constants import TMP_UPLOAD_NAME
+    temp_dir = settings.TEMP_UPLOAD_PATH
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(suffix=suffix, prefix=f"{prefix or TMP_UPLOAD_NAME}_", dir=temp_dir)
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        yield path
+    finally:
+        try:
+            path.unlink(missing_ok=True)
+        except Exception:
+            pass
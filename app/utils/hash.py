@@ -1,17 +1,45 @@
-
-# app/utils/hash.py
 """
 SHA-256 hashing untuk deteksi duplikasi file.
 """
 import hashlib
-from typing import BinaryIO
+from typing import BinaryIO, Optional, Tuple
 
 
-def sha256_file(file_obj: BinaryIO, chunk_size: int = 65536) -> str:
+class FileTooLargeError(ValueError):
+    """Stream melebihi batas ukuran `max_bytes`."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"File exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def sha256_copy(
+    file_obj: BinaryIO,
+    sink: Optional[BinaryIO] = None,
+    chunk_size: int = 65536,
+    max_bytes: Optional[int] = None,
+) -> Tuple[str, int]:
+    """Hash `file_obj` per chunk, sekaligus menyalin tiap chunk ke `sink` (opsional).
+
+    Berhenti dengan `FileTooLargeError` begitu total byte melewati `max_bytes`,
+    sehingga file besar tidak pernah dibaca penuh.
+
+    Returns: (hexdigest, size_bytes)
+    """
     hasher = hashlib.sha256()
+    size = 0
     while True:
         data = file_obj.read(chunk_size)
         if not data:
             break
+        size += len(data)
+        if max_bytes is not None and size > max_bytes:
+            raise FileTooLargeError(max_bytes)
         hasher.update(data)
-    return hasher.hexdigest()
+        if sink is not None:
+            sink.write(data)
+    return hasher.hexdigest(), size
+
+
+def sha256_file(file_obj: BinaryIO, chunk_size: int = 65536) -> str:
+    return sha256_copy(file_obj, chunk_size=chunk_size)[0]
@@ -0,0 +1,93 @@
+"""
+Batas ukuran body request sebelum multipart di-parse.
+
+Starlette mem-parse seluruh body multipart (`request.form()`) sebelum handler jalan: tiap
+part ditulis ke `SpooledTemporaryFile` (memori lalu disk), sehingga batas di `spool_upload`
+baru berlaku setelah seluruh file diterima. Middleware ASGI ini menolak request dengan 413:
+
+- langsung dari header `Content-Length`, tanpa membaca body sama sekali
+- tanpa `Content-Length` (chunked): body dihitung saat dibaca; begitu melewati batas,
+  penerimaan dihentikan dan respons aplikasi diganti 413
+"""
+
+import json
+from typing import Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Ruang untuk boundary, header part & field form selain file
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """`limits`: pasangan (prefix path, batas byte); prefix pertama yang cocok dipakai."""
+
+    def __init__(self, app: ASGIApp, limits: Sequence[Tuple[str, int]]) -> None:
+        self.app = app
+        self.limits = list(limits)
+
+    def limit_for(self, path: str) -> Optional[int]:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > limit
+            except ValueError:
+                too_large = False
+            if too_large:
+                await _reject(send, limit)
+                return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded:
+                return  # respons aplikasi (mis. 400 parse error) diganti 413 di bawah
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await _reject(send, limit)
+
+
+async def _reject(send: Send, limit: int) -> None:
+    body = json.dumps({"detail": f"Request terlalu besar (max {limit / (1024 * 1024):.0f} MB)"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,120 @@
+"""
+scripts/bench_docx_text.py
+
+Bandingkan ekstraksi teks DOCX:
+
+- legacy    : python-docx (`extract_text_from_docx_legacy`), seluruh object model dibangun
+- streaming : iterparse `word/document.xml` + header/footer (`extract_text_from_docx`)
+
+Dilaporkan per ukuran dokumen: waktu (ms, terbaik dari --repeat), kenaikan RSS puncak
+(tiap extractor di subprocess terpisah agar `ru_maxrss` tidak saling memengaruhi; tree lxml
+python-docx dialokasikan di C sehingga tidak terlihat oleh tracemalloc) dan parity: baris
+hasil legacy yang tidak muncul di hasil streaming (harus 0), serta jumlah baris duplikat
+sel gabungan yang dibuang.
+
+Dokumen sintetis: kop di header, blok Nomor/Hal, N paragraf isi, tabel lampiran dengan sel
+gabungan. `--docx` untuk mengukur file sendiri.
+
+Usage:
+  python scripts/bench_docx_text.py [--sizes 50 500 2000] [--repeat 3] [--docx surat.docx ...]
+"""
+import argparse
+import io
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import docx  # noqa: E402
+
+from app.services.parser_docx import extract_text_from_docx, extract_text_from_docx_legacy  # noqa: E402
+
+EXTRACTORS = {"legacy": extract_text_from_docx_legacy, "streaming": extract_text_from_docx}
+
+
+def _sample_docx(paragraphs: int) -> bytes:
+    d = docx.Document()
+    d.sections[0].header.paragraphs[0].text = "PEMERINTAH PROVINSI DKI JAKARTA\nKELURAHAN PELA MAMPANG"
+    d.sections[0].footer.paragraphs[0].text = "Jl. Kemang Utara IX No. 1, Jakarta Selatan"
+    d.add_paragraph("Nomor : 001/SK/12/2025")
+    d.add_paragraph("Hal : Undangan Rapat Koordinasi")
+    for i in range(paragraphs):
+        d.add_paragraph(f"Paragraf {i}: sehubungan dengan kegiatan kelurahan, mohon kehadiran Bapak/Ibu.")
+    rows = max(3, paragraphs // 10)
+    table = d.add_table(rows=rows + 1, cols=4)
+    table.cell(0, 0).merge(table.cell(0, 3)).text = "Daftar Hadir Warga"
+    for r in range(1, rows + 1):
+        for c in range(3):
+            table.cell(r, c).text = f"R{r}C{c}"
+    table.cell(1, 3).merge(table.cell(rows, 3)).text = "Hadir"
+    buf = io.BytesIO()
+    d.save(buf)
+    return buf.getvalue()
+
+
+def _child(extractor: str, path: str, repeat: int) -> None:
+    fn = EXTRACTORS[extractor]
+    data = Path(path).read_bytes()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        text = fn(io.BytesIO(data))
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": best, "rss_mb": (peak - baseline) / 1024, "text": text}))
+
+
+def _measure(extractor: str, path: str, repeat: int):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", extractor, "--path", path, "--repeat", str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    r = json.loads(out.stdout.strip().splitlines()[-1])
+    return r["text"], r["seconds"], r["rss_mb"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 500, 2000], help="jumlah paragraf isi")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--docx", type=Path, nargs="*", help="file DOCX sendiri (menggantikan dokumen sintetis)")
+    parser.add_argument("--child", choices=list(EXTRACTORS), help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.path, args.repeat)
+        return
+
+    if args.docx:
+        samples = [(p.name, p.read_bytes()) for p in args.docx]
+    else:
+        samples = [(f"{n} paragraf", _sample_docx(n)) for n in args.sizes]
+
+    print(f"{'dokumen':<16} {'KB':>7} " + " ".join(f"{name + ' ms':>13} {name + ' +RSS MB':>18}" for name in EXTRACTORS)
+          + f" {'speedup':>8} {'missing':>8} {'dedup':>6}")
+    for label, data in samples:
+        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as fh:
+            fh.write(data)
+        try:
+            results = {name: _measure(name, fh.name, args.repeat) for name in EXTRACTORS}
+        finally:
+            Path(fh.name).unlink(missing_ok=True)
+        legacy_lines = results["legacy"][0].splitlines()
+        streamed_lines = set(results["streaming"][0].splitlines())
+        missing = sum(1 for line in set(legacy_lines) if line not in streamed_lines)
+        dedup = len(legacy_lines) - len(set(legacy_lines))
+        cols = " ".join(f"{t * 1000:13.1f} {rss:18.1f}" for _text, t, rss in results.values())
+        speedup = results["legacy"][1] / results["streaming"][1]
+        print(f"{label:<16} {len(data) / 1024:7.0f} {cols} {speedup:7.1f}x {missing:8d} {dedup:6d}")
+
+
+if __name__ == "__main__":
+    main()
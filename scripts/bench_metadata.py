@@ -0,0 +1,77 @@
+"""
+scripts/bench_metadata.py
+
+Throughput `parse_metadata` (dokumen/detik) untuk teks OCR besar.
+
+Korpus: surat sintetis dari `generate_metadata_golden.py` yang diperpanjang dengan N
+halaman lampiran hasil OCR (spasi ganda, tab, noise '/-', form feed antar halaman),
+sehingga biaya normalisasi & regex atas seluruh teks terlihat jelas. Default tanpa
+klasifikasi ML (mengukur parser saja); `--ml` menyertakan classifier bila tersedia.
+`--batch N` mengukur `parse_metadata_batch` (potongan N dokumen, `--workers` proses)
+sebagai pembanding `parse_metadata` per dokumen.
+
+Usage:
+  python scripts/bench_metadata.py [--docs 200] [--pages 1 10 40] [--repeat 3] [--ml] [--batch 64 --workers 2]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import metadata  # noqa: E402
+from generate_metadata_golden import build_corpus  # noqa: E402
+
+OCR_LINE = "{:>3}  Warga RT {:02d} / RW {:02d}\t NIK 3174{}  \t Hadir /- tercatat  pada  daftar  hadir"
+
+
+def _ocr_pages(rng: random.Random, pages: int) -> str:
+    out = []
+    for page in range(pages):
+        rows = [OCR_LINE.format(r + 1, r % 10 + 1, page % 12 + 1, rng.randint(10**11, 10**12 - 1)) for r in range(45)]
+        out.append("\n".join(rows))
+    return "\f".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--pages", type=int, nargs="*", default=[1, 10, 40], help="halaman lampiran OCR per dokumen")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ml", action="store_true", help="sertakan klasifikasi ML (bila model tersedia)")
+    parser.add_argument("--batch", type=int, default=0, help="ukur parse_metadata_batch dengan potongan N dokumen")
+    parser.add_argument("--workers", type=int, default=1, help="proses untuk --batch")
+    args = parser.parse_args()
+
+    metadata.USE_ML_CLASSIFIER = metadata.USE_ML_CLASSIFIER and args.ml
+    uploaded_at = datetime(2025, 12, 31)
+    base = build_corpus(max(0, args.docs - 30))[: args.docs]
+    print(f"ml={metadata.USE_ML_CLASSIFIER} docs={len(base)} batch={args.batch or '-'} workers={args.workers}")
+    print(f"{'halaman':>8} {'KB/dok':>8} {'ms/dok':>9} {'dok/detik':>10} {'MB/detik':>9}")
+    for pages in args.pages:
+        rng = random.Random(pages)
+        docs = [(case["text"] + "\f" + _ocr_pages(rng, pages), case["filename"]) for case in base]
+        size = sum(len(text) for text, _ in docs)
+        best = None
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            if args.batch:
+                items = ((text, filename, uploaded_at) for text, filename in docs)
+                for _ in metadata.parse_metadata_batch(items, chunk_size=args.batch, workers=args.workers):
+                    pass
+            else:
+                for text, filename in docs:
+                    metadata.parse_metadata(text, filename, uploaded_at=uploaded_at)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        print(
+            f"{pages:>8} {size / len(docs) / 1024:8.1f} {best / len(docs) * 1000:9.2f} "
+            f"{len(docs) / best:10.1f} {size / best / 1e6:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+scripts/bench_model_memory.py
+
+Ukur cold-start & memori per worker untuk model classifier format pickle vs mmap.
+
+Menjalankan N proses worker bersamaan per format (seperti N worker uvicorn/gunicorn). Tiap
+worker: import `app.services.classifier_ml`, muat model lewat `ModelRegistry`, satu prediksi
+(warm-up) lalu klasifikasi beberapa surat, kemudian melaporkan:
+
+- import / load / first_predict: detik (cold-start = jumlah ketiganya)
+- rss: RSS total proses; pss: RSS dengan page bersama dibagi rata antar proses
+  (/proc/self/smaps_rollup); uss: page privat proses ini
+- model_uss: kenaikan page privat sejak sebelum model dimuat (salinan model per worker)
+
+Model bawaan (data/classifier_model.pkl) kecil; `--synthetic-terms N` melatih model sintetis
+dengan N istilah (TF-IDF + MultinomialNB, format sama dengan train_classifier) agar
+perbedaannya terlihat. Linux saja (/proc).
+
+Usage:
+  python scripts/bench_model_memory.py [--workers 4] [--model data/classifier_model.pkl] [--synthetic-terms 200000]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+WORKER = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+
+def mem():
+    out = {{}}
+    with open("/proc/self/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].rstrip(":") in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                out[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {{"rss": out["Rss"], "pss": out["Pss"], "uss": out["Private_Clean"] + out["Private_Dirty"]}}
+
+t0 = time.perf_counter()
+from app.services import classifier_ml
+from app.services.model_registry import ModelRegistry
+t1 = time.perf_counter()
+before = mem()
+registry = ModelRegistry({path!r})
+registry.current
+t2 = time.perf_counter()
+registry.model.predict_proba(["Kepada Yth. Lurah Pela Mampang"])
+t3 = time.perf_counter()
+classifier_ml.model_registry = registry
+texts = {texts!r}
+for text in texts:
+    classifier_ml.classify(text)
+after = mem()
+print(json.dumps({{
+    "import": t1 - t0, "load": t2 - t1, "first_predict": t3 - t2,
+    **after, "model_uss": after["uss"] - before["uss"],
+}}), flush=True)
+sys.stdin.read()  # tetap hidup sampai semua worker selesai diukur (page bersama terhitung)
+"""
+
+
+def _synthetic_model(terms: int, out: Path) -> Path:
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    rng = random.Random(terms)
+    words = [f"kata{i}" for i in range(terms)]
+    docs = [" ".join(rng.choices(words, k=400)) for _ in range(max(200, terms // 150))]
+    labels = ["masuk" if i % 2 else "keluar" for i in range(len(docs))]
+    pipeline = Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=1)),
+        ("classifier", MultinomialNB(alpha=0.1)),
+    ])
+    pipeline.fit(docs, labels)
+    path = out / "synthetic_model.pkl"
+    joblib.dump(pipeline, path)
+    return path
+
+
+def _run(path: Path, workers: int, texts):
+    code = WORKER.format(root=str(ROOT), path=str(path), texts=texts)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    results = [json.loads(p.stdout.readline()) for p in procs]
+    # Ukur ulang PSS setelah semua worker hidup: page bersama dibagi rata antar worker
+    pss = []
+    for p in procs:
+        with open(f"/proc/{p.pid}/smaps_rollup") as fh:
+            pss.append(next(int(line.split()[1]) / 1024 for line in fh if line.startswith("Pss:")))
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    for result, value in zip(results, pss):
+        result["pss"] = value
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", type=Path, default=ROOT / "data" / "classifier_model.pkl")
+    parser.add_argument("--synthetic-terms", type=int, default=0, help="latih model sintetis dengan N istilah")
+    args = parser.parse_args()
+
+    import joblib
+    from app.services.mmap_model import export_model
+    from generate_metadata_golden import build_corpus
+
+    texts = [case["text"] for case in build_corpus(20)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pkl = _synthetic_model(args.synthetic_terms, tmp) if args.synthetic_terms else args.model
+        mapped = export_model(joblib.load(pkl), tmp / "mmap")
+        size_pkl = pkl.stat().st_size / 1e6
+        size_mmap = sum(f.stat().st_size for f in mapped.iterdir()) / 1e6
+        print(f"model={pkl.name} pickle={size_pkl:.1f} MB mmap={size_mmap:.1f} MB workers={args.workers}")
+        print(f"{'format':>7} {'import s':>9} {'load s':>8} {'1st pred s':>10} {'rss MB':>8} {'pss MB':>8} {'uss MB':>8} {'model uss':>10}")
+        for name, path in (("pickle", pkl), ("mmap", mapped)):
+            results = _run(path, args.workers, texts)
+            avg = {k: sum(r[k] for r in results) / len(results) for k in results[0]}
+            print(
+                f"{name:>7} {avg['import']:9.3f} {avg['load']:8.3f} {avg['first_predict']:10.3f} "
+                f"{avg['rss']:8.1f} {avg['pss']:8.1f} {avg['uss']:8.1f} {avg['model_uss']:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+scripts/bench_ocr_backends.py
+
+Bandingkan throughput (halaman/detik) backend OCR di `app.services.ocr`:
+
+- tesserocr   : engine in-process, data bahasa dimuat sekali per thread
+- pytesseract : subprocess `tesseract` + file temp per halaman
+
+Halaman dirender sekali di awal (`render_page_image`) supaya yang diukur hanya OCR.
+Backend yang tidak terpasang dilaporkan sebagai unavailable.
+
+Usage:
+  python scripts/bench_ocr_backends.py [--pages 10] [--dpi 300] [--pdf path/to/scan.pdf]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # noqa: E402
+
+from app.services.ocr import PytesseractBackend, TesserocrBackend, render_page_image  # noqa: E402
+
+
+def _sample_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        text = "\n".join(f"Nomor: {i:03d}/SK/2025 Kelurahan Pela Mampang baris {j}" for j in range(40))
+        page.insert_text((40, 40), text, fontsize=10)
+    return doc.tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--pdf", type=Path, help="PDF sampel (default: PDF sintetis)")
+    args = parser.parse_args()
+
+    source = args.pdf.read_bytes() if args.pdf else _sample_pdf(args.pages)
+    with fitz.open(stream=source, filetype="pdf") as doc:
+        rendered = [render_page_image(page, args.dpi) for page in doc]
+    images = [img for img, _pix in rendered]
+    print(f"pages={len(images)} dpi={args.dpi}")
+
+    results = {}
+    for name, factory in (("tesserocr", TesserocrBackend), ("pytesseract", PytesseractBackend)):
+        try:
+            backend = factory()
+            backend.image_to_string(images[0])  # warm-up: inisialisasi engine / cek bahasa
+        except Exception as e:
+            print(f"{name:>12}: unavailable ({e})")
+            continue
+        t0 = time.perf_counter()
+        chars = sum(len(backend.image_to_string(img)) for img in images)
+        elapsed = time.perf_counter() - t0
+        results[name] = len(images) / elapsed
+        print(f"{name:>12}: {results[name]:6.2f} pages/s  ({elapsed / len(images) * 1000:7.1f} ms/page, {chars} chars, {backend.engine})")
+
+    if len(results) == 2:
+        print(f"{'speedup':>12}: {results['tesserocr'] / results['pytesseract']:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+scripts/bench_ocr_memory.py
+
+Benchmark memori puncak (RSS) jalur OCR pdf2image di `TextExtractor`:
+
+- legacy   : convert_from_bytes(seluruh PDF) -> semua halaman jadi PIL image sebelum OCR
+- windowed : `TextExtractor._ocr_pdf_to_text_from_bytes` (render per jendela `OCR_WORKERS` halaman)
+
+Tiap mode dijalankan di subprocess terpisah agar `ru_maxrss` tidak saling memengaruhi.
+Tesseract diganti OCR palsu (hanya membaca piksel) supaya yang diukur murni render + buffer.
+Bila poppler (pdftoppm) tidak terpasang, `--renderer pymupdf` meniru `convert_from_bytes`
+(render RGB ke PIL image, mendukung first_page/last_page).
+
+Usage:
+  python scripts/bench_ocr_memory.py [--pages 40] [--dpi 200] [--workers 2] [--renderer pdf2image|pymupdf]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _sample_pdf(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((40, 40), f"Halaman {i + 1}\nKelurahan Pela Mampang", fontsize=12)
+    return doc.tobytes()
+
+
+def _pymupdf_convert(content: bytes, dpi: int, first_page=None, last_page=None, thread_count=1):
+    import fitz
+    from PIL import Image
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        first = first_page or 1
+        last = last_page or doc.page_count
+        images = []
+        for n in range(first, last + 1):
+            pix = doc.load_page(n - 1).get_pixmap(dpi=dpi)
+            images.append(Image.frombytes("RGB", (pix.width, pix.height), pix.samples))
+        return images
+
+
+def _child(args) -> None:
+    import os
+
+    os.environ["OCR_CACHE_ENABLED"] = "false"
+    os.environ["OCR_WORKERS"] = str(args.workers)
+    from app.services.text_extraction import TextExtractor
+
+    if args.renderer == "pdf2image":
+        from pdf2image import convert_from_bytes as convert
+    else:
+        convert = _pymupdf_convert
+
+    fake_tesseract = types.SimpleNamespace(
+        image_to_string=lambda img, lang=None: str(img.getextrema()),
+        get_tesseract_version=lambda: "bench",
+        pytesseract=types.SimpleNamespace(),
+    )
+    extractor = TextExtractor(
+        tesseract_cmd=Path("tesseract"),
+        pytesseract_mod=fake_tesseract,
+        convert_from_bytes_fn=convert,
+        ocr_workers=args.workers,
+    )
+
+    content = Path(args.pdf).read_bytes()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if args.mode == "legacy":
+        text = extractor._ocr_images(convert(content, dpi=args.dpi, thread_count=args.workers))
+    else:
+        text = extractor._ocr_pdf_to_text_from_bytes(content, dpi=args.dpi)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "mode": args.mode,
+        "pages": text.count("\n") + 1 if text else 0,
+        "seconds": round(elapsed, 2),
+        "baseline_mb": round(baseline / 1024, 1),
+        "peak_mb": round(peak / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--renderer", choices=["pdf2image", "pymupdf"], default="pdf2image")
+    parser.add_argument("--mode", choices=["legacy", "windowed"], help=argparse.SUPPRESS)
+    parser.add_argument("--pdf", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _child(args)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as fh:
+        fh.write(_sample_pdf(args.pages))
+        pdf_path = fh.name
+
+    print(f"pages={args.pages} dpi={args.dpi} workers={args.workers} renderer={args.renderer}")
+    for mode in ("legacy", "windowed"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--pdf", pdf_path, "--pages", str(args.pages),
+             "--dpi", str(args.dpi), "--workers", str(args.workers), "--renderer", args.renderer],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:>9}: peak RSS {r['peak_mb']:8.1f} MB (+{r['peak_mb'] - r['baseline_mb']:.1f} MB), "
+            f"{r['pages']} pages in {r['seconds']:.2f}s"
+        )
+    Path(pdf_path).unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+scripts/bench_ocr_render.py
+
+Micro-benchmark overhead per halaman OCR di luar Tesseract:
+
+- legacy : get_pixmap(RGB) -> encode PNG -> tulis ke TemporaryDirectory -> PIL.open -> convert("L")
+- direct : get_pixmap(GRAY) -> PIL.Image.frombuffer(samples_mv)  (app.services.ocr.render_page_image)
+
+Juga melaporkan selisih piksel kedua jalur (MuPDF merender grayscale langsung, PIL
+mengonversi dari RGB; selisih hanya di tepi antialias).
+
+Usage:
+  python scripts/bench_ocr_render.py [--pages 10] [--dpi 300] [--pdf path/to/scan.pdf]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # noqa: E402
+from PIL import Image, ImageChops  # noqa: E402
+
+from app.services.ocr import render_page_image  # noqa: E402
+
+
+def _legacy(page, page_number: int, dpi: int):
+    pix = page.get_pixmap(dpi=dpi)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_file = Path(tmp_dir) / f"page_{page_number}.png"
+        tmp_file.write_bytes(pix.tobytes("png"))
+        img = Image.open(tmp_file)
+        img = img.convert("L")
+    return img
+
+
+def _sample_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        text = "\n".join(f"Kelurahan Pela Mampang baris {j} halaman {i}" for j in range(50))
+        page.insert_text((40, 40), text, fontsize=9)
+        page.draw_rect(fitz.Rect(30, 30, 560, 800), color=(0.2, 0.2, 0.2))
+    return doc.tobytes()
+
+
+def _time(fn, doc, dpi):
+    t0 = time.perf_counter()
+    for n, page in enumerate(doc, start=1):
+        out = fn(page, n, dpi)
+        del out
+    return (time.perf_counter() - t0) / doc.page_count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--pdf", type=Path, help="PDF sampel (default: PDF sintetis)")
+    args = parser.parse_args()
+
+    source = args.pdf.read_bytes() if args.pdf else _sample_pdf(args.pages)
+    with fitz.open(stream=source, filetype="pdf") as doc:
+        # Bandingkan piksel halaman pertama
+        legacy_img = _legacy(doc[0], 1, args.dpi)
+        direct_img, _pix = render_page_image(doc[0], args.dpi)
+        diff = ImageChops.difference(legacy_img, direct_img)
+        hist = diff.histogram()
+        mean_diff = sum(i * c for i, c in enumerate(hist)) / max(1, sum(hist))
+        print(
+            f"pages={doc.page_count} dpi={args.dpi} size={direct_img.size} "
+            f"pixel_diff max={diff.getextrema()[1]} mean={mean_diff:.3f}"
+        )
+
+        legacy_ms = _time(_legacy, doc, args.dpi)
+        direct_ms = _time(lambda page, n, dpi: render_page_image(page, dpi), doc, args.dpi)
+
+    print(f"legacy (PNG + tempdir): {legacy_ms:8.1f} ms/page")
+    print(f"direct (GRAY buffer)  : {direct_ms:8.1f} ms/page")
+    print(f"speedup               : {legacy_ms / direct_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
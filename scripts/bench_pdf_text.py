@@ -0,0 +1,151 @@
+"""
+scripts/bench_pdf_text.py
+
+Bandingkan backend teks native PDF (`app.services.parser_pdf.PDF_TEXT_BACKENDS`):
+
+- kecepatan : ms per dokumen & halaman/detik per backend
+- parity    : kesamaan token teks (difflib) terhadap pdfminer, jumlah halaman hasil
+              `split_pages`, dan kecocokan field `parse_metadata` (nomor, perihal, tanggal,
+              jenis, pengirim, penerima)
+
+Korpus default: surat sintetis yang menyerupai surat kelurahan (kop, blok Nomor/Sifat/Hal,
+tujuan, isi beberapa halaman, tabel lampiran, tanda tangan di kolom kanan). Korpus
+sendiri: `--corpus DIR` (semua *.pdf di folder itu).
+
+Usage:
+  python scripts/bench_pdf_text.py [--docs 20] [--max-pages 12] [--corpus DIR] [--repeat 3]
+"""
+import argparse
+import difflib
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz  # noqa: E402
+
+from app.services.metadata import parse_metadata  # noqa: E402
+from app.services.parser_pdf import PDF_TEXT_BACKENDS, split_pages  # noqa: E402
+
+REFERENCE = "pdfminer"
+FIELDS = ("nomor", "perihal", "tanggal_surat", "jenis", "pengirim", "penerima")
+HAL = ["Undangan Rapat Koordinasi", "Permohonan Data Kependudukan", "Pemberitahuan Kerja Bakti", "Laporan Kegiatan Posyandu"]
+BULAN = ["Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli", "Agustus", "September", "Oktober", "November", "Desember"]
+
+
+def _letter(i: int, pages: int) -> bytes:
+    rng = random.Random(i)
+    kode = rng.choice(["SK", "SM", "UND", "PGL"])
+    nomor = f"{rng.randint(1, 999):03d}/{kode}/{rng.randint(1, 12):02d}/2025"
+    hal = rng.choice(HAL)
+    tanggal = f"{rng.randint(1, 28)} {rng.choice(BULAN)} 2025"
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((150, 50), "PEMERINTAH PROVINSI DAERAH KHUSUS IBUKOTA JAKARTA", fontsize=12)
+    page.insert_text((210, 66), "KELURAHAN PELA MAMPANG", fontsize=13)
+    page.insert_text((150, 80), "Jl. Kemang Utara IX No. 1, Jakarta Selatan 12730", fontsize=9)
+    page.draw_line((50, 88), (545, 88))
+    page.insert_text((380, 110), f"Jakarta, {tanggal}", fontsize=11)
+    page.insert_text(
+        (50, 130),
+        f"Nomor    : {nomor}\nSifat    : Biasa\nLampiran : 1 (satu) berkas\nHal      : {hal}",
+        fontsize=11,
+    )
+    page.insert_text(
+        (330, 200), "Kepada Yth.\nKetua RW 01 s.d. RW 10\nKelurahan Pela Mampang\ndi\nJakarta", fontsize=11
+    )
+    body = [
+        f"Sehubungan dengan {hal.lower()}, bersama ini kami sampaikan bahwa kegiatan akan",
+        "dilaksanakan sesuai jadwal terlampir. Mohon kehadiran Bapak/Ibu tepat waktu.",
+    ] * 6
+    page.insert_text((50, 300), "\n".join(body), fontsize=11)
+    page.insert_text((360, 620), "Lurah Pela Mampang,\n\n\n\nDrs. H. Ahmad Syaiful\nNIP 196801011990031001", fontsize=11)
+
+    for n in range(1, pages):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Lampiran {n} Surat Nomor {nomor}", fontsize=11)
+        y = 80
+        for row in range(30):
+            page.insert_text((50, y), f"{row + 1:>3}", fontsize=10)
+            page.insert_text((90, y), f"Warga RT {row % 10 + 1:02d} / RW {n:02d}", fontsize=10)
+            page.insert_text((300, y), f"NIK 3174{rng.randint(10**11, 10**12 - 1)}", fontsize=10)
+            page.insert_text((470, y), rng.choice(["Hadir", "Izin", "Sakit"]), fontsize=10)
+            y += 22
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _tokens(text: str):
+    return text.split()
+
+
+def _similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, _tokens(a), _tokens(b), autojunk=False).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--max-pages", type=int, default=12)
+    parser.add_argument("--corpus", type=Path, help="folder berisi PDF native (default: korpus sintetis)")
+    parser.add_argument("--repeat", type=int, default=3, help="ulangi ekstraksi, ambil waktu terbaik")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = [(p.name, p.read_bytes()) for p in sorted(args.corpus.glob("*.pdf"))]
+    else:
+        corpus = [(f"surat-{i:02d}", _letter(i, 1 + i % args.max_pages)) for i in range(args.docs)]
+    total_pages = 0
+    for _name, data in corpus:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            total_pages += doc.page_count
+    print(f"docs={len(corpus)} pages={total_pages}")
+
+    texts = {}
+    timings = {}
+    for backend, fn in PDF_TEXT_BACKENDS.items():
+        best = None
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            out = [fn(data) for _name, data in corpus]
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        texts[backend], timings[backend] = out, best
+        print(
+            f"{backend:>9}: {best / len(corpus) * 1000:8.1f} ms/doc  {total_pages / best:8.1f} pages/s  "
+            f"({sum(len(t) for t in out)} chars)"
+        )
+
+    uploaded_at = datetime(2025, 12, 31)
+    reference = [parse_metadata(t, name, uploaded_at=uploaded_at) for (name, _), t in zip(corpus, texts[REFERENCE])]
+    for backend in PDF_TEXT_BACKENDS:
+        if backend == REFERENCE:
+            continue
+        sims = [_similarity(a, b) for a, b in zip(texts[backend], texts[REFERENCE])]
+        page_match = sum(
+            len(split_pages(a)) == len(split_pages(b)) for a, b in zip(texts[backend], texts[REFERENCE])
+        )
+        parsed = [parse_metadata(t, name, uploaded_at=uploaded_at) for (name, _), t in zip(corpus, texts[backend])]
+        print(f"\n{backend} vs {REFERENCE}: speedup {timings[REFERENCE] / timings[backend]:.1f}x")
+        print(f"  token similarity : mean {sum(sims) / len(sims):.3f}  min {min(sims):.3f}")
+        print(f"  page count match : {page_match}/{len(corpus)}")
+        for field in FIELDS:
+            same = sum(p.get(field) == r.get(field) for p, r in zip(parsed, reference))
+            print(f"  {field:<16} : {same}/{len(corpus)} identical")
+        mismatches = [
+            (name, field, r.get(field), p.get(field))
+            for (name, _), p, r in zip(corpus, parsed, reference)
+            for field in FIELDS
+            if p.get(field) != r.get(field)
+        ]
+        for name, field, ref, got in mismatches[:10]:
+            print(f"    {name} {field}: {REFERENCE}={ref!r} {backend}={got!r}")
+
+
+if __name__ == "__main__":
+    main()
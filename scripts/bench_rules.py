@@ -0,0 +1,135 @@
+"""
+scripts/bench_rules.py
+
+Bandingkan rule engine (`app.services.rules`, aturan dari data/classification_rules.json)
+dengan aturan hardcode lama: throughput `classify_rules` + deteksi kop, dan kesepakatan
+hasil keduanya pada korpus yang sama.
+
+Korpus: surat sintetis dari `generate_metadata_golden.py` diperpanjang N halaman lampiran
+OCR (seperti `bench_metadata.py`). Kolom `gabungan` mengukur alternatif satu regex
+alternasi untuk semua kata kunci/pola (dipertimbangkan, tidak dipakai: lebih lambat di `re`).
+
+Usage:
+  python scripts/bench_rules.py [--docs 200] [--pages 1 10 40] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import classifier_ml, metadata  # noqa: E402
+from app.services.rules import get_rule_engine  # noqa: E402
+from bench_metadata import _ocr_pages  # noqa: E402
+from generate_metadata_golden import build_corpus  # noqa: E402
+
+# --- Aturan lama (hardcode) sebagai pembanding ---
+LEGACY_KELUAR = [
+    "kepada yth", "kepada yang terhormat", "yang terhormat", "di tempat",
+    "surat keputusan", "surat tugas", "surat perintah",
+]
+LEGACY_MASUK = ["dari", "pengirim", "diterima", "stempel masuk", "permohonan", "undangan"]
+LEGACY_INTERNAL = [
+    r"\bKelurahan\s+Pela\s+Mampang\b",
+    r"\bKecamatan\s+Mampang\s+Prapatan\b",
+    r"\bLurah\s+Pela\s+Mampang\b",
+]
+
+
+def legacy_classify_rules(text: str):
+    t = text.lower()
+    score_keluar = sum(1 for kw in LEGACY_KELUAR if kw in t)
+    score_masuk = sum(1 for kw in LEGACY_MASUK if kw in t)
+    for pat in LEGACY_INTERNAL:
+        if re.search(pat, text, re.IGNORECASE):
+            score_keluar += 2
+    if score_keluar == score_masuk:
+        if "kepada yth" in t or "kepada yang terhormat" in t:
+            score_keluar += 0.5
+        else:
+            score_masuk += 0.5
+    jenis = "keluar" if score_keluar > score_masuk else "masuk"
+    total_score = score_keluar + score_masuk
+    confidence = abs(score_keluar - score_masuk) / max(total_score, 1)
+    return jenis, min(0.95, 0.5 + confidence / 2)
+
+
+def legacy_kop(header: str):
+    h = header.upper()
+    if "KELURAHAN PELA MAMPANG" in h or (
+        "PEMERINTAH KOTA ADMINISTRASI JAKARTA SELATAN" in h and "KECAMATAN MAMPANG PRAPATAN" in h
+    ):
+        return "keluar"
+    if "PEMERINTAH" in h or "KEMENTERIAN" in h or "DEWAN" in h or "PT." in h:
+        return "masuk"
+    return None
+
+
+def engine_kop(header: str):
+    hits = get_rule_engine().scan(header, metadata.KOP_RULE_SETS)
+    if hits.matched("kop_keluar") or hits.matched("kop_keluar_wilayah"):
+        return "keluar"
+    if hits.matched("kop_instansi_lain"):
+        return "masuk"
+    return None
+
+
+# Alternatif: satu regex alternasi, hitung label yang kena dari lastgroup
+_COMBINED = re.compile(
+    "|".join(
+        [f"(?P<k{i}>{re.escape(kw)})" for i, kw in enumerate(LEGACY_KELUAR)]
+        + [f"(?P<m{i}>{re.escape(kw)})" for i, kw in enumerate(LEGACY_MASUK)]
+        + [f"(?P<i{i}>{pat})" for i, pat in enumerate(LEGACY_INTERNAL)]
+    ),
+    re.IGNORECASE,
+)
+
+
+def combined_scan(text: str):
+    return {m.lastgroup for m in _COMBINED.finditer(text)}
+
+
+def _best(fn, docs, repeat):
+    best = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        for text in docs:
+            fn(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--pages", type=int, nargs="*", default=[1, 10, 40], help="halaman lampiran OCR per dokumen")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = build_corpus(max(0, args.docs - 30))[: args.docs]
+    print(f"rules={get_rule_engine().source} docs={len(base)}")
+    print(f"{'halaman':>8} {'lama dok/s':>11} {'engine dok/s':>13} {'gabungan dok/s':>15} {'sama':>7}")
+    for pages in args.pages:
+        rng = random.Random(pages)
+        docs = [case["text"] + "\f" + _ocr_pages(rng, pages) for case in base]
+        headers = [" ".join(metadata._head_lines(metadata._clean_text(t), metadata.KOP_HEADER_LINES)) for t in docs]
+
+        same = sum(
+            legacy_classify_rules(t) == classifier_ml.classify_rules(t) and legacy_kop(h) == engine_kop(h)
+            for t, h in zip(docs, headers)
+        )
+        legacy = _best(legacy_classify_rules, docs, args.repeat) + _best(legacy_kop, headers, args.repeat)
+        engine = _best(classifier_ml.classify_rules, docs, args.repeat) + _best(engine_kop, headers, args.repeat)
+        combined = _best(combined_scan, docs, args.repeat)
+        print(
+            f"{pages:>8} {len(docs) / legacy:11.1f} {len(docs) / engine:13.1f} "
+            f"{len(docs) / combined:15.1f} {same:>3}/{len(docs)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+scripts/bench_search_latency.py
+
+Benchmark latensi GET /search/ selagi upload PDF berjalan bersamaan.
+
+Tujuan: membuktikan bahwa ekstraksi/parse yang dijalankan di `ingest_executor`
+tidak memblokir event loop, sehingga p99 /search/ tetap datar saat ada upload.
+Mode `--inline` mensimulasikan perilaku lama (ekstraksi langsung di event loop)
+sebagai pembanding.
+
+Usage:
+  python scripts/bench_search_latency.py                       # executor default (settings)
+  python scripts/bench_search_latency.py --executor process    # process pool
+  python scripts/bench_search_latency.py --inline              # perilaku lama (blocking)
+
+Butuh: httpx (pip install httpx), PyMuPDF untuk membuat PDF sampel.
+Semua data (DB, storage) ditulis ke folder sementara, bukan ke data/ proyek.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _make_pdf(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        body = "\n".join(
+            f"Baris {j} halaman {i}: Kelurahan Pela Mampang menyampaikan laporan kegiatan warga."
+            for j in range(45)
+        )
+        page.insert_text((40, 40), f"Nomor: {uuid.uuid4().hex[:6]}/SK/2025\nHal: Laporan\n{body}", fontsize=8)
+    return doc.tobytes()
+
+
+async def _search_loop(client, stop: asyncio.Event, latencies: list, interval: float):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        r = await client.get("/search/", params={"limit": 20})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        assert r.status_code == 200, r.text
+        await asyncio.sleep(interval)
+
+
+async def _measure(client, duration: float, interval: float, uploads=None):
+    latencies: list = []
+    stop = asyncio.Event()
+    searcher = asyncio.create_task(_search_loop(client, stop, latencies, interval))
+    if uploads is not None:
+        await uploads
+        await asyncio.sleep(interval * 5)
+    else:
+        await asyncio.sleep(duration)
+    stop.set()
+    await searcher
+    return latencies
+
+
+async def _run(args):
+    import httpx
+    from app.database import init_db
+    from app.main import app
+    from app.services import executor as executor_mod
+
+    init_db()
+
+    if args.inline:
+        # Simulasi perilaku lama: fungsi CPU-bound dipanggil langsung di event loop
+        async def _inline_run(fn, *a, **kw):
+            return fn(*a, **kw)
+        executor_mod.ingest_executor.run = _inline_run
+
+    pdfs = [_make_pdf(args.pages) for _ in range(args.uploads)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        idle = await _measure(client, duration=2.0, interval=args.interval)
+
+        async def _upload(content: bytes):
+            r = await client.post("/upload/", files={"file": ("bench.pdf", content, "application/pdf")})
+            assert r.status_code == 200, r.text
+
+        t0 = time.perf_counter()
+        uploads = asyncio.gather(*[_upload(c) for c in pdfs])
+        loaded = await _measure(client, duration=0, interval=args.interval, uploads=uploads)
+        upload_secs = time.perf_counter() - t0
+
+    mode = "inline (blocking)" if args.inline else f"executor={executor_mod.ingest_executor.kind} x{executor_mod.ingest_executor.max_workers}"
+    print(f"== /search/ latency while uploading ({mode}) ==")
+    print(f"uploads: {args.uploads} x {args.pages} pages in {upload_secs:.2f}s")
+    for label, lat in (("idle", idle), ("during uploads", loaded)):
+        print(
+            f"{label:>15}: n={len(lat):4d}  p50={statistics.median(lat):8.1f} ms  "
+            f"p99={_percentile(lat, 99):8.1f} ms  max={max(lat):8.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=4, help="jumlah upload bersamaan")
+    parser.add_argument("--pages", type=int, default=40, help="halaman per PDF sampel")
+    parser.add_argument("--interval", type=float, default=0.02, help="jeda antar request search (detik)")
+    parser.add_argument("--executor", choices=["thread", "process"], help="override INGEST_EXECUTOR")
+    parser.add_argument("--inline", action="store_true", help="jalankan ekstraksi di event loop (perilaku lama)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_search_"))
+    os.environ["SQLITE_DB_PATH"] = str(workdir / "bench.db")
+    os.environ["STORAGE_ROOT"] = str(workdir / "arsip")
+    os.environ["TEMP_UPLOAD_DIR"] = str(workdir / "uploads")
+    if args.executor:
+        os.environ["INGEST_EXECUTOR"] = args.executor
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
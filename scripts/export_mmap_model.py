@@ -0,0 +1,50 @@
+"""
+scripts/export_mmap_model.py
+
+Konversi `classifier_model.pkl` (Pipeline TfidfVectorizer + MultinomialNB) ke format mmap
+(`app.services.mmap_model`): array .npy + manifest.json di satu direktori, dibuka
+`mmap_mode="r"` sehingga semua worker berbagi page yang sama. Prediksi hasil export
+dibandingkan dengan pipeline asli sebelum selesai.
+
+Setelah export, set `ML_MODEL_PATH=<out>` (direktori); worker yang berjalan mengambil
+versi baru lewat pemantauan file / `POST /admin/model/reload`.
+
+Usage:
+  python scripts/export_mmap_model.py [--model data/classifier_model.pkl] [--out data/classifier_model]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.services.mmap_model import MappedModel, export_model  # noqa: E402
+from generate_metadata_golden import build_corpus  # noqa: E402
+
+ROOT = Path(__file__).parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=Path, default=ROOT / "data" / "classifier_model.pkl")
+    parser.add_argument("--out", type=Path, default=ROOT / "data" / "classifier_model")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)
+    export_model(pipeline, args.out)
+    mapped = MappedModel(args.out)
+
+    texts = [case["text"] for case in build_corpus(200)]
+    diff = np.abs(pipeline.predict_proba(texts) - mapped.predict_proba(texts)).max()
+    same = (pipeline.predict(texts) == mapped.predict(texts)).all()
+    print(f"{mapped} <- {args.model}")
+    print(f"check on {len(texts)} texts: max |proba diff| = {diff:.2e}, labels identical = {same}")
+    if not same or diff > 1e-9:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
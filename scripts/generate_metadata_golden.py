@@ -0,0 +1,148 @@
+"""
+scripts/generate_metadata_golden.py
+
+Bangun korpus regresi `parse_metadata` (tests/fixtures/metadata_golden.json): teks surat
+sintetis + nama file, beserta output yang diharapkan dari implementasi saat ini.
+
+Korpus berisi kasus tepi yang ditulis tangan (label hasil OCR yang salah baca, noise '/-',
+tab, CRLF, form feed antar halaman, tanggal tidak valid, fallback nama file, kop instansi
+lain, ...) ditambah surat acak (seed tetap) dengan label yang dihilangkan / diacak.
+
+Klasifikasi ML dimatikan saat membangun golden (jenis dari aturan), agar korpus tidak
+bergantung pada model yang sedang terpasang. Jalankan ulang HANYA bila perubahan output
+memang disengaja, lalu tinjau diff file JSON-nya.
+
+Usage:
+  python scripts/generate_metadata_golden.py [--out tests/fixtures/metadata_golden.json] [--random 60]
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import metadata  # noqa: E402
+
+DEFAULT_OUT = Path(__file__).parent.parent / "tests" / "fixtures" / "metadata_golden.json"
+UPLOADED_AT = "2025-12-31T10:00:00"
+
+KOP_KELUAR = "PEMERINTAH PROVINSI DAERAH KHUSUS IBUKOTA JAKARTA\nKELURAHAN PELA MAMPANG\nJl. Kemang Utara IX No. 1"
+KOP_KELUAR_ALT = "PEMERINTAH KOTA ADMINISTRASI JAKARTA SELATAN\nKECAMATAN MAMPANG PRAPATAN\nKELURAHAN PELA  MAMPANG"
+KOP_MASUK = [
+    "PEMERINTAH KOTA ADMINISTRASI JAKARTA SELATAN\nSUKU DINAS KESEHATAN",
+    "KEMENTERIAN DALAM NEGERI REPUBLIK INDONESIA\nDIREKTORAT JENDERAL KEPENDUDUKAN",
+    "DEWAN KELURAHAN PELA MAMPANG",
+    "PT. PLN (PERSERO) UNIT INDUK DISTRIBUSI JAKARTA RAYA",
+]
+HAL = [
+    "Undangan Rapat Koordinasi", "Permohonan Data Kependudukan", "Pemberitahuan Kerja Bakti",
+    "Laporan Kegiatan Posyandu", "Balasan Permohonan Izin", "Disposisi Pimpinan",
+]
+BULAN = ["Januari", "Februari", "Maret", "April", "Mei", "Juni", "Juli", "Agustus",
+         "September", "Oktober", "November", "Desember"]
+NOMOR_LABELS = ["Nomor", "Nomor", "No", "Nemor", "Nomer", "NOMOR"]
+SIFAT_LABELS = ["Sifat", "Sifat", "Sitat", "Sibat"]
+BODY = (
+    "Sehubungan dengan kegiatan pelayanan masyarakat di wilayah kelurahan, bersama ini kami\n"
+    "sampaikan bahwa kegiatan akan dilaksanakan sesuai jadwal terlampir. Atas perhatian dan\n"
+    "kerja sama Bapak/Ibu diucapkan terima kasih.\n"
+)
+
+CASES = [
+    ("kosong", "", None),
+    ("kosong-nama-file", "", "123-SK-2025 Undangan Rapat.pdf"),
+    ("label-lengkap", KOP_KELUAR + "\nJakarta, 12 Desember 2025\nNomor : 655-HM.03.04\nSifat : Biasa\n"
+     "Lampiran : -\nHal : Undangan Rapat\n\nKepada Yth. Ketua RW 01\ndi Jakarta\n" + BODY, "scan01.pdf"),
+    ("ocr-garis-miring-strip", "Nomor: 123/-SK/-2025\nPerihal: Permohonan  \t Data\n", None),
+    ("nomor-pendek", "No: 12\nHal: Laporan\n\n001/SK/XII/2025 tertanggal 3 Maret 2025", None),
+    ("nomor-token-header", "KELURAHAN PELA MAMPANG\n\n  045/UND/2025   \nJakarta 5 Mei 2025\n" + BODY, None),
+    ("token-tanggal-dilewati", "12-05-2025 2024.11.3\n" + BODY, None),
+    ("token-setelah-15-baris", "\n" * 16 + "777/SM/2025\n", None),
+    ("crlf", "Nomor : 900/SK/2025\r\nHal : Pemberitahuan Kerja Bakti\r\nKepada Yth. Camat\r\n", None),
+    ("form-feed", "Halaman satu\fNomor 321/PGL/2025\fHal\t:\tPanggilan Dinas\f", None),
+    ("tanggal-tidak-valid", "Jakarta, 31 Februari 2025\nHal: Laporan", None),
+    ("bulan-tidak-dikenal", "Jakarta, 12 Decemberr 2025\nTahun anggaran 2024", None),
+    ("hanya-tahun", "Rekap kegiatan tahun 2023 dan 2024", None),
+    ("tanggal-awal-bulan", "Jakarta, 1 Juli 2025\nNomor: 11/SK/2025", None),
+    ("tanpa-label-kata-kunci", "Kepada warga\nDengan hormat,\nSurat edaran kerja bakti\n", None),
+    ("perihal-dari-nama-file", "teks tanpa petunjuk apa pun", "UND-07 Rapat Pleno RW.pdf"),
+    ("nomor-dari-nama-file", "teks tanpa petunjuk apa pun", "2025-88 rekap.pdf"),
+    ("nama-file-tanpa-digit", "teks tanpa petunjuk", "memo internal.docx"),
+    ("sifat-terlalu-pendek", "Sifat : Ya\nNomor : 10/SK/2025", None),
+    ("sifat-sama-dengan", "Sitat = Penting\nNomor : 10/SM/2025", None),
+    ("pengirim-penerima", "Dari : Ketua RT 05\nKepada Yth Lurah Pela Mampang\nHal: Permohonan", None),
+    ("pengirim-label-pengirim", "Pengirim: Dinas Sosial\nKepada Yth.Bapak Camat", None),
+    ("kop-keluar-alternatif", KOP_KELUAR_ALT + "\nHal: Undangan\n", None),
+    ("jenis-dari-nomor-sm", "surat biasa\nNomor: 12/SM/2025", None),
+    ("jenis-dari-nomor-sk", "surat biasa\nNomor: 12-SK-2025", None),
+    ("jenis-dari-nama-file-masuk", "surat biasa", "surat masuk 2025.pdf"),
+    ("jenis-dari-nama-file-sk", "surat biasa", "scan_SK_01.pdf"),
+    ("kop-di-luar-header", "\n" * 25 + "KELURAHAN PELA MAMPANG", None),
+    ("unicode", "Nomor: 45/SK/2025\nHal: Pengajuan Dana Kegiatan Ibu–Ibu PKK\u2028Kepada Yth. Ketua\u00a0RW", None),
+    ("label-hal-di-kata", "Halaman 2 dari 3\nPerihal : Undangan", None),
+]
+
+
+def _random_letter(rng: random.Random, i: int):
+    hal = rng.choice(HAL)
+    kode = rng.choice(["SK", "SM", "UND", "PGL", "HM.03.04"])
+    nomor = f"{rng.randint(1, 999):03d}{rng.choice(['/', '-', '/-'])}{kode}/{rng.randint(2022, 2026)}"
+    day = rng.randint(1, 31)
+    tanggal = f"{day} {rng.choice(BULAN)} {rng.randint(2022, 2026)}"
+    kop = rng.choice([KOP_KELUAR, KOP_KELUAR_ALT, *KOP_MASUK, ""])
+    sep = rng.choice([" : ", ":", "\t:\t", " ", " = "])
+    lines = [kop, f"Jakarta, {tanggal}"]
+    if rng.random() < 0.8:
+        lines.append(f"{rng.choice(NOMOR_LABELS)}{sep}{nomor}")
+    else:
+        lines.append(nomor)
+    if rng.random() < 0.6:
+        lines.append(f"{rng.choice(SIFAT_LABELS)}{sep}{rng.choice(['Biasa', 'Penting', 'Segera', 'Rahasia'])}")
+    if rng.random() < 0.7:
+        lines.append(f"{rng.choice(['Hal', 'Perihal', 'HAL'])}{sep}{hal}")
+    if rng.random() < 0.5:
+        lines.append(f"Dari{sep}{rng.choice(['Ketua RW 03', 'Dinas Kesehatan', 'Camat Mampang'])}")
+    if rng.random() < 0.7:
+        lines.append(f"Kepada Yth{rng.choice(['.', '', '. '])} {rng.choice(['Lurah Pela Mampang', 'Ketua RT 01', 'Warga'])}")
+    lines.append(BODY * rng.randint(1, 4))
+    page_break = rng.choice(["\n", "\f", "\r\n"])
+    text = page_break.join(lines) if rng.random() < 0.3 else "\n".join(lines)
+    if rng.random() < 0.3:
+        # Noise OCR: spasi ganda & tab
+        text = text.replace(" ", rng.choice(["  ", " \t", "   "]), rng.randint(1, 20))
+    filename = rng.choice([None, f"scan-{i:03d}.pdf", f"{nomor.replace('/', '-')} {hal}.pdf", "surat keluar.docx"])
+    return text, filename
+
+
+def build_corpus(random_docs: int):
+    corpus = [{"name": name, "text": text, "filename": filename} for name, text, filename in CASES]
+    rng = random.Random(20251231)
+    for i in range(random_docs):
+        text, filename = _random_letter(rng, i)
+        corpus.append({"name": f"acak-{i:03d}", "text": text, "filename": filename})
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--random", type=int, default=60, help="jumlah surat acak")
+    args = parser.parse_args()
+
+    metadata.USE_ML_CLASSIFIER = False
+    uploaded_at = datetime.fromisoformat(UPLOADED_AT)
+    corpus = build_corpus(args.random)
+    for case in corpus:
+        case["uploaded_at"] = UPLOADED_AT
+        case["expected"] = metadata.parse_metadata(case["text"], case["filename"], uploaded_at=uploaded_at)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(corpus, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    print(f"{len(corpus)} cases -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
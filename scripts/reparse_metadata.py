@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+scripts/reparse_metadata.py
+
+Parse ulang text.txt seluruh arsip dengan heuristik metadata terbaru dan laporkan dokumen
+yang hasilnya berubah dibanding `parsed` di metadata.json. Read-only: tidak ada file atau
+baris database yang diubah.
+
+Arsip dibaca sebagai stream (`parse_metadata_batch`): satu panggilan classifier per
+potongan dokumen, opsional di beberapa proses, memori tidak bergantung jumlah dokumen.
+
+Usage:
+  python scripts/reparse_metadata.py [--root DIR] [--workers 4] [--chunk-size 256] [--out changes.jsonl]
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Iterator, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.constants import METADATA_FILENAME, TEXT_FILENAME  # noqa: E402
+from app.services.metadata import BatchItem, parse_metadata_batch  # noqa: E402
+
+
+def _uploaded_at(metadata: dict) -> datetime:
+    try:
+        return datetime.fromisoformat(metadata["uploaded_at"].rstrip("Z"))
+    except (KeyError, AttributeError, ValueError):
+        return datetime.utcnow()
+
+
+def _archive(root: Path, seen: Deque[Tuple[Path, dict]]) -> Iterator[BatchItem]:
+    """(text, filename, uploaded_at) per dokumen; path & parsed lama dicatat di `seen`."""
+    for meta_path in root.rglob(METADATA_FILENAME):
+        try:
+            metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"skip {meta_path}: {e}", file=sys.stderr)
+            continue
+        text_path = meta_path.parent / TEXT_FILENAME
+        text = text_path.read_text(encoding="utf-8") if text_path.exists() else ""
+        seen.append((meta_path, metadata.get("parsed") or {}))
+        yield text, metadata.get("source_filename"), _uploaded_at(metadata)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", type=Path, default=settings.STORAGE_ROOT_DIR)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--out", type=Path, help="tulis perubahan per dokumen sebagai JSONL")
+    args = parser.parse_args()
+
+    seen: Deque[Tuple[Path, dict]] = deque()
+    changed = total = 0
+    fields: dict = {}
+    out = args.out.open("w", encoding="utf-8") if args.out else None
+    t0 = time.perf_counter()
+    try:
+        results = parse_metadata_batch(_archive(args.root, seen), chunk_size=args.chunk_size, workers=args.workers)
+        for total, parsed in enumerate(results, start=1):
+            # Hasil keluar berurutan, jadi selalu milik dokumen terlama yang belum dilaporkan
+            meta_path, old = seen.popleft()
+            diff = {k: (old.get(k), v) for k, v in parsed.items() if old.get(k) != v}
+            if not diff:
+                continue
+            changed += 1
+            for k in diff:
+                fields[k] = fields.get(k, 0) + 1
+            if out:
+                out.write(json.dumps({"metadata_path": meta_path.as_posix(), "changes": diff}, ensure_ascii=False) + "\n")
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - t0
+
+    print(f"{total} documents in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.1f} docs/s), {changed} changed")
+    for k, n in sorted(fields.items(), key=lambda kv: -kv[1]):
+        print(f"  {k:<14} {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Requirements:
 Install: pip install scikit-learn joblib
 """
 
+import os
 import sys
 from pathlib import Path
 import json
@@ -128,7 +129,11 @@ def train_classifier(texts, labels, model_path='data/classifier_model.pkl'):
     model_dir = Path(model_path).parent
     model_dir.mkdir(parents=True, exist_ok=True)
     
-    joblib.dump(pipeline, model_path)
+    # Tulis ke file sementara lalu ganti atomik: server yang memantau file model
+    # (ML_MODEL_WATCH_INTERVAL) tidak pernah membaca file setengah jadi
+    tmp_path = Path(model_path).with_suffix(".pkl.tmp")
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, model_path)
     print(f"\n💾 Model disimpan ke: {model_path}")
     
     return pipeline
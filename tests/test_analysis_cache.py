@@ -0,0 +1,97 @@
+from app.services.analysis_cache import AnalysisCache, AnalysisResult
+
+
+def _result(text="teks"):
+    return AnalysisResult(text_content=text, ocr_used=True, parsed={"nomor": "1"}, filename="a.pdf")
+
+
+def test_hit_miss_and_ttl(monkeypatch):
+    import app.services.analysis_cache as cache_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    cache = AnalysisCache(ttl_seconds=60, max_entries=10, max_bytes=1024)
+
+    assert cache.get("h1") is None
+    cache.put("h1", _result())
+    assert cache.get("h1").text_content == "teks"
+
+    now[0] += 61
+    assert cache.get("h1") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = AnalysisCache(ttl_seconds=60, max_entries=10, max_bytes=10)
+    cache.put("a", _result("x" * 4))
+    cache.put("b", _result("y" * 4))
+    cache.get("a")                      # 'a' jadi paling baru dipakai
+    cache.put("c", _result("z" * 4))    # total 12 > 10 -> buang 'b'
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_analyze_then_upload_extracts_once(tmp_path, monkeypatch):
+    import hashlib
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.config import settings
+    from app.dependencies import get_db
+    from app.models import Base, Document
+    from app.routers import upload
+    from app.services.analysis_cache import analysis_cache
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(settings, "STORAGE_ROOT", str(tmp_path / "arsip"))
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "ASYNC_INGEST", False)
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_TTL", 900)
+
+    calls = []
+
+    async def fake_run_analysis(fn, path, mime_type, filename, uploaded_at):
+        calls.append(filename)
+        parsed = {"nomor": "005/SK/2025", "perihal": "cache", "tahun": 2025, "jenis": "keluar", "tanggal_surat": "1 Maret 2025"}
+        return "Nomor: 005/SK/2025", False, parsed, None
+
+    monkeypatch.setattr(upload.extraction_scheduler, "run_analysis", fake_run_analysis)
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = override_db
+    client = TestClient(app)
+
+    content = b"%PDF-1.4 analyze lalu upload"
+    sha256 = hashlib.sha256(content).hexdigest()
+    files = {"file": ("surat.pdf", content, "application/pdf")}
+    try:
+        analyzed = client.post("/upload/analyze", files=files)
+        assert analyzed.status_code == 200
+        assert analysis_cache.get(sha256) is not None
+
+        uploaded = client.post("/upload/", files=files)
+        assert uploaded.status_code == 200, uploaded.text
+        assert uploaded.json()["nomor_surat"] == "005/SK/2025"
+
+        assert calls == ["surat.pdf"]  # ekstraksi hanya sekali (saat analyze)
+        assert analysis_cache.get(sha256) is None  # entri dibuang setelah disimpan
+        with Session() as db:
+            assert db.query(Document).count() == 1
+    finally:
+        analysis_cache.discard(sha256)
@@ -0,0 +1,196 @@
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.models import Base, Document
+from app.services import batch as batch_mod
+from app.services import ingest as ingest_mod
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "STORAGE_ROOT", str(tmp_path / "arsip"))
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+
+    def fake_analyze(path, mime_type, filename, uploaded_at):
+        if filename.startswith("rusak"):
+            raise ValueError("PDF rusak")
+        nomor = filename.rsplit(".", 1)[0]
+        return "teks", False, {"nomor": nomor, "perihal": "batch", "tahun": 2025, "jenis": "masuk", "tanggal_surat": "1 Maret 2025"}, None
+
+    # Batch memakai entry point analisis yang sama dengan /upload/ (`analysis_fn()`)
+    monkeypatch.setattr(ingest_mod, "analyze_file", fake_analyze)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _zip(entries):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return buf
+
+
+def test_zip_batch_reports_each_file(db, tmp_path):
+    zip_path = tmp_path / "binder.zip"
+    zip_path.write_bytes(_zip({
+        "binder/001-SM-2025.pdf": b"%PDF a",
+        "binder/002-SM-2025.pdf": b"%PDF b",
+        "binder/salinan.pdf": b"%PDF a",          # duplikat di dalam batch
+        "binder/rusak.pdf": b"%PDF c",
+        "binder/catatan.txt": b"bukan surat",
+    }).getvalue())
+
+    items = batch_mod.expand_zip(zip_path)
+    report = batch_mod.process_batch(db, items, commit_every=1)
+
+    by_name = {r["filename"]: r for r in report["results"]}
+    assert by_name["001-SM-2025.pdf"]["status"] == "uploaded"
+    assert by_name["002-SM-2025.pdf"]["status"] == "uploaded"
+    assert by_name["salinan.pdf"]["status"] == "duplicate"
+    assert by_name["rusak.pdf"]["status"] == "failed"
+    assert by_name["catatan.txt"]["status"] == "failed"
+    assert (report["uploaded"], report["duplicate"], report["failed"]) == (2, 1, 2)
+    assert db.query(Document).count() == 2
+
+    # Upload ulang: semua yang sudah tersimpan terdeteksi duplikat di DB
+    again = batch_mod.process_batch(db, batch_mod.expand_zip(zip_path))
+    assert again["uploaded"] == 0 and again["duplicate"] == 3
+
+
+def test_zip_batch_rejects_too_many_files(tmp_path):
+    zip_path = tmp_path / "besar.zip"
+    zip_path.write_bytes(_zip({f"{i}.pdf": b"%PDF" for i in range(3)}).getvalue())
+    with pytest.raises(batch_mod.BatchTooLargeError):
+        batch_mod.expand_zip(zip_path, max_files=2)
+
+
+def test_same_nomor_in_batch_gets_separate_folders(db, tmp_path):
+    zip_path = tmp_path / "sama.zip"
+    zip_path.write_bytes(_zip({"a/sama.pdf": b"%PDF satu", "b/sama.pdf": b"%PDF dua"}).getvalue())
+
+    report = batch_mod.process_batch(db, batch_mod.expand_zip(zip_path))
+
+    assert report["uploaded"] == 2
+    docs = db.query(Document).all()
+    stored = {d.stored_path for d in docs}
+    assert len(stored) == 2  # original.pdf yang satu tidak menimpa yang lain
+    assert {open(p, "rb").read() for p in stored} == {b"%PDF satu", b"%PDF dua"}
+    assert len({d.metadata_path for d in docs}) == 2
+
+
+def test_commit_failure_removes_stored_files(db, tmp_path, monkeypatch):
+    zip_path = tmp_path / "gagal.zip"
+    zip_path.write_bytes(_zip({"001-SM-2025.pdf": b"%PDF a", "002-SM-2025.pdf": b"%PDF b"}).getvalue())
+    items = batch_mod.expand_zip(zip_path)
+
+    def failing_commit():
+        raise RuntimeError("disk penuh")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    report = batch_mod.process_batch(db, items)
+
+    assert report["failed"] == 2 and report["uploaded"] == 0
+    assert all("DB commit failed" in r["error"] for r in report["results"])
+    assert db.query(Document).count() == 0
+    archive = Path(settings.STORAGE_ROOT)
+    assert [p for p in archive.rglob("*") if p.is_file()] == []
+    assert all(not item.upload.path.exists() for item in items)
+
+
+def test_failed_item_rolls_back_only_itself(db, tmp_path, monkeypatch):
+    zip_path = tmp_path / "campur.zip"
+    zip_path.write_bytes(_zip({"001-SM-2025.pdf": b"%PDF a", "002-SM-2025.pdf": b"%PDF b"}).getvalue())
+    original = batch_mod.store_document
+
+    def flaky_store(db, **kwargs):
+        stored = original(db, **kwargs)
+        if kwargs["filename"].startswith("002"):
+            raise RuntimeError("gagal setelah flush")
+        return stored
+
+    monkeypatch.setattr(batch_mod, "store_document", flaky_store)
+    report = batch_mod.process_batch(db, batch_mod.expand_zip(zip_path), commit_every=10)
+
+    by_name = {r["filename"]: r for r in report["results"]}
+    assert by_name["001-SM-2025.pdf"]["status"] == "uploaded"
+    assert by_name["002-SM-2025.pdf"]["status"] == "failed"
+    assert [d.nomor_surat for d in db.query(Document)] == ["001-SM-2025"]
+
+
+def test_batch_reuses_cached_analysis_and_header_first(db, tmp_path, monkeypatch):
+    import hashlib
+
+    from app.services.analysis_cache import AnalysisResult, analysis_cache
+
+    monkeypatch.setattr(settings, "OCR_HEADER_FIRST", True)
+    header_calls = []
+
+    def fake_header(path, mime_type, filename, uploaded_at):
+        header_calls.append(filename)
+        nomor = filename.rsplit(".", 1)[0]
+        parsed = {"nomor": nomor, "perihal": "scan", "tahun": 2025, "jenis": "masuk", "tanggal_surat": "1 Maret 2025"}
+        return "halaman 1", True, parsed, [{"page": 1, "mode": "ocr"}, {"page": 2, "mode": "scanned"}]
+
+    monkeypatch.setattr(ingest_mod, "analyze_header", fake_header)
+    completions = []
+    monkeypatch.setattr(batch_mod, "schedule_text_completion", lambda *args: completions.append(args))
+
+    cached_content = b"%PDF sudah dianalisis"
+    sha256 = hashlib.sha256(cached_content).hexdigest()
+    analysis_cache.put(sha256, AnalysisResult(
+        text_content="teks lengkap", ocr_used=False, filename="001-SM-2025.pdf",
+        parsed={"nomor": "001-SM-2025", "perihal": "cache", "tahun": 2025, "jenis": "masuk", "tanggal_surat": "1 Maret 2025"},
+    ))
+    zip_path = tmp_path / "header.zip"
+    zip_path.write_bytes(_zip({"001-SM-2025.pdf": cached_content, "002-SM-2025.pdf": b"%PDF scan"}).getvalue())
+    try:
+        report = batch_mod.process_batch(db, batch_mod.expand_zip(zip_path))
+        assert analysis_cache.get(sha256) is None  # dibuang setelah commit, seperti /upload/
+    finally:
+        analysis_cache.discard(sha256)
+
+    assert report["uploaded"] == 2
+    assert header_calls == ["002-SM-2025.pdf"]  # item di cache tidak dianalisis ulang
+    by_nomor = {d.nomor_surat: d for d in db.query(Document)}
+    assert by_nomor["001-SM-2025"].perihal == "cache"
+    # Teks header-first yang belum lengkap dilengkapi di background setelah commit
+    assert [Path(args[0]).parent for args in completions] == [Path(by_nomor["002-SM-2025"].stored_path).parent]
+
+
+def test_batch_endpoint_cleans_spool_on_unexpected_error(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.dependencies import get_db
+    from app.routers import upload
+    from app.utils.fileops import spool_dir
+
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+
+    def broken_expand(zip_path, max_files):
+        raise RuntimeError("member terenkripsi")
+
+    monkeypatch.setattr(upload, "expand_zip", broken_expand)
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app, raise_server_exceptions=False)
+
+    response = client.post("/upload/batch", files=[
+        ("files", ("001-SM-2025.pdf", b"%PDF a", "application/pdf")),
+        ("files", ("arsip.zip", _zip({"x.pdf": b"%PDF x"}).getvalue(), "application/zip")),
+    ])
+    assert response.status_code == 500
+    # File yang sudah di-spool (termasuk ZIP-nya) tidak tertinggal
+    assert list(spool_dir().iterdir()) == []
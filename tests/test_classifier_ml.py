@@ -0,0 +1,39 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import upload
+from app.services import classifier_ml
+from app.services.model_registry import model_registry
+
+TEXTS = [
+    "Kepada Yth. Ketua RW 01 di tempat\nKelurahan Pela Mampang",
+    "Permohonan data kependudukan dari warga, diterima bagian umum",
+    "",
+]
+
+
+def test_classify_ml_single_pass_matches_predict():
+    model = model_registry.model
+    if model is None:
+        pytest.skip("model ML tidak tersedia")
+    for text in TEXTS:
+        jenis, confidence = classifier_ml.classify_ml(text)
+        assert jenis == ("keluar" if model.predict([text])[0] == "keluar" else "masuk")
+        assert confidence == pytest.approx(max(model.predict_proba([text])[0]))
+
+
+def test_predict_jenis_batch_endpoint(monkeypatch):
+    app = FastAPI()
+    app.include_router(upload.router)
+    client = TestClient(app)
+
+    resp = client.post("/predict-jenis/batch", json={"texts": TEXTS})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == len(TEXTS)
+    for text, result in zip(TEXTS, body["results"]):
+        assert result == client.post("/predict-jenis", json={"text": text}).json()
+
+    monkeypatch.setattr(upload, "MAX_PREDICT_BATCH", 2)
+    assert client.post("/predict-jenis/batch", json={"texts": TEXTS}).status_code == 413
@@ -0,0 +1,178 @@
+import asyncio
+import io
+import threading
+from datetime import datetime
+
+import docx
+import fitz
+import pytest
+
+from app.config import settings
+from app.services.executor import IngestExecutor
+from app.services.ingest import analysis_fn
+from app.services.scheduler import ExtractionScheduler
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+UPLOADED_AT = datetime(2025, 3, 1, 8, 0)
+
+
+def _pdf_bytes(text="Nomor: 001/SK/2025\nHal: Undangan rapat koordinasi\nJakarta, 1 Maret 2025"):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((40, 60), text)
+    return doc.tobytes()
+
+
+def _docx_bytes():
+    buf = io.BytesIO()
+    d = docx.Document()
+    d.add_paragraph("Nomor: 002/SM/2025")
+    d.add_paragraph("Perihal: Permohonan data")
+    d.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("header_first", [False, True])
+def test_process_executor_matches_thread_executor(tmp_path, monkeypatch, header_first):
+    monkeypatch.setattr(settings, "OCR_HEADER_FIRST", header_first)
+    files = [
+        (tmp_path / "surat.pdf", _pdf_bytes(), "application/pdf"),
+        (tmp_path / "surat.docx", _docx_bytes(), DOCX),
+    ]
+    for path, content, _ in files:
+        path.write_bytes(content)
+
+    fn = analysis_fn()
+    thread = IngestExecutor(kind="thread", max_workers=1)
+    process = IngestExecutor(kind="process", max_workers=1)
+    try:
+        for path, _, mime in files:
+            # Mode 'process' mem-pickle fungsi & argumen ke worker; hasilnya harus identik
+            expected = thread.call(fn, path, mime, path.name, UPLOADED_AT)
+            assert process.call(fn, path, mime, path.name, UPLOADED_AT) == expected
+            assert expected[0]  # teks native terbaca
+    finally:
+        thread.shutdown(wait=True)
+        process.shutdown(wait=True)
+
+
+started = threading.Event()
+release = threading.Event()
+finished = threading.Event()
+
+
+def _blocking_analysis(path, mime_type, filename, uploaded_at):
+    started.set()
+    release.wait(5)
+    finished.set()
+    return "Nomor: 003/SK/2025", False, {"nomor": "003/SK/2025", "perihal": "lambat", "tahun": 2025, "jenis": "keluar", "tanggal_surat": "1 Maret 2025"}, None
+
+
+def test_upload_does_not_block_event_loop(tmp_path, monkeypatch):
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.dependencies import get_db
+    from app.models import Base
+    from app.routers import upload
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(settings, "STORAGE_ROOT", str(tmp_path / "arsip"))
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "ASYNC_INGEST", False)
+    scheduler = ExtractionScheduler(IngestExecutor(kind="thread", max_workers=1), IngestExecutor(kind="thread", max_workers=1))
+    monkeypatch.setattr(upload, "extraction_scheduler", scheduler)
+    monkeypatch.setattr(upload, "analysis_fn", lambda: _blocking_analysis)
+    for event in (started, release, finished):
+        event.clear()
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = override_db
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            files = {"file": ("surat.pdf", _pdf_bytes(), "application/pdf")}
+            upload_task = asyncio.create_task(client.post("/upload/", files=files))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+
+            # Analisis sedang tertahan di thread executor: event loop tetap melayani request lain
+            pong = await client.get("/ping")
+            assert pong.json() == {"ok": True}
+            assert not finished.is_set()
+
+            release.set()
+            return await upload_task
+
+    # Loop sendiri (bukan asyncio.run) agar event loop default thread utama tidak diubah
+    loop = asyncio.new_event_loop()
+    try:
+        response = loop.run_until_complete(scenario())
+    finally:
+        release.set()
+        loop.close()
+        scheduler.shutdown(wait=True)
+    assert response.status_code == 200, response.text
+    assert response.json()["nomor_surat"] == "003/SK/2025"
+
+
+def test_upload_runs_duplicate_check_and_enqueue_off_event_loop(monkeypatch):
+    import types
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.dependencies import get_db
+    from app.routers import upload
+
+    def in_event_loop():
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    calls = {}
+
+    def fake_find_duplicate(db, sha256):
+        calls["find_duplicate"] = in_event_loop()
+        return None
+
+    def fake_enqueue(db, spooled, mime_type, filename, overrides=None):
+        calls["enqueue"] = in_event_loop()
+        spooled.path.unlink(missing_ok=True)
+        return types.SimpleNamespace(id="job1", status="queued")
+
+    monkeypatch.setattr(upload, "find_duplicate", fake_find_duplicate)
+    monkeypatch.setattr(upload.job_queue, "enqueue", fake_enqueue)
+
+    app = FastAPI()
+    app.include_router(upload.router)
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+
+    response = client.post(
+        "/upload/",
+        files={"file": ("surat.pdf", _pdf_bytes(), "application/pdf")},
+        data={"async_mode": "true"},
+    )
+    assert response.status_code == 202, response.text
+    assert calls == {"find_duplicate": False, "enqueue": False}
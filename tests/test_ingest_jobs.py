@@ -0,0 +1,228 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.models import Base, Document, IngestJob
+from app.services import ingest as ingest_mod
+from app.services.jobs import IngestJobQueue
+from app.services.text_extraction import ExtractedText
+from app.utils.fileops import spool_upload
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+
+    monkeypatch.setattr(settings, "STORAGE_ROOT", str(tmp_path / "arsip"))
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(ingest_mod, "extract_document", lambda path, mime_type, max_pages=None: ExtractedText(None, "Nomor: 001/SK/2025", False))
+    monkeypatch.setattr(ingest_mod, "parse_metadata", lambda text, filename, uploaded_at=None: {
+        "nomor": "001/SK/2025", "perihal": "job test", "tahun": 2025, "jenis": "keluar", "tanggal_surat": "12 Desember 2025",
+    })
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _enqueue(queue, db, content=b"%PDF-1.4 job"):
+    # Jalankan worker secara sinkron di test agar deterministik
+    queue.submit = lambda job_id: None
+    spooled = spool_upload(io.BytesIO(content))
+    return queue.enqueue(db, spooled, mime_type="application/pdf", filename="surat.pdf", overrides={"perihal": "override"})
+
+
+def test_job_runs_ingest_pipeline(session_factory):
+    queue = IngestJobQueue(workers=1, session_factory=session_factory)
+    db = session_factory()
+    try:
+        job = _enqueue(queue, db)
+        assert job.status == "queued"
+
+        queue._run(job.id)
+
+        db.expire_all()
+        job = db.query(IngestJob).filter(IngestJob.id == job.id).first()
+        assert job.status == "done"
+        assert job.document_id is not None
+        result = json.loads(job.result)
+        assert result["nomor_surat"] == "001/SK/2025"
+        assert result["perihal"] == "override"
+
+        doc = db.query(Document).filter(Document.id == job.document_id).first()
+        assert doc.file_hash == hashlib.sha256(b"%PDF-1.4 job").hexdigest()
+        assert Path(doc.stored_path).read_bytes() == b"%PDF-1.4 job"
+    finally:
+        db.close()
+
+
+def test_job_duplicate_marks_failed(session_factory):
+    queue = IngestJobQueue(workers=1, session_factory=session_factory)
+    db = session_factory()
+    try:
+        first = _enqueue(queue, db)
+        queue._run(first.id)
+        second = _enqueue(queue, db)
+        queue._run(second.id)
+
+        db.expire_all()
+        second = db.query(IngestJob).filter(IngestJob.id == second.id).first()
+        assert second.status == "failed"
+        assert "duplikat" in second.error
+    finally:
+        db.close()
+
+
+def test_spool_upload_enforces_size_limit_mid_stream(tmp_path):
+    from app.utils.hash import FileTooLargeError
+
+    with pytest.raises(FileTooLargeError):
+        spool_upload(io.BytesIO(b"x" * 1000), dest_dir=tmp_path, max_bytes=100, chunk_size=64)
+    # File parsial tidak boleh tertinggal
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_header_first_completes_text_in_background(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_HEADER_FIRST", True)
+    calls = []
+
+    def fake_extract(path, mime_type, max_pages=None):
+        calls.append(max_pages)
+        if max_pages:
+            return ExtractedText(None, "Nomor: 001/SK/2025", True, [{"page": 1, "mode": "ocr"}, {"page": 2, "mode": "scanned"}])
+        return ExtractedText(None, "Nomor: 001/SK/2025\nhalaman 2", True, [{"page": 1, "mode": "ocr"}, {"page": 2, "mode": "ocr"}])
+
+    monkeypatch.setattr(ingest_mod, "extract_document", fake_extract)
+    # Jalankan penyelesaian OCR secara sinkron agar deterministik
+    monkeypatch.setattr(ingest_mod, "schedule_text_completion", lambda *args: ingest_mod.complete_document_text(*args))
+
+    queue = IngestJobQueue(workers=1, session_factory=session_factory)
+    db = session_factory()
+    try:
+        job = _enqueue(queue, db)
+        queue._run(job.id)
+
+        db.expire_all()
+        job = db.query(IngestJob).filter(IngestJob.id == job.id).first()
+        assert job.status == "done"
+        assert json.loads(job.result)["text_complete"] is False
+        assert calls == [1, None]
+
+        doc = db.query(Document).filter(Document.id == job.document_id).first()
+        metadata = json.loads(Path(doc.metadata_path).read_text(encoding="utf-8"))
+        assert metadata["text_complete"] is True
+        assert [p["mode"] for p in metadata["pages"]] == ["ocr", "ocr"]
+        assert Path(metadata["text_path"]).read_text(encoding="utf-8").endswith("halaman 2")
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def file_session_factory(session_factory, tmp_path):
+    # Database file: dua antrean = dua engine/koneksi terpisah (seperti dua proses worker)
+    url = f"sqlite:///{(tmp_path / 'jobs.db').as_posix()}"
+    Base.metadata.create_all(bind=create_engine(url))
+
+    def factory():
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    return factory
+
+
+def test_two_queues_race_for_same_job(file_session_factory, monkeypatch):
+    import threading
+
+    queue_a = IngestJobQueue(workers=1, session_factory=file_session_factory())
+    queue_b = IngestJobQueue(workers=1, session_factory=file_session_factory())
+    db = queue_a.session_factory()
+    try:
+        job = _enqueue(queue_a, db)
+    finally:
+        db.close()
+
+    runs = []
+    original = ingest_mod.ingest_document
+
+    def counting_ingest(*args, **kwargs):
+        runs.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr("app.services.jobs.ingest_document", counting_ingest)
+
+    barrier = threading.Barrier(2)
+
+    def run(queue):
+        barrier.wait()
+        queue._run(job.id)
+
+    threads = [threading.Thread(target=run, args=(q,)) for q in (queue_a, queue_b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(runs) == 1
+    db = queue_b.session_factory()
+    try:
+        job = db.query(IngestJob).filter(IngestJob.id == job.id).first()
+        assert job.status == "done"
+        assert job.owner in {queue_a.owner, queue_b.owner}
+        # Job yang sudah selesai tidak bisa diklaim lagi
+        assert not queue_b._claim(db, job.id)
+    finally:
+        db.close()
+
+
+def test_resume_requeues_only_expired_leases(session_factory, monkeypatch):
+    from datetime import datetime, timedelta
+
+    monkeypatch.setattr(settings, "INGEST_JOB_LEASE_SECONDS", 60)
+    queue = IngestJobQueue(workers=1, session_factory=session_factory)
+    db = session_factory()
+    try:
+        stale, alive, queued = (_enqueue(queue, db, content=f"%PDF {i}".encode()).id for i in range(3))
+        now = datetime.utcnow()
+        for job_id, heartbeat in ((stale, now - timedelta(seconds=120)), (alive, now - timedelta(seconds=5))):
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+            job.status, job.owner, job.heartbeat_at = "running", "host:1:dead", heartbeat
+        db.commit()
+
+        submitted = []
+        queue.submit = submitted.append
+        assert queue.resume_pending() == 2
+        assert sorted(submitted) == sorted([stale, queued])
+
+        db.expire_all()
+        statuses = {j.id: (j.status, j.owner) for j in db.query(IngestJob)}
+        assert statuses[stale] == ("queued", None)
+        assert statuses[alive] == ("running", "host:1:dead")
+    finally:
+        db.close()
+
+
+def test_heartbeat_refreshes_only_own_running_jobs(session_factory):
+    queue = IngestJobQueue(workers=1, session_factory=session_factory)
+    db = session_factory()
+    try:
+        job = _enqueue(queue, db)
+        assert queue._claim(db, job.id)
+        db.query(IngestJob).filter(IngestJob.id == job.id).update({"heartbeat_at": None})
+        db.commit()
+
+        assert queue.heartbeat() == 0  # belum aktif di antrean ini
+        queue._active.add(job.id)
+        assert queue.heartbeat() == 1
+        db.expire_all()
+        assert db.query(IngestJob).filter(IngestJob.id == job.id).first().heartbeat_at is not None
+    finally:
+        db.close()
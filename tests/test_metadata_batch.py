@@ -0,0 +1,23 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from app.services import metadata
+
+GOLDEN = json.loads((Path(__file__).parent / "fixtures" / "metadata_golden.json").read_text(encoding="utf-8"))
+
+
+def _items():
+    return [(c["text"], c["filename"], datetime.fromisoformat(c["uploaded_at"])) for c in GOLDEN]
+
+
+def test_batch_matches_single_document_parse():
+    # Dengan classifier terpasang (bila ada): satu predict_proba per potongan == per dokumen
+    expected = [metadata.parse_metadata(*item) for item in _items()]
+    assert list(metadata.parse_metadata_batch(iter(_items()), chunk_size=16)) == expected
+
+
+def test_batch_across_processes_keeps_order(monkeypatch):
+    monkeypatch.setattr(metadata, "USE_ML_CLASSIFIER", False)
+    results = list(metadata.parse_metadata_batch(iter(_items()), chunk_size=8, workers=2))
+    assert [r["nomor"] for r in results] == [c["expected"]["nomor"] for c in GOLDEN]
@@ -0,0 +1,39 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.services import metadata
+
+GOLDEN = json.loads((Path(__file__).parent / "fixtures" / "metadata_golden.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def _rules_only(monkeypatch):
+    # Golden dibangun tanpa ML (lihat scripts/generate_metadata_golden.py)
+    monkeypatch.setattr(metadata, "USE_ML_CLASSIFIER", False)
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=[c["name"] for c in GOLDEN])
+def test_parse_metadata_matches_golden(case):
+    parsed = metadata.parse_metadata(case["text"], case["filename"], uploaded_at=datetime.fromisoformat(case["uploaded_at"]))
+    assert parsed == case["expected"]
+
+
+@pytest.mark.parametrize("text", ["", "a\n", "a\nb", "a\r\nb\r\n\r\n", "\fx\x1cy ", "\n" * 30 + "z"])
+def test_head_lines_matches_splitlines(text):
+    for n in (1, 2, 15):
+        assert metadata._head_lines(text, n) == text.splitlines()[:n]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["ſifat : Penting", "Kepada Yth. Lurah", "Perİhal: Undangan\nDarı: RW 01", "No Hal Dari Kepada"],
+)
+def test_labeled_prefilter_matches_plain_search(text):
+    folded = metadata._fold(text)
+    for label in (metadata._SIFAT, metadata._PERIHAL_LABEL, metadata._PENERIMA, metadata._PENGIRIM, metadata._NOMOR_LABEL):
+        expected = label[0].search(text)
+        got = metadata._search(label, text, folded)
+        assert (got and got.span()) == (expected and expected.span())
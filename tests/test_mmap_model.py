@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from app.services.mmap_model import MANIFEST_FILENAME, MappedModel, export_model
+from app.services.model_registry import ModelRegistry
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: E402
+from sklearn.naive_bayes import MultinomialNB  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+
+DOCS = [
+    ("Kepada Yth. Ketua RW 01 di tempat, surat keputusan Lurah Pela Mampang", "keluar"),
+    ("Surat tugas Kelurahan Pela Mampang kepada yang terhormat warga", "keluar"),
+    ("Permohonan data dari Dinas Kesehatan, diterima bagian umum", "masuk"),
+    ("Undangan rapat dari Kementerian Dalam Negeri, stempel masuk", "masuk"),
+]
+
+
+def _pipeline(**tfidf):
+    pipeline = Pipeline([("tfidf", TfidfVectorizer(ngram_range=(1, 2), **tfidf)), ("classifier", MultinomialNB(alpha=0.1))])
+    return pipeline.fit([d for d, _ in DOCS], [label for _, label in DOCS])
+
+
+@pytest.mark.parametrize("params", [{}, {"sublinear_tf": True, "norm": "l1"}, {"lowercase": False, "use_idf": False}])
+def test_mapped_model_matches_pipeline(tmp_path, params):
+    pipeline = _pipeline(**params)
+    mapped = MappedModel(export_model(pipeline, tmp_path))
+    texts = [d for d, _ in DOCS] + ["", "tidak ada istilah dikenal", "KEPADA YTH. Café Pela  Mampang\tUndangan"]
+    np.testing.assert_allclose(mapped.predict_proba(texts), pipeline.predict_proba(texts), atol=1e-12)
+    assert list(mapped.predict(texts)) == list(pipeline.predict(texts))
+
+
+def test_reexport_swaps_manifest_and_removes_stale_arrays(tmp_path):
+    export_model(_pipeline(), tmp_path)
+    registry = ModelRegistry(tmp_path)
+    first = registry.current
+    assert isinstance(first.model, MappedModel)
+
+    export_model(_pipeline(sublinear_tf=True), tmp_path)
+    assert registry.check_for_update() is True
+    assert registry.current.model.version != first.model.version
+    assert len(list(tmp_path.glob("*.npy"))) == 6 and (tmp_path / MANIFEST_FILENAME).exists()
+
+
+def test_export_rejects_unsupported_pipeline(tmp_path):
+    with pytest.raises(ValueError):
+        export_model(_pipeline(stop_words=["di"]), tmp_path)
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+from app.services.model_registry import ModelRegistry
+
+
+class _Model:
+    def __init__(self, name):
+        self.name = name
+
+    def predict_proba(self, texts):
+        return [[0.5, 0.5] for _ in texts]
+
+
+def _loader(path):
+    content = path.read_text()
+    if content == "rusak":
+        raise ValueError("pickle rusak")
+    return _Model(content)
+
+
+def _write(path, content, mtime):
+    path.write_text(content)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_lazy_load_and_atomic_swap(tmp_path):
+    path = tmp_path / "model.pkl"
+    _write(path, "v1", 1_000_000_000)
+    calls = []
+    registry = ModelRegistry(path, loader=lambda p: calls.append(p) or _loader(p))
+    assert calls == []  # tidak dimuat sebelum dipakai
+
+    v1 = registry.current
+    assert v1.model.name == "v1" and registry.current is v1 and len(calls) == 1
+    assert registry.check_for_update() is False
+
+    # Pemanggil yang memegang snapshot lama tetap memakainya setelah swap
+    in_flight = registry.model
+    _write(path, "v2", 2_000_000_000)
+    assert registry.check_for_update() is True
+    assert registry.model.name == "v2" and in_flight.name == "v1"
+    assert registry.current.version != v1.version
+    stats = registry.stats()
+    assert stats["loads"] == 2 and stats["active"]["version"] == registry.current.version
+
+
+def test_failed_reload_keeps_active_version(tmp_path):
+    path = tmp_path / "model.pkl"
+    _write(path, "v1", 1_000_000_000)
+    registry = ModelRegistry(path, loader=_loader)
+    assert registry.model.name == "v1"
+
+    _write(path, "rusak", 2_000_000_000)
+    assert registry.check_for_update() is True
+    assert registry.model.name == "v1" and "pickle rusak" in registry.error
+    # Signature yang gagal tidak dicoba ulang di setiap poll
+    assert registry.check_for_update() is False
+
+    path.unlink()
+    registry.reload()
+    assert registry.model.name == "v1" and registry.failures == 1
+
+
+def test_missing_model_then_appears(tmp_path):
+    path = tmp_path / "model.pkl"
+    registry = ModelRegistry(path, loader=_loader)
+    assert registry.current is None and "not found" in registry.error
+
+    _write(path, "v1", 1_000_000_000)
+    assert registry.check_for_update() is True
+    assert registry.model.name == "v1" and registry.error is None
+
+
+def test_concurrent_first_use_waits_for_load(tmp_path):
+    path = tmp_path / "model.pkl"
+    _write(path, "v1", 1_000_000_000)
+    calls = []
+    loading = threading.Event()
+
+    def slow_loader(p):
+        calls.append(p)
+        loading.set()
+        time.sleep(0.2)
+        return _loader(p)
+
+    registry = ModelRegistry(path, loader=slow_loader)
+    seen = []
+    first = threading.Thread(target=lambda: seen.append(registry.model))
+    first.start()
+    loading.wait(5)
+    # Pemanggil lain datang saat muat pertama masih berjalan: harus menunggu, bukan dapat None
+    others = [threading.Thread(target=lambda: seen.append(registry.model)) for _ in range(8)]
+    for t in others:
+        t.start()
+    for t in [first, *others]:
+        t.join()
+    assert len(calls) == 1
+    assert len(seen) == 9 and all(m is not None and m.name == "v1" for m in seen)
@@ -1,6 +1,7 @@
 from datetime import datetime
 import csv
 from io import StringIO
+import io
 import asyncio
 
 from app.database import SessionLocal
@@ -79,9 +80,9 @@ def test_search_and_export_nomor_surat():
 
 def test_upload_returns_both_nomor_keys(monkeypatch, tmp_path):
     # Mock text extraction to return OCRed text and mark ocr_used True
-    # Note: upload router imports local references, so patch them there
-    import app.routers.upload as upload_mod
-    monkeypatch.setattr(upload_mod, "extract_text_and_save", lambda content, mime_type, base_dir: (None, "Nomor: XYZ/123", True))
+    # Note: the ingest pipeline imports local references, so patch them there
+    import app.services.ingest as upload_mod
+    monkeypatch.setattr(upload_mod, "extract_document", lambda path, mime_type, max_pages=None: te_mod.ExtractedText(None, "Nomor: XYZ/123", True))
     monkeypatch.setattr(upload_mod, "parse_metadata", lambda text, filename, uploaded_at=None: {"nomor": "XYZ/123", "perihal": "upload test", "tahun": 2025, "jenis": "keluar"})
     # Also patch service modules for completeness
     monkeypatch.setattr(te_mod, "extract_text_and_save", lambda content, mime_type, base_dir: (None, "Nomor: XYZ/123", True))
@@ -92,6 +93,7 @@ def test_upload_returns_both_nomor_keys(monkeypatch, tmp_path):
             self.filename = filename
             self.content_type = content_type
             self._content = content_bytes
+            self.file = io.BytesIO(content_bytes)
 
         async def read(self):
             return self._content
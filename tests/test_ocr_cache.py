@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+from app.services import ocr as ocr_mod
+from app.services.ocr_cache import OcrPageCache
+
+
+def test_only_missing_pages_are_ocred_and_counted(tmp_path):
+    cache = OcrPageCache(path=tmp_path / "ocr.db", max_bytes=1024, enabled=True)
+    calls = []
+
+    def ocr_missing(pages):
+        calls.append(list(pages))
+        return [f"halaman {p}" if p != 3 else None for p in pages]
+
+    first = cache.ocr_pages("abc", [1, 2, 3], 300, "ind", "e1", ocr_missing)
+    second = cache.ocr_pages("abc", [1, 2, 3], 300, "ind", "e1", ocr_missing)
+
+    assert first == second == ["halaman 1", "halaman 2", ""]
+    # Halaman 3 gagal -> tidak di-cache, dicoba lagi; halaman lain dari cache
+    assert calls == [[1, 2, 3], [3]]
+    # Kunci berbeda (dpi / versi engine) tidak berbagi hasil
+    cache.ocr_pages("abc", [1], 200, "ind", "e1", ocr_missing)
+    cache.ocr_pages("abc", [1], 300, "ind", "e2", ocr_missing)
+    assert calls[-2:] == [[1], [1]]
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 6 and stats["entries"] == 4
+
+
+def test_evicts_least_recently_accessed_when_over_size(tmp_path, monkeypatch):
+    import app.services.ocr_cache as cache_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    cache = OcrPageCache(path=tmp_path / "ocr.db", max_bytes=10, enabled=True)
+
+    cache.put_many("a", {1: "x" * 4}, 300, "ind", "e")
+    now[0] += 1
+    cache.put_many("b", {1: "y" * 4}, 300, "ind", "e")
+    now[0] += 1
+    assert cache.get_many("a", [1], 300, "ind", "e") == {1: "xxxx"}  # 'a' jadi paling baru
+    now[0] += 1
+    cache.put_many("c", {1: "z" * 4}, 300, "ind", "e")  # 12 > 10 -> buang 'b'
+
+    assert cache.get_many("b", [1], 300, "ind", "e") == {}
+    assert cache.get_many("a", [1], 300, "ind", "e") and cache.get_many("c", [1], 300, "ind", "e")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_many_refreshes_only_the_pages_hit(tmp_path, monkeypatch):
+    import app.services.ocr_cache as cache_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    cache = OcrPageCache(path=tmp_path / "ocr.db", max_bytes=10, enabled=True)
+
+    cache.put_many("a", {1: "x" * 4, 2: "y" * 4}, 300, "ind", "e")
+    now[0] += 1
+    assert cache.get_many("a", [1], 300, "ind", "e") == {1: "x" * 4}  # halaman 2 tidak dipakai
+    now[0] += 1
+    cache.put_many("b", {1: "z" * 3}, 300, "ind", "e")  # 11 > 10 -> buang halaman terdingin
+
+    assert cache.get_many("a", [1, 2], 300, "ind", "e") == {1: "x" * 4}
+
+
+def test_ocr_pdf_to_text_reuses_cached_pages(tmp_path, monkeypatch):
+    import fitz
+
+    doc = fitz.open()
+    for _ in range(2):
+        doc.new_page()
+    pdf = doc.tobytes()
+
+    cache = OcrPageCache(path=tmp_path / "ocr.db", max_bytes=1024, enabled=True)
+    monkeypatch.setattr(ocr_mod, "ocr_page_cache", cache)
+    backend = SimpleNamespace(engine="fake", cache_lang="ind")
+    monkeypatch.setattr(ocr_mod, "get_backend", lambda name=None: backend)
+    ocred = []
+
+    def fake_ocr_page(doc, page_number, dpi):
+        ocred.append(page_number)
+        return f"teks {page_number}"
+
+    monkeypatch.setattr(ocr_mod, "_ocr_page", fake_ocr_page)
+
+    assert ocr_mod.ocr_pdf_to_text(pdf, workers=1) == "teks 1\nteks 2"
+    assert ocr_mod.ocr_pdf_to_text(pdf, workers=1) == "teks 1\nteks 2"
+    assert ocred == [1, 2]
+
+    # Dikunci dengan bahasa efektif: hasil OCR bahasa default tidak dipakai untuk 'ind'
+    backend.cache_lang = "default"
+    ocr_mod.ocr_pdf_to_text(pdf, workers=1)
+    assert ocred == [1, 2, 1, 2]
+    # Bahasa belum pasti (OCR pertama belum terjadi): tidak dibaca/ditulis ke cache
+    backend.cache_lang = None
+    ocr_mod.ocr_pdf_to_text(pdf, workers=1)
+    assert ocred == [1, 2, 1, 2, 1, 2]
+
+
+def test_pytesseract_backend_decides_language_fallback_once():
+    calls = []
+
+    def image_to_string(img, lang=None):
+        calls.append(lang)
+        if lang:
+            raise RuntimeError("Failed loading language 'ind'")
+        return "teks"
+
+    backend = ocr_mod.PytesseractBackend(SimpleNamespace(image_to_string=image_to_string), lang="ind")
+
+    assert backend.cache_lang is None
+    assert [backend.image_to_string(object()) for _ in range(3)] == ["teks"] * 3
+    assert backend.cache_lang == ocr_mod.DEFAULT_LANG_KEY
+    # Hanya halaman pertama yang mencoba 'ind'; halaman berikutnya tidak OCR dua kali
+    assert calls == ["ind", None, None, None]
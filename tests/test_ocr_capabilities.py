@@ -0,0 +1,32 @@
+from app.services import ocr as ocr_mod
+from app.services.ocr_capabilities import OcrCapabilities, OcrCapabilityProbe
+
+
+def test_backend_uses_probed_language_and_is_rebuilt_on_change(monkeypatch):
+    results = [
+        OcrCapabilities(pytesseract=True, pymupdf=True, pillow=True, tesseract_version="5.3.0", languages=["eng", "osd"]),
+        OcrCapabilities(pytesseract=True, pymupdf=True, pillow=True, tesseract_version="5.3.0", languages=["eng", "ind"]),
+    ]
+    probe = OcrCapabilityProbe(probe=lambda: results.pop(0))
+    monkeypatch.setattr(ocr_mod, "ocr_capabilities", probe)
+    monkeypatch.setattr(ocr_mod, "_backends", {})
+    probe.on_change(lambda caps: ocr_mod._backends.clear())
+
+    probe.start(interval=0)
+    backend = ocr_mod.get_backend("pytesseract")
+    # 'ind' tidak terpasang -> langsung bahasa default, tanpa percobaan per halaman
+    assert backend.lang is None and backend.engine == "tesseract-5.3.0"
+    assert ocr_mod.get_backend("pytesseract") is backend
+
+    probe.refresh()
+    assert ocr_mod.get_backend("pytesseract").lang == "ind"
+
+
+def test_no_backend_without_tesseract(monkeypatch):
+    probe = OcrCapabilityProbe(probe=lambda: OcrCapabilities(pytesseract=True, pymupdf=True, pillow=True))
+    monkeypatch.setattr(ocr_mod, "ocr_capabilities", probe)
+    monkeypatch.setattr(ocr_mod, "_backends", {})
+
+    assert ocr_mod.get_backend() is None
+    assert probe.current.ocr is False
+    assert ocr_mod.ocr_pdf_pages(b"%PDF", [1, 2]) == ["", ""]
@@ -0,0 +1,91 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ocr as ocr_mod
+from app.services.ocr_cache import OcrPageCache
+
+fitz = pytest.importorskip("fitz")
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    # Pool thread sebagai pengganti pool proses agar fake di bawah berlaku di "worker"
+    pool = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(ocr_mod, "_get_ocr_pool", lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+def _fake_worker(path_and_page):
+    _, page_number, _ = path_and_page
+    time.sleep(random.random() / 50)  # selesai tidak berurutan
+    if page_number == 3:
+        raise RuntimeError("worker crash")
+    if page_number == 5:
+        return None  # render/OCR gagal
+    return f"teks {page_number}"
+
+
+def test_map_pages_keeps_order_and_isolates_failing_pages(thread_pool, monkeypatch):
+    monkeypatch.setattr(ocr_mod, "_ocr_worker_page", _fake_worker)
+    pages = list(range(1, 9))
+    assert ocr_mod._map_pages(thread_pool, "x.pdf", pages, 300, limit=3) == [
+        "teks 1", "teks 2", None, "teks 4", None, "teks 6", "teks 7", "teks 8",
+    ]
+
+
+def test_ocr_pdf_pages_uses_shared_pool(thread_pool, monkeypatch, tmp_path):
+    doc = fitz.open()
+    for _ in range(6):
+        doc.new_page()
+    pdf = doc.tobytes()
+
+    @contextmanager
+    def reserve(pages):
+        yield pages
+
+    monkeypatch.setattr(ocr_mod, "ocr_page_governor", SimpleNamespace(reserve=reserve))
+    monkeypatch.setattr(ocr_mod, "get_backend", lambda name=None: SimpleNamespace(engine="fake", cache_lang="ind"))
+    monkeypatch.setattr(ocr_mod, "ocr_page_cache", OcrPageCache(path=tmp_path / "ocr.db", enabled=False))
+    monkeypatch.setattr(ocr_mod, "_ocr_worker_page", _fake_worker)
+
+    texts = ocr_mod.ocr_pdf_pages(pdf, workers=3)
+    assert texts == ["teks 1", "teks 2", "", "teks 4", "", "teks 6"]
+
+
+def test_shared_pool_uses_spawn(monkeypatch):
+    monkeypatch.setattr(ocr_mod, "_ocr_pool", None)
+    pool = ocr_mod._get_ocr_pool()
+    try:
+        assert ocr_mod._get_ocr_pool() is pool
+        assert pool._mp_context.get_start_method() == "spawn"
+    finally:
+        ocr_mod.shutdown_ocr_pool()
+
+
+def test_worker_closes_pdf_after_each_page(tmp_path, monkeypatch):
+    path = tmp_path / "scan.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(path)
+
+    opened = []
+    real_open = ocr_mod._open_pdf
+
+    def tracking_open(source):
+        opened.append(real_open(source))
+        return opened[-1]
+
+    monkeypatch.setattr(ocr_mod, "_open_pdf", tracking_open)
+    monkeypatch.setattr(ocr_mod, "_ocr_page", lambda doc, page_number, dpi: f"teks {page_number}")
+
+    assert ocr_mod._ocr_worker_page((str(path), 1, 300)) == "teks 1"
+    assert ocr_mod._ocr_worker_page((str(path), 1, 300)) == "teks 1"
+    # Tidak ada dokumen yang tetap terbuka di worker: file spool/temp bisa dipindah & dihapus
+    assert len(opened) == 2 and all(d.is_closed for d in opened)
+    path.unlink()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageOps
+
+from app.services import ocr_preprocess as pre
+
+
+def _page(width=1200, height=1600):
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(150, height - 150, 40):
+        draw.rectangle((150, y, width - 150, y + 12), fill=0)  # "baris teks"
+    return img
+
+
+@pytest.mark.parametrize("angle", [-2.5, 1.5])
+def test_deskew_straightens_rotated_page(angle):
+    skewed = _page().rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+    assert pre.estimate_skew(np.asarray(skewed)) == pytest.approx(angle, abs=0.3)
+
+    straight = pre.deskew(skewed)
+    assert abs(pre.estimate_skew(np.asarray(straight))) < 0.3
+
+
+def test_crop_binarize_and_pipeline():
+    grey = _page().point(lambda v: 70 + v * 0.6)  # latar abu-abu seperti fotokopi
+    scanned = ImageOps.expand(grey, border=50, fill=10)
+
+    cropped = pre.crop_border(scanned)
+    arr = np.asarray(cropped)
+    # bingkai hitam & margin kosong hilang: tersisa isi (lebar 901 px) + padding putih
+    assert cropped.width == 901 + 2 * pre.CROP_PADDING
+    assert arr[: pre.CROP_PADDING].min() == 255
+
+    binary = np.asarray(pre.binarize(cropped))
+    assert set(np.unique(binary)) <= {0, 255}
+    assert binary[pre.CROP_PADDING + 20].max() == 255  # latar abu-abu jadi putih
+
+    assert pre.parse_steps("crop, bogus,binarize") == ["crop", "binarize"]
+    assert pre.preprocess_image(scanned, []) is scanned
+    assert pre.downscale(scanned, max_width=650).width == 650
@@ -0,0 +1,61 @@
+import io
+
+import docx
+
+from app.services.parser_docx import extract_text_from_docx, extract_text_from_docx_legacy
+
+
+def _letter() -> bytes:
+    d = docx.Document()
+    d.sections[0].header.paragraphs[0].text = "PEMERINTAH PROVINSI DKI JAKARTA\nKELURAHAN PELA MAMPANG"
+    d.sections[0].footer.paragraphs[0].text = "Jl. Kemang Utara IX No. 1"
+    d.add_paragraph("Nomor : 001/SK/2025")
+    p = d.add_paragraph("Hal : Undangan")
+    p.add_run().add_tab()
+    p.add_run("Rapat")
+    d.add_paragraph("")
+
+    table = d.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "Daftar Hadir"
+    table.cell(1, 0).text = "No"
+    table.cell(1, 1).text = "Nama"
+    table.cell(1, 2).merge(table.cell(2, 2)).text = "Keterangan"
+    table.cell(2, 0).text = "1"
+    d.add_paragraph("Demikian disampaikan.")
+
+    buf = io.BytesIO()
+    d.save(buf)
+    return buf.getvalue()
+
+
+def test_streaming_docx_matches_python_docx_content():
+    data = _letter()
+    legacy = extract_text_from_docx_legacy(data)
+    streamed = extract_text_from_docx(io.BytesIO(data))
+
+    # Semua baris versi lama tetap ada (urutan dokumen, tanpa duplikat sel gabungan)
+    assert set(legacy.splitlines()) <= set(streamed.splitlines())
+    assert legacy.count("Daftar Hadir") == 3 and streamed.count("Daftar Hadir") == 1
+    assert streamed.splitlines() == [
+        "PEMERINTAH PROVINSI DKI JAKARTA",
+        "KELURAHAN PELA MAMPANG",
+        "Nomor : 001/SK/2025",
+        "Hal : Undangan\tRapat",
+        "Daftar Hadir",
+        "No",
+        "Nama",
+        "Keterangan",
+        "1",
+        "Demikian disampaikan.",
+        "Jl. Kemang Utara IX No. 1",
+    ]
+
+
+def test_streaming_docx_equals_legacy_for_plain_paragraphs(tmp_path):
+    d = docx.Document()
+    for i in range(50):
+        d.add_paragraph(f"Paragraf {i}: isi surat kelurahan")
+    path = tmp_path / "polos.docx"
+    d.save(path)
+
+    assert extract_text_from_docx(str(path)) == extract_text_from_docx_legacy(str(path))
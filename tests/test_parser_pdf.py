@@ -0,0 +1,35 @@
+import io
+
+import fitz
+
+from app.services import parser_pdf
+
+
+def _mixed_pdf() -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((40, 60), "Nomor: 005/SK/2025\nHal: Undangan rapat koordinasi RW")
+    doc.new_page()  # halaman gambar / kosong
+    doc.new_page().insert_text((40, 60), "Lampiran daftar hadir warga kelurahan")
+    return doc.tobytes()
+
+
+def test_pymupdf_and_pdfminer_agree_on_pages():
+    data = _mixed_pdf()
+    for backend in ("pymupdf", "pdfminer"):
+        text = parser_pdf.extract_pdf_text(io.BytesIO(data), backend=backend)
+        pages = parser_pdf.split_pages(text)
+        assert len(pages) == 3, backend
+        assert parser_pdf.scanned_pages(pages) == [2], backend
+        assert "005/SK/2025" in pages[0], backend
+
+
+def test_falls_back_to_pdfminer_when_pymupdf_fails(monkeypatch):
+    def broken(source):
+        raise RuntimeError("cannot open")
+
+    monkeypatch.setitem(parser_pdf.PDF_TEXT_BACKENDS, "pymupdf", broken)
+    monkeypatch.setattr(parser_pdf.settings, "PDF_TEXT_BACKEND", "pymupdf")
+
+    text, is_scanned = parser_pdf.extract_text_from_pdf(io.BytesIO(_mixed_pdf()))
+    assert is_scanned is False
+    assert "Undangan rapat koordinasi" in text
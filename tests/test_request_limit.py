@@ -0,0 +1,57 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.request_limit import BodySizeLimitMiddleware
+
+
+def _client(calls):
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, limits=[("/upload/batch", 4096), ("/upload/", 1024)])
+
+    @app.post("/upload/")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    @app.post("/upload/batch")
+    async def batch(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_rejects_by_content_length_before_parsing():
+    calls = []
+    client = _client(calls)
+
+    r = client.post("/upload/", files={"file": ("a.pdf", b"x" * 2048, "application/pdf")})
+    assert r.status_code == 413
+    assert calls == []  # handler tidak pernah jalan
+
+    assert client.post("/upload/", files={"file": ("a.pdf", b"x" * 100, "application/pdf")}).json() == {"size": 100}
+    # prefix paling spesifik dipakai; path lain tidak dibatasi
+    assert client.post("/upload/batch", files={"file": ("a.zip", b"x" * 2048, "application/zip")}).status_code == 200
+    assert client.post("/other", files={"file": ("a.pdf", b"x" * 8192, "application/pdf")}).status_code == 200
+
+
+def test_rejects_chunked_body_without_content_length():
+    calls = []
+    client = _client(calls)
+    boundary = "batas"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"x" * 4096 + f"\r\n--{boundary}--\r\n".encode()
+
+    def chunks():
+        for i in range(0, len(body), 512):
+            yield body[i : i + 512]
+
+    r = client.post("/upload/", content=chunks(), headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+    assert r.status_code == 413
+    assert calls == []
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import classifier_ml, rules
+from app.services.rules import RuleEngine
+
+
+def test_rule_engine_counts_and_match_modes():
+    engine = RuleEngine({
+        "sets": {
+            "salam": {"jenis": "keluar", "weight": 2, "keywords": ["Kepada Yth", "di tempat"]},
+            "kop": {"match": "all", "keywords": ["pemerintah", "kecamatan"]},
+            "lurah": {"patterns": [{"pattern": r"\blurah\s+pela\b", "anchor": "lurah"}]},
+        }
+    })
+    hits = engine.scan("KEPADA YTH. Lurah  Pela Mampang\nkepada yth warga, PEMERINTAH kota")
+    assert hits.counts("salam") == {"kepada yth": 2, "di tempat": 0}
+    assert hits.score("salam") == 2.0
+    assert hits.scores() == {"keluar": 2.0}
+    assert not hits.matched("kop")
+    assert engine.scan("Pemerintah Kota, Kecamatan Mampang").matched("kop")
+    assert hits.counts("lurah") == {r"\blurah\s+pela\b": 1}
+    assert not engine.scan("kelurahan pela").matched("lurah")
+
+
+def test_rule_engine_rejects_invalid_sets():
+    with pytest.raises(ValueError):
+        RuleEngine({"sets": {"kosong": {}}})
+    with pytest.raises(ValueError):
+        RuleEngine({"sets": {"x": {"patterns": [{"pattern": "("}]}}})
+    with pytest.raises(ValueError):
+        RuleEngine({"sets": {"x": {"match": "some", "keywords": ["a"]}}})
+
+
+def test_classify_rules_uses_reloaded_rules(tmp_path, monkeypatch):
+    assert classifier_ml.classify_rules("Kepada Yth. Ketua RW\nKelurahan Pela Mampang") == ("keluar", 0.95)
+    assert classifier_ml.classify_rules("Permohonan dari warga") == ("masuk", 0.95)
+
+    # Skor seri -> salam 'kepada yth' memenangkan keluar; bobot masuk dinaikkan lewat file aturan
+    assert classifier_ml.classify_rules("Kepada Yth. Permohonan")[0] == "keluar"
+    spec = json.loads(Path(rules.get_rule_engine().source).read_text(encoding="utf-8"))
+    spec["sets"]["masuk"]["weight"] = 3
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    monkeypatch.setattr(rules, "_engine", rules.get_rule_engine())
+    rules.load_rules(path)
+    assert classifier_ml.classify_rules("Kepada Yth. Permohonan")[0] == "masuk"
+
+
+@pytest.mark.parametrize("content", [None, "{bukan json", '{"sets": {"kosong": {}}}'])
+def test_invalid_rules_file_fails_on_first_use_with_clear_error(tmp_path, monkeypatch, content):
+    path = tmp_path / "rules.json"
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+    monkeypatch.setattr(settings, "CLASSIFICATION_RULES_PATH", str(path))
+    monkeypatch.setattr(rules, "_engine", None)
+    with pytest.raises(rules.RulesFileError) as exc:
+        classifier_ml.classify_rules("Kepada Yth. Ketua RW")
+    assert str(path) in str(exc.value) and "CLASSIFICATION_RULES_PATH" in str(exc.value)
+
+
+def test_bad_rules_path_does_not_break_imports(tmp_path):
+    env = {**os.environ, "CLASSIFICATION_RULES_PATH": str(tmp_path / "tidak-ada.json")}
+    code = "import app.services.metadata, app.services.ingest, app.services.classifier_ml"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=Path(__file__).parent.parent)
@@ -0,0 +1,58 @@
+import os
+import time
+
+import pytest
+
+from app.services.sandbox import SandboxMemoryExceeded, SandboxPool, SandboxTimeout
+
+
+def _pid(delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _hog(mb):
+    block = bytearray(mb * 1024 * 1024)
+    time.sleep(5)
+    return len(block)
+
+
+def _fail():
+    raise ValueError("PDF rusak")
+
+
+def test_sandbox_runs_in_subprocess_and_recycles_workers():
+    pool = SandboxPool(max_workers=1, timeout=30, max_tasks=2, name="test-sandbox")
+    try:
+        pids = [pool.submit(_pid).result() for _ in range(3)]
+        with pytest.raises(ValueError, match="PDF rusak"):
+            pool.submit(_fail).result()
+    finally:
+        pool.shutdown()
+
+    assert os.getpid() not in pids
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.counters["recycled"] == 2  # tugas ke-2 & ke-4
+
+
+def test_sandbox_timeout_kills_worker_and_pool_recovers():
+    pool = SandboxPool(max_workers=1, timeout=1, name="test-sandbox")
+    try:
+        with pytest.raises(SandboxTimeout):
+            pool.submit(_pid, 10).result()
+        assert pool.submit(_pid).result() > 0
+    finally:
+        pool.shutdown()
+
+    assert pool.counters["timeouts"] == 1
+    assert pool.counters["started"] == 2
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="RSS monitoring needs /proc")
+def test_sandbox_memory_limit():
+    pool = SandboxPool(max_workers=1, timeout=30, max_rss_mb=200, name="test-sandbox")
+    try:
+        with pytest.raises(SandboxMemoryExceeded):
+            pool.submit(_hog, 400).result()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import fitz
+import pytest
+
+from app.services.executor import IngestExecutor
+from app.services.scheduler import FAST_LANE, SLOW_LANE, ExtractionScheduler, OcrPageGovernor
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _pdf(tmp_path, name, text=None):
+    doc = fitz.open()
+    page = doc.new_page()
+    if text:
+        page.insert_text((40, 60), text)
+    path = tmp_path / name
+    doc.save(path)
+    return path
+
+
+def test_lane_for_routes_scans_to_slow_lane(tmp_path):
+    native = _pdf(tmp_path, "native.pdf", "Nomor: 001/SK/2025 Hal: Undangan rapat koordinasi")
+    scan = _pdf(tmp_path, "scan.pdf")
+
+    assert ExtractionScheduler.lane_for(native, "application/pdf") == FAST_LANE
+    assert ExtractionScheduler.lane_for(scan, "application/pdf") == SLOW_LANE
+    assert ExtractionScheduler.lane_for(tmp_path / "surat.docx", DOCX) == FAST_LANE
+
+
+def test_slow_lane_backlog_does_not_block_fast_lane(tmp_path):
+    scheduler = ExtractionScheduler(
+        fast=IngestExecutor(kind="thread", max_workers=1, name="test-fast"),
+        slow=IngestExecutor(kind="thread", max_workers=1, name="test-slow"),
+    )
+    release = threading.Event()
+    try:
+        slow = [scheduler.submit(SLOW_LANE, release.wait, 5) for _ in range(3)]
+        fast = scheduler.submit(FAST_LANE, lambda: "docx")
+        assert fast.result(timeout=2) == "docx"
+
+        metrics = scheduler.metrics()["lanes"]
+        assert metrics[SLOW_LANE]["running"] == 1 and metrics[SLOW_LANE]["queued"] == 2
+        assert metrics[FAST_LANE]["completed"] == 1
+
+        release.set()
+        assert all(f.result(timeout=2) for f in slow)
+        slow_metrics = scheduler.metrics()["lanes"][SLOW_LANE]
+        assert slow_metrics["completed"] == 3 and slow_metrics["queued"] == 0
+        assert slow_metrics["wait"]["count"] == 3 and slow_metrics["wait"]["max_ms"] > 0
+
+        with pytest.raises(ZeroDivisionError):
+            scheduler.submit(FAST_LANE, lambda: 1 / 0).result(timeout=2)
+        assert scheduler.metrics()["lanes"][FAST_LANE]["failed"] == 1
+    finally:
+        release.set()
+        scheduler.shutdown(wait=True)
+
+
+def test_ocr_page_governor_caps_pages_in_flight():
+    governor = OcrPageGovernor(cap=lambda: 3)
+    with governor.reserve(2) as first:
+        assert first == 2
+        with governor.reserve(4) as second:
+            assert second == 1  # hanya sisa slot yang diberikan
+            assert governor.metrics()["in_use"] == 3
+
+            granted = []
+            waiter = threading.Thread(target=lambda: granted.append(governor.reserve(1).__enter__()))
+            waiter.start()
+            time.sleep(0.05)
+            assert granted == [] and governor.metrics()["waiting"] == 1
+    waiter.join(timeout=2)
+    assert granted == [1]
@@ -100,3 +100,140 @@ def test_pdf_scanned_external_ocr(monkeypatch, tmp_path):
 
     assert text_content == "Hasil OCR eksternal"
     assert ocr_used is True
+
+
+def test_external_ocr_gets_unique_temp_file_that_is_removed(monkeypatch, tmp_path):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr('app.services.text_extraction.extract_text_from_pdf', lambda source: ("", True))
+
+    seen = []
+
+    def external_ocr(path):
+        seen.append(Path(path))
+        assert Path(path).read_bytes() == b"fake-pdf"
+        return "Hasil OCR eksternal"
+
+    extractor = TextExtractor(ocr_pdf_fn=external_ocr)
+    for _ in range(2):
+        extractor.extract_text_and_save(content=b"fake-pdf", mime_type="application/pdf", base_dir=tmp_path)
+
+    # Nama temp unik per panggilan dan selalu dibersihkan
+    assert seen[0] != seen[1]
+    assert not any(p.exists() for p in seen)
+
+
+def test_docx_extraction_from_bytes_without_temp_file(tmp_path, monkeypatch):
+    import io
+    import docx
+    from app.config import settings
+
+    uploads = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "TEMP_UPLOAD_DIR", str(uploads))
+
+    buf = io.BytesIO()
+    d = docx.Document()
+    d.add_paragraph("Nomor: 001/SK/2025")
+    d.save(buf)
+
+    text_path, text_content, ocr_used = TextExtractor().extract_text_and_save(
+        content=buf.getvalue(),
+        mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        base_dir=tmp_path,
+    )
+
+    assert "001/SK/2025" in text_content
+    assert not uploads.exists() or list(uploads.iterdir()) == []
+
+
+def test_pdf2image_ocr_renders_in_bounded_windows(monkeypatch):
+    import types
+    import fitz
+    from app.services import text_extraction as te_mod
+    from app.services.ocr_cache import OcrPageCache
+    from app.services.scheduler import OcrPageGovernor
+
+    monkeypatch.setattr(te_mod, "ocr_page_cache", OcrPageCache(enabled=False))
+    monkeypatch.setattr(te_mod, "ocr_page_governor", OcrPageGovernor(cap=lambda: 4))
+    doc = fitz.open()
+    for _ in range(5):
+        doc.new_page()
+
+    windows = []
+
+    def fake_convert(content, dpi, first_page=None, last_page=None, thread_count=1):
+        windows.append((first_page, last_page))
+        return [f"img{n}" for n in range(first_page, last_page + 1)]
+
+    fake_tesseract = types.SimpleNamespace(image_to_string=lambda img, lang=None: img, pytesseract=types.SimpleNamespace())
+    extractor = TextExtractor(tesseract_cmd=Path("tesseract"), pytesseract_mod=fake_tesseract,
+                              convert_from_bytes_fn=fake_convert, ocr_workers=2)
+
+    assert extractor._ocr_pdf_to_text_from_bytes(doc.tobytes()) == "\x0c".join(f"img{n}" for n in range(1, 6))
+    assert windows == [(1, 2), (3, 4), (5, 5)]
+
+
+def test_mixed_pdf_only_ocrs_image_only_pages(monkeypatch, tmp_path):
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page().insert_text((40, 60), "Nomor: 005/SK/2025 halaman sampul dengan teks native")
+    doc.new_page()  # halaman "scan" tanpa teks native
+    doc.new_page().insert_text((40, 60), "Lampiran kedua juga berisi teks native yang cukup")
+    pdf_path = tmp_path / "campuran.pdf"
+    doc.save(pdf_path)
+
+    requested = []
+
+    def fake_ocr_selected(self, path, content, pages):
+        requested.append(pages)
+        return {n: f"hasil ocr halaman {n}" for n in pages}
+
+    monkeypatch.setattr(TextExtractor, "_ocr_selected_pages", fake_ocr_selected)
+
+    extracted = TextExtractor().extract_document(pdf_path, "application/pdf")
+
+    assert requested == [[2]]
+    assert extracted.ocr_used is True
+    assert [p["mode"] for p in extracted.pages] == ["native", "ocr", "native"]
+    texts = extracted.text_content.split("\x0c")
+    assert "005/SK/2025" in texts[0] and texts[1] == "hasil ocr halaman 2" and "Lampiran" in texts[2]
+
+
+def test_scanned_pdf_records_each_page_outcome(monkeypatch, tmp_path):
+    import fitz
+
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page()  # semua halaman tanpa teks native
+    pdf_path = tmp_path / "scan.pdf"
+    doc.save(pdf_path)
+
+    requested = []
+
+    def fake_ocr_selected(self, path, content, pages):
+        requested.append(pages)
+        return {n: ("" if n == 2 else f"hasil ocr halaman {n}") for n in pages}
+
+    monkeypatch.setattr(TextExtractor, "_ocr_selected_pages", fake_ocr_selected)
+
+    extracted = TextExtractor().extract_document(pdf_path, "application/pdf")
+    assert requested == [[1, 2, 3]]
+    assert extracted.ocr_used is True
+    # Halaman yang OCR-nya kosong tetap 'scanned'
+    assert [p["mode"] for p in extracted.pages] == ["ocr", "scanned", "ocr"]
+    assert extracted.text_content.split("\x0c") == ["hasil ocr halaman 1", "", "hasil ocr halaman 3"]
+
+    header = TextExtractor().extract_document(pdf_path, "application/pdf", max_pages=1)
+    assert requested[-1] == [1]
+    assert [p["mode"] for p in header.pages] == ["ocr", "scanned", "scanned"]
+
+
+def test_scanned_pdf_without_page_count_splits_whole_document_ocr(monkeypatch):
+    monkeypatch.setattr('app.services.text_extraction.extract_text_from_pdf', lambda source: ("", True))
+    monkeypatch.setattr(TextExtractor, "_ocr_pdf_to_text_from_bytes", lambda self, content, dpi=200: "satu\x0c\x0ctiga")
+
+    extracted = TextExtractor()._extract("application/pdf", None, content=b"fake-pdf")
+    assert extracted.text_content == "satu\x0c\x0ctiga"
+    assert [p["mode"] for p in extracted.pages] == ["ocr", "scanned", "ocr"]